@@ -0,0 +1,37 @@
+"""work documents
+
+Revision ID: 0a9d5e2c7f38
+Revises: f1c7a3e8b052
+Create Date: 2026-10-17 19:20:44.905127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9d5e2c7f38'
+down_revision: Union[str, Sequence[str], None] = 'f1c7a3e8b052'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Таблица заполняется приложением: документ собирается при первом чтении или записи работы
+    op.create_table('work_documents',
+    sa.Column('work_id', sa.UUID(), nullable=False),
+    sa.Column('document', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('source_key', sa.String(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['work_id'], ['works.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('work_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('work_documents')
@@ -0,0 +1,32 @@
+"""s3 object refs
+
+Revision ID: 0f2bf611f7b6
+Revises: 94f5674416f2
+Create Date: 2026-10-17 11:03:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f2bf611f7b6'
+down_revision: Union[str, Sequence[str], None] = '94f5674416f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('s3_object_refs',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('s3_object_refs')
@@ -0,0 +1,28 @@
+"""s3 object refs tombstones
+
+Revision ID: 3b6f0d2e8a41
+Revises: 0a9d5e2c7f38
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b6f0d2e8a41'
+down_revision: Union[str, Sequence[str], None] = '0a9d5e2c7f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('s3_object_refs', sa.Column('released_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('s3_object_refs', 'released_at')
@@ -0,0 +1,73 @@
+"""work scores summary
+
+Revision ID: 5c1e8a7d2b94
+Revises: 0f2bf611f7b6
+Create Date: 2026-10-17 12:20:07.530911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a7d2b94'
+down_revision: Union[str, Sequence[str], None] = '0f2bf611f7b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('work_scores',
+    sa.Column('work_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('max_score', sa.Integer(), nullable=False),
+    sa.Column('answers_count', sa.Integer(), nullable=False),
+    sa.Column('answered_count', sa.Integer(), nullable=False),
+    sa.Column('graded_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['work_id'], ['works.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('work_id')
+    )
+
+    # Заполняем сводку для существующих работ
+    op.execute("""
+        INSERT INTO work_scores (work_id, score, max_score, answers_count, answered_count, graded_count, updated_at)
+        SELECT
+            w.id,
+            COALESCE((
+                SELECT sum(s.points)
+                FROM answers a
+                JOIN criterions c ON c.exercise_id = a.exercise_id
+                JOIN assessments s ON s.answer_id = a.id AND s.criterion_id = c.id
+                WHERE a.work_id = w.id
+            ), 0),
+            COALESCE((
+                SELECT sum(c.score)
+                FROM answers a
+                JOIN criterions c ON c.exercise_id = a.exercise_id
+                WHERE a.work_id = w.id
+            ), 0),
+            (SELECT count(a.id) FROM answers a WHERE a.work_id = w.id),
+            (
+                SELECT count(a.id)
+                FROM answers a
+                WHERE a.work_id = w.id
+                  AND (a.text != '' OR EXISTS (SELECT 1 FROM answerfiles f WHERE f.answer_id = a.id))
+            ),
+            (
+                SELECT count(DISTINCT a.id)
+                FROM answers a
+                JOIN assessments s ON s.answer_id = a.id
+                WHERE a.work_id = w.id AND s.points > 0
+            ),
+            now()
+        FROM works w
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('work_scores')
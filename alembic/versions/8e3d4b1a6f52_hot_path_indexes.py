@@ -0,0 +1,53 @@
+"""hot path indexes
+
+Revision ID: 8e3d4b1a6f52
+Revises: 5c1e8a7d2b94
+Create Date: 2026-10-17 14:02:51.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3d4b1a6f52'
+down_revision: Union[str, Sequence[str], None] = '5c1e8a7d2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя индекса, таблица, колонки)
+INDEXES = [
+    ('ix_works_student_id_status_created_at', 'works', ['student_id', 'status', 'created_at']),
+    ('ix_works_task_id', 'works', ['task_id']),
+    ('ix_tasks_teacher_id_subject_id', 'tasks', ['teacher_id', 'subject_id']),
+    ('ix_exercises_task_id', 'exercises', ['task_id']),
+    ('ix_criterions_exercise_id', 'criterions', ['exercise_id']),
+    ('ix_answers_work_id', 'answers', ['work_id']),
+    ('ix_assessments_answer_id_criterion_id', 'assessments', ['answer_id', 'criterion_id']),
+    ('ix_answerfiles_answer_id', 'answerfiles', ['answer_id']),
+    ('ix_comments_answer_id', 'comments', ['answer_id']),
+    ('ix_coordinates_comment_id', 'coordinates', ['comment_id']),
+    ('ix_teachers_students_teacher_id_classroom_id_student_id', 'teachers_students', ['teacher_id', 'classroom_id', 'student_id']),
+    ('ix_teachers_students_student_id_teacher_id', 'teachers_students', ['student_id', 'teacher_id']),
+    ('ix_subscriptions_user_id_finish_at', 'subscriptions', ['user_id', 'finish_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в таблицы, но не может выполняться внутри транзакции.
+    # Прерванная сборка оставляет невалидный индекс, поэтому сначала удаляем его, если он есть
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
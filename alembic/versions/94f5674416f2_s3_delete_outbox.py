@@ -0,0 +1,40 @@
+"""s3 delete outbox
+
+Revision ID: 94f5674416f2
+Revises: 79cd32cb869d
+Create Date: 2026-10-17 10:12:31.402715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '94f5674416f2'
+down_revision: Union[str, Sequence[str], None] = '79cd32cb869d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('s3_delete_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_s3_delete_outbox_id'), 's3_delete_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_s3_delete_outbox_next_attempt_at'), 's3_delete_outbox', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_s3_delete_outbox_next_attempt_at'), table_name='s3_delete_outbox')
+    op.drop_index(op.f('ix_s3_delete_outbox_id'), table_name='s3_delete_outbox')
+    op.drop_table('s3_delete_outbox')
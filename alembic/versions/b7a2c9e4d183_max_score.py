@@ -0,0 +1,40 @@
+"""exercises max score
+
+Revision ID: b7a2c9e4d183
+Revises: 8e3d4b1a6f52
+Create Date: 2026-10-17 15:11:36.402718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a2c9e4d183'
+down_revision: Union[str, Sequence[str], None] = '8e3d4b1a6f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('exercises', sa.Column('max_score', sa.Integer(), server_default='0', nullable=False))
+
+    # Заполняем максимальные баллы по существующим критериям
+    op.execute("""
+        UPDATE exercises e
+        SET max_score = s.total
+        FROM (
+            SELECT exercise_id, SUM(score) AS total
+            FROM criterions
+            GROUP BY exercise_id
+        ) s
+        WHERE s.exercise_id = e.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('exercises', 'max_score')
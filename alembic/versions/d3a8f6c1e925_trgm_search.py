@@ -0,0 +1,47 @@
+"""trigram search indexes
+
+Revision ID: d3a8f6c1e925
+Revises: b7a2c9e4d183
+Create Date: 2026-10-17 16:40:12.504731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f6c1e925'
+down_revision: Union[str, Sequence[str], None] = 'b7a2c9e4d183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя индекса, таблица, выражение) - выражение для users совпадает с users_full_name в модели
+INDEXES = [
+    ('ix_users_full_name_trgm', 'users', "(first_name || ' ' || last_name) gin_trgm_ops"),
+    ('ix_tasks_name_trgm', 'tasks', "name gin_trgm_ops"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Как и в 8e3d4b1a6f52: CONCURRENTLY вне транзакции, невалидный остаток прерванной сборки удаляется
+    with op.get_context().autocommit_block():
+        for name, table, expression in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.create_index(
+                name, table, [sa.text(expression)], unique=False,
+                postgresql_using='gin', postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    # Расширение не удаляем: им могут пользоваться объекты, созданные вне миграций
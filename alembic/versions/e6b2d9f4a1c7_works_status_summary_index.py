@@ -0,0 +1,38 @@
+"""works status summary index
+
+Revision ID: e6b2d9f4a1c7
+Revises: d3a8f6c1e925
+Create Date: 2026-10-17 17:25:40.118362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2d9f4a1c7'
+down_revision: Union[str, Sequence[str], None] = 'd3a8f6c1e925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Новый индекс начинается с task_id, поэтому ix_works_task_id больше не нужен
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_works_task_id_status_created_at', table_name='works', postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            'ix_works_task_id_status_created_at', 'works', ['task_id', 'status', 'created_at'], unique=False,
+            postgresql_include=['student_id', 'id'], postgresql_concurrently=True,
+        )
+        op.drop_index('ix_works_task_id', table_name='works', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_works_task_id', table_name='works', postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_works_task_id', 'works', ['task_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_works_task_id_status_created_at', table_name='works', postgresql_concurrently=True, if_exists=True)
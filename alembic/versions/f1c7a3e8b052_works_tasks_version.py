@@ -0,0 +1,30 @@
+"""works and tasks version counters
+
+Revision ID: f1c7a3e8b052
+Revises: e6b2d9f4a1c7
+Create Date: 2026-10-17 18:32:07.731954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a3e8b052'
+down_revision: Union[str, Sequence[str], None] = 'e6b2d9f4a1c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('works', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'version')
+    op.drop_column('works', 'version')
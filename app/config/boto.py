@@ -1,19 +1,35 @@
 import asyncio
+import base64
 import hashlib
+import math
 import mimetypes
 import time
 import uuid
+from datetime import datetime, timezone
 import aioboto3
 import os
 import boto3
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Iterable
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
 from minio import Minio
 from minio.commonconfig import ENABLED, Filter
 from minio.lifecycleconfig import LifecycleConfig, Rule, Expiration, AbortIncompleteMultipartUpload
 from app.config.config_app import settings
 from dotenv import load_dotenv
 
-from app.schemas.schema_files import UploadFileResponse
+from app.schemas.schema_files import (
+    MultipartCompleteRequest,
+    MultipartUploadResponse,
+    UploadFileRequest,
+    UploadFileResponse,
+    UploadLinkBatchItem,
+)
+from app.config.redis import red_async_client
+from app.utils.logger import logger
+from app.utils.presigned_cache import PresignedUrlCache
+from app.utils.s3_signer import SigV4Presigner
 
 load_dotenv()
 
@@ -26,85 +42,421 @@ mc = Minio(
     secure=False 
 )
 
-# Создаем бакеты, если их нет
-if not mc.bucket_exists(settings.BUCKET):
-    mc.make_bucket(settings.BUCKET)
+
+def provision_bucket():
+    """
+    Одноразовая подготовка хранилища при старте контейнера (python -m app.workers.provision_bucket):
+    создаёт бакет, если его нет, и задаёт правила жизненного цикла -
+    временные загрузки (S3_TEMP_PREFIX) удаляются через S3_TEMP_EXPIRE_DAYS,
+    незавершённые multipart upload отменяются через сутки.
+    """
+    if not mc.bucket_exists(settings.BUCKET):
+        mc.make_bucket(settings.BUCKET)
+
+    mc.set_bucket_lifecycle(
+        settings.BUCKET,
+        LifecycleConfig([
+            Rule(
+                ENABLED,
+                rule_filter=Filter(prefix=settings.S3_TEMP_PREFIX),
+                rule_id="expire-temp-uploads",
+                expiration=Expiration(days=settings.S3_TEMP_EXPIRE_DAYS),
+            ),
+            Rule(
+                ENABLED,
+                rule_filter=Filter(prefix=""),
+                rule_id="abort-incomplete-multipart",
+                abort_incomplete_multipart_upload=AbortIncompleteMultipartUpload(days_after_initiation=1),
+            ),
+        ]),
+    )
 
 # --- Асинхронные функции для работы с файлами ---
 
+minio_url = f"http://{minio_host}:{minio_port}"
+
+# Ограничение S3 на количество частей в multipart upload
+S3_MAX_PARTS = 10000
+
+# Общий клиент процесса: создаётся один раз в lifespan приложения (или в воркере)
+# и переиспользуется всеми запросами вместе с пулом соединений
+s3_client = None
+_s3_exit_stack: AsyncExitStack | None = None
+
+
+def _client_options() -> dict:
+    return dict(
+        service_name='s3',
+        endpoint_url=minio_url,
+        aws_access_key_id=os.getenv("MINIO_USER"),
+        aws_secret_access_key=os.getenv("MINIO_PASSWORD"),
+        region_name='us-east-1',
+    )
+
+
+def _client_config() -> dict:
+    return dict(
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.S3_CONNECT_TIMEOUT,
+        read_timeout=settings.S3_READ_TIMEOUT,
+        signature_version='s3v4',
+    )
+
+
+async def init_s3():
+    global s3_client, _s3_exit_stack
+    if s3_client is not None:
+        return
+    session = aioboto3.Session()
+    _s3_exit_stack = AsyncExitStack()
+    s3_client = await _s3_exit_stack.enter_async_context(
+        session.client(**_client_options(), config=AioConfig(**_client_config()))
+    )
+
+
+async def close_s3():
+    global s3_client, _s3_exit_stack
+    if _s3_exit_stack is not None:
+        await _s3_exit_stack.aclose()
+    s3_client = None
+    _s3_exit_stack = None
+
+
 @asynccontextmanager
 async def get_boto_client():
-    url = f"http://{minio_host}:{minio_port}"
+    # Если общий клиент уже создан - отдаём его, иначе (скрипты, тесты) открываем временный
+    if s3_client is not None:
+        yield s3_client
+        return
+
     session = aioboto3.Session()
-    async with session.client(
-        's3',
-        endpoint_url=url,
-        aws_access_key_id=os.getenv("MINIO_USER"),
-        aws_secret_access_key=os.getenv("MINIO_PASSWORD"),
-        region_name='us-east-1'
-    ) as client:
+    async with session.client(**_client_options(), config=AioConfig(**_client_config())) as client:
         yield client
 
 
+# Кэш подписанных ссылок: LRU процесса + Redis, ссылка отдаётся, пока ей ещё долго жить
+url_cache = PresignedUrlCache(
+    red_async_client if settings.S3_URL_CACHE_ENABLED else None,
+    max_size=settings.S3_URL_CACHE_SIZE if settings.S3_URL_CACHE_ENABLED else 0,
+    min_ttl=settings.S3_URL_CACHE_MIN_TTL,
+    local_ttl=settings.S3_URL_CACHE_LOCAL_TTL,
+)
+
+# Локальный подписчик ссылок: без botocore, с кэшированием ключа подписи на сутки
+signer = SigV4Presigner(minio_url, os.getenv("MINIO_USER"), os.getenv("MINIO_PASSWORD"))
 
-async def get_upload_link_to_temp(original_filename: str) -> UploadFileResponse:
+
+async def generate_presigned_url(
+    client_method: str,
+    key: str,
+    expires_in: int = 3600,
+    content_type: str | None = None,
+    checksum_sha256: str | None = None,
+) -> str:
+    """
+    Подпись ссылки get_object/put_object локальным подписчиком или через botocore (S3_LOCAL_SIGNER).
+    checksum_sha256 (base64) подписывается в ссылку на загрузку, и хранилище проверяет содержимое.
+    """
+    if settings.S3_LOCAL_SIGNER:
+        if client_method == 'put_object':
+            return signer.presign_put(settings.BUCKET, key, expires_in, content_type, checksum_sha256=checksum_sha256)
+        return signer.presign_get(settings.BUCKET, key, expires_in)
+
+    params = {'Bucket': settings.BUCKET, 'Key': key}
+    if content_type:
+        params['ContentType'] = content_type
+    if checksum_sha256:
+        params['ChecksumSHA256'] = checksum_sha256
+    async with get_boto_client() as s3:
+        return await s3.generate_presigned_url(client_method, Params=params, ExpiresIn=expires_in)
+
+
+
+def _new_temp_key(original_filename: str) -> tuple[str, str | None]:
+    """
+    Уникальный ключ для загрузки во временную область и content-type по имени исходного файла.
+    Постоянным объект становится после promote_temp_keys.
+    """
     unique_base = f"{uuid.uuid4()}-{time.time()}"
     file_hash = hashlib.sha256(unique_base.encode()).hexdigest()[:15]
     extension, _ = mimetypes.guess_type(original_filename)
     new_filename = f"{file_hash}.{extension.split('/')[1]}" if extension else file_hash
+    return f"{settings.S3_TEMP_PREFIX}{new_filename}", extension
+
 
+def is_temp_key(key: str) -> bool:
+    return key.startswith(settings.S3_TEMP_PREFIX)
+
+
+def is_cas_key(key: str) -> bool:
+    return key.startswith(settings.S3_CAS_PREFIX)
+
+
+def _cas_key(sha256_hex: str, original_filename: str) -> tuple[str, str | None]:
+    """Ключ хранения по содержимому: SHA-256 файла и расширение по его имени"""
+    extension, _ = mimetypes.guess_type(original_filename)
+    name = f"{sha256_hex.lower()}.{extension.split('/')[1]}" if extension else sha256_hex.lower()
+    return f"{settings.S3_CAS_PREFIX}{name}", extension
+
+
+async def object_exists(key: str) -> bool:
     async with get_boto_client() as s3:
-        upload_link = await s3.generate_presigned_url(
-            'put_object',
-            Params={
-                'Bucket': settings.BUCKET,
-                'Key': new_filename,
-                'ContentType': extension
-            },
-            ExpiresIn=3600
-        )
+        try:
+            await s3.head_object(Bucket=settings.BUCKET, Key=key)
+            return True
+        except ClientError as exc:
+            if exc.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+
+async def promote_temp_keys(keys: Iterable[str]) -> dict[str, str]:
+    """
+    Переносит временные загрузки в постоянную область (копирование без префикса
+    S3_TEMP_PREFIX) и возвращает соответствие ключ -> постоянный ключ.
+    Постоянные ключи возвращаются как есть. Временная копия удалится сама
+    по правилу жизненного цикла.
+    """
+    unique_keys = list(dict.fromkeys(key for key in keys if key))
+    result = {key: key for key in unique_keys}
+    temp_keys = [key for key in unique_keys if is_temp_key(key)]
+    if not temp_keys:
+        return result
+
+    async with get_boto_client() as s3:
+        async def promote(key: str) -> tuple[str, str]:
+            target = key[len(settings.S3_TEMP_PREFIX):]
+            try:
+                await s3.copy_object(
+                    Bucket=settings.BUCKET,
+                    Key=target,
+                    CopySource={'Bucket': settings.BUCKET, 'Key': key},
+                )
+            except ClientError:
+                # Повторная отправка уже перенесённого ключа: временная копия могла истечь
+                await s3.head_object(Bucket=settings.BUCKET, Key=target)
+            return key, target
+
+        for key, target in await asyncio.gather(*(promote(key) for key in temp_keys)):
+            result[key] = target
+    return result
+
+
+async def get_upload_link_to_temp(original_filename: str) -> UploadFileResponse:
+    new_filename, extension = _new_temp_key(original_filename)
+
+    upload_link = await generate_presigned_url('put_object', new_filename, 3600, extension)
 
     return UploadFileResponse(
       key=new_filename,
       upload_link=upload_link,
     )
 
-async def get_object_photos(file_keys: list[str]):
+
+async def get_upload_links(files: list[UploadFileRequest], expires_in: int = 3600) -> list[UploadLinkBatchItem]:
+    """
+    Ссылки на загрузку для пачки файлов за один запрос.
+    Файлы больше S3_MULTIPART_THRESHOLD загружаются по частям: для них начинается
+    multipart upload и подписываются ссылки на каждую часть.
+    В режиме S3_CONTENT_ADDRESSED файл с переданным sha256 получает ключ по содержимому;
+    если такой объект уже есть, ссылка не выдаётся (exists=True) и загружать файл не нужно.
+    exists=True не резервирует объект: если до привязки его успеют удалить,
+    привязка (RepoFiles.acquire) ответит 409, и файл нужно загрузить заново.
+    """
+    result: list[UploadLinkBatchItem] = []
+    for file in files:
+        content_addressed = (
+            settings.S3_CONTENT_ADDRESSED
+            and file.sha256 is not None
+            and (file.size is None or file.size <= settings.S3_MULTIPART_THRESHOLD)
+        )
+        if content_addressed:
+            key, content_type = _cas_key(file.sha256, file.file_name)
+            if await object_exists(key):
+                result.append(UploadLinkBatchItem(key=key, exists=True))
+                continue
+            checksum = base64.b64encode(bytes.fromhex(file.sha256)).decode()
+            upload_link = await generate_presigned_url('put_object', key, expires_in, content_type, checksum)
+            result.append(UploadLinkBatchItem(key=key, upload_link=upload_link))
+            continue
+
+        key, content_type = _new_temp_key(file.file_name)
+        if file.size is not None and file.size > settings.S3_MULTIPART_THRESHOLD:
+            multipart = await create_multipart_upload(key, file.size, content_type, expires_in)
+            result.append(UploadLinkBatchItem(key=key, multipart=multipart))
+        else:
+            upload_link = await generate_presigned_url('put_object', key, expires_in, content_type)
+            result.append(UploadLinkBatchItem(key=key, upload_link=upload_link))
+    return result
+
+
+async def create_multipart_upload(
+    key: str,
+    size: int,
+    content_type: str | None = None,
+    expires_in: int = 3600,
+) -> MultipartUploadResponse:
+    part_size = settings.S3_MULTIPART_PART_SIZE
+    parts_count = max(1, math.ceil(size / part_size))
+    if parts_count > S3_MAX_PARTS:
+        # Увеличиваем часть, чтобы уложиться в лимит S3 на количество частей
+        part_size = math.ceil(size / S3_MAX_PARTS)
+        parts_count = math.ceil(size / part_size)
+
+    params = {'Bucket': settings.BUCKET, 'Key': key}
+    if content_type:
+        params['ContentType'] = content_type
     async with get_boto_client() as s3:
-        result = {}
-        for key in file_keys:
-            # Метод generate_presigned_url НЕ требует await
-            url = await s3.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': settings.BUCKET, 'Key': key},
-                ExpiresIn=3600
-            )
+        response = await s3.create_multipart_upload(**params)
+        upload_id = response['UploadId']
+
+        if settings.S3_LOCAL_SIGNER:
+            part_links = [
+                signer.presign_upload_part(settings.BUCKET, key, upload_id, number, expires_in)
+                for number in range(1, parts_count + 1)
+            ]
+        else:
+            part_links = [
+                await s3.generate_presigned_url(
+                    'upload_part',
+                    Params={'Bucket': settings.BUCKET, 'Key': key, 'UploadId': upload_id, 'PartNumber': number},
+                    ExpiresIn=expires_in
+                )
+                for number in range(1, parts_count + 1)
+            ]
+
+    return MultipartUploadResponse(upload_id=upload_id, part_size=part_size, part_links=part_links)
+
+
+async def complete_multipart_upload(data: MultipartCompleteRequest):
+    parts = sorted(data.parts, key=lambda part: part.part_number)
+    async with get_boto_client() as s3:
+        await s3.complete_multipart_upload(
+            Bucket=settings.BUCKET,
+            Key=data.key,
+            UploadId=data.upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': p.part_number, 'ETag': p.etag} for p in parts]}
+        )
+
 
-            result[key] = url
+async def abort_multipart_upload(key: str, upload_id: str):
+    async with get_boto_client() as s3:
+        await s3.abort_multipart_upload(Bucket=settings.BUCKET, Key=key, UploadId=upload_id)
+
+async def presign_many(keys: Iterable[str], expires_in: int = 3600) -> dict[str, str]:
+    """
+    Подписывает ссылки на чтение для всех ключей за один проход одним клиентом.
+    Дубликаты и пустые ключи отбрасываются. Ключи, которые не удалось подписать,
+    в результат не попадают (ошибка пишется в лог).
+    Ещё достаточно долго живущие ссылки берутся из url_cache.
+    """
+    unique_keys = list(dict.fromkeys(key for key in keys if key))
+    if not unique_keys:
+        return {}
+
+    result = await url_cache.get_many(unique_keys)
+    missing = [key for key in unique_keys if key not in result]
+    if not missing:
         return result
 
+    signed, expires_at = await _sign_many(missing, expires_in)
+    await url_cache.set_many(signed, expires_at)
+    result.update(signed)
+    return result
+
+def url_epoch() -> int:
+    """
+    Номер текущего интервала длиной url_cache.min_ttl. Любая ссылка, выданная в интервале,
+    живёт хотя бы до его конца (из кэша отдаются только ссылки с запасом больше min_ttl),
+    поэтому ответ со ссылками можно повторно использовать только в пределах интервала - номер входит в ETag.
+    """
+    return int(time.time()) // max(url_cache.min_ttl, 1)
+
+def _url_window(expires_in: int) -> tuple[datetime, int, str | None]:
+    """
+    Окно подписи для ссылок на чтение: время подписи выравнивается по началу
+    интервала S3_URL_BUCKET_SECONDS, поэтому в пределах интервала ссылка на ключ
+    одна и та же и браузер берёт фото из своего кэша.
+    Срок жизни увеличивается на длину интервала, чтобы ссылке всегда оставалось
+    не меньше expires_in. Возвращает (время подписи, срок жизни, Cache-Control).
+    """
+    bucket = settings.S3_URL_BUCKET_SECONDS
+    if bucket <= 0:
+        return datetime.now(timezone.utc), expires_in, None
+    start = int(time.time()) // bucket * bucket
+    return (
+        datetime.fromtimestamp(start, timezone.utc),
+        expires_in + bucket,
+        f"private, max-age={expires_in}, immutable",
+    )
+
+async def _sign_many(keys: list[str], expires_in: int) -> tuple[dict[str, str], int]:
+    result: dict[str, str] = {}
+    if settings.S3_LOCAL_SIGNER:
+        signed_at, lifetime, cache_control = _url_window(expires_in)
+        for key in keys:
+            result[key] = signer.presign_get(
+                settings.BUCKET, key, lifetime, now=signed_at, cache_control=cache_control
+            )
+        return result, int(signed_at.timestamp()) + lifetime
+
+    expires_at = int(time.time()) + expires_in
+    async with get_boto_client() as s3:
+        for key in keys:
+            try:
+                result[key] = await s3.generate_presigned_url(
+                    'get_object',
+                    Params={'Bucket': settings.BUCKET, 'Key': key},
+                    ExpiresIn=expires_in
+                )
+            except Exception as exc:
+                logger.warning(f"Failed to get presigned URL for file {key}: {exc}")
+    return result, expires_at
+
+async def get_object_photos(file_keys: list[str]):
+    return await presign_many(file_keys)
+
 async def get_presigned_url(filekey: str):
     try:
-        async with get_boto_client() as s3:
-            url = await s3.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': settings.BUCKET, 'Key': filekey},
-                ExpiresIn=3600
-            )
-            return url
+        urls = await presign_many([filekey])
+        return urls[filekey]
     except Exception as e:
       print(f"Ошибка получения ссылки: {e}")
       raise e
 
+# DeleteObjects принимает не больше 1000 ключей за вызов
+S3_DELETE_OBJECTS_LIMIT = 1000
+
+
+async def delete_objects_batch(file_keys: list[str]) -> dict[str, str]:
+    """
+    Удаляет ключи пачками DeleteObjects (до 1000 ключей в запросе).
+    Возвращает ключи, которые удалить не удалось, с текстом ошибки.
+    """
+    failed: dict[str, str] = {}
+    keys = list(dict.fromkeys(key for key in file_keys if key))
+    if not keys:
+        return failed
+
+    await url_cache.evict(keys)
+    async with get_boto_client() as s3:
+        for start in range(0, len(keys), S3_DELETE_OBJECTS_LIMIT):
+            chunk = keys[start:start + S3_DELETE_OBJECTS_LIMIT]
+            try:
+                response = await s3.delete_objects(
+                    Bucket=settings.BUCKET,
+                    Delete={'Objects': [{'Key': k} for k in chunk], 'Quiet': True}
+                )
+            except Exception as exc:
+                failed.update((key, str(exc)) for key in chunk)
+                continue
+            for error in response.get('Errors', []):
+                failed[error['Key']] = f"{error.get('Code')}: {error.get('Message')}"
+    return failed
+
 async def delete_files_from_s3(file_keys: list[str]):
     if not file_keys: return
-    async with get_boto_client() as s3:
-        try:
-            objects = [{'Key': k} for k in file_keys]
-            await s3.delete_objects(
-                Bucket=settings.BUCKET,
-                Delete={'Objects': objects, 'Quiet': True}
-            )
-        except Exception as e:
-            print(f"Ошибка удаления: {e}")
-            raise e
\ No newline at end of file
+    failed = await delete_objects_batch(file_keys)
+    if failed:
+        logger.warning(f"Failed to delete files from S3: {failed}")
+        raise RuntimeError(f"Failed to delete {len(failed)} files from S3")
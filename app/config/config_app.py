@@ -8,6 +8,10 @@ class Settings(BaseSettings):
     DATABASE_USER: str
     DATABASE_PASSWORD: str
     DATABASE_NAME: str
+    # Кэш скомпилированных SQLAlchemy-запросов (на движок) и подготовленных
+    # asyncpg-выражений (на соединение); 0 выключает кэш подготовленных выражений
+    DATABASE_QUERY_CACHE_SIZE: int = 1200
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE: int = 500
 
 
     # Security / JWT
@@ -22,6 +26,44 @@ class Settings(BaseSettings):
     
     # MinIO
     BUCKET: str = "permanent"
+    # Префикс временных загрузок: объекты удаляются правилом жизненного цикла,
+    # если ключ так и не был привязан к ответу, комментарию или упражнению
+    S3_TEMP_PREFIX: str = "tmp/"
+    S3_TEMP_EXPIRE_DAYS: int = 1
+    # Хранение по содержимому: ключ = SHA-256 файла, повторная загрузка того же файла не нужна
+    S3_CONTENT_ADDRESSED: bool = False
+    S3_CAS_PREFIX: str = "cas/"
+    # Надгробия обнулённых счётчиков ссылок хранятся (часов), потом их удаляет сборщик мусора
+    S3_CAS_TOMBSTONE_HOURS: int = 24
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_CONNECT_TIMEOUT: int = 5
+    S3_READ_TIMEOUT: int = 30
+    S3_LOCAL_SIGNER: bool = True
+    S3_URL_CACHE_ENABLED: bool = True
+    S3_URL_CACHE_SIZE: int = 10000
+    # Минимальный остаток жизни ссылки (сек), при котором её ещё можно отдать из кэша
+    S3_URL_CACHE_MIN_TTL: int = 600
+    # Сколько (сек) ссылка живёт в памяти процесса, если сообщение об удалении объекта не дошло
+    S3_URL_CACHE_LOCAL_TTL: int = 60
+    # Интервал (сек), в пределах которого ссылка на чтение не меняется; 0 - выключено
+    S3_URL_BUCKET_SECONDS: int = 900
+    # Очередь удаления объектов (s3_delete_outbox)
+    S3_DELETE_BATCH_SIZE: int = 1000
+    S3_DELETE_POLL_INTERVAL: int = 5
+    S3_DELETE_RETRY_BASE: int = 30
+    S3_DELETE_RETRY_MAX: int = 3600
+    # Сборщик объектов без ссылок из БД не трогает объекты моложе (часов)
+    S3_GC_GRACE_HOURS: int = 24
+    # Файлы больше порога (байт) загружаются по частям, размер части не меньше 5 МБ
+    S3_MULTIPART_THRESHOLD: int = 16 * 1024 * 1024
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024
+
+    # Кэш ответов эндпоинтов фильтров (Redis), сбрасывается по тегам учителя / ученика
+    FILTERS_CACHE_ENABLED: bool = True
+    FILTERS_CACHE_TTL: int = 300
+    # Кэш прав по подписке (Redis), сбрасывается при оплате, отмене, новом периоде и AI-проверке
+    ENTITLEMENTS_CACHE_ENABLED: bool = True
+    ENTITLEMENTS_CACHE_TTL: int = 60
 
     # pika
     PIKA_HOST: str
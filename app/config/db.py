@@ -8,7 +8,12 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 
 
 engine = create_engine(settings.sync_url, future=True)
-engine_async = create_async_engine(settings.async_url, future=True)
+engine_async = create_async_engine(
+    settings.async_url,
+    future=True,
+    query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+    connect_args={"prepared_statement_cache_size": settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE},
+)
 
 # Create async engine & session maker
 AsyncSessionLocal = async_sessionmaker(bind=engine_async, expire_on_commit=False, class_=AsyncSession)
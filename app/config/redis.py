@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 import os 
 from dotenv import load_dotenv
 load_dotenv()
@@ -9,4 +10,11 @@ red_client = redis.Redis(
   # username=os.getenv("REDIS_USER"),
   # password=os.getenv("REDIS_PASS"),
   decode_responses=True
-)
\ No newline at end of file
+)
+
+# Асинхронный клиент для кэшей, которые используются из async-кода (не блокирует event loop)
+red_async_client = redis.asyncio.Redis(
+  host=os.getenv("REDIS_HOST"),
+  port=int(os.getenv("REDIS_PORT")),
+  decode_responses=True
+)
@@ -1,6 +1,7 @@
 import asyncio
 import aio_pika
 
+from app.config.boto import close_s3, init_s3
 from app.config.config_app import settings
 from app.config.db import AsyncSessionLocal
 from app.schemas.schema_AI import SchemaOutgoing
@@ -12,6 +13,14 @@ async def main():
     Worker для сохранения результатов AI-обработки в БД.
     Создаёт новую сессию БД для каждого сообщения из очереди.
     """
+    await init_s3()
+    try:
+        await consume()
+    finally:
+        await close_s3()
+
+
+async def consume():
     connection = await aio_pika.connect_robust(settings.pika_url)
     channel = await connection.channel()
     queue = await channel.declare_queue(settings.PIKA_OUTGOING_QUEUE)
@@ -6,4 +6,5 @@ from .model_tasks import *
 from .model_users import *
 from .model_works import *
 from .model_files import *
-from .model_subscription import *
\ No newline at end of file
+from .model_subscription import *
+from . import versions
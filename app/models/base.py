@@ -2,7 +2,7 @@ import uuid
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from sqlalchemy import DateTime
+from sqlalchemy import DDL, DateTime, event
 from datetime import datetime
 
 
@@ -10,3 +10,7 @@ class Base(DeclarativeBase):
     @declared_attr.directive
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
+
+
+# Расширения, на которых построены индексы моделей (trigram-поиск), - до создания таблиц
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -1,6 +1,7 @@
+from datetime import datetime
 import enum
 import uuid
-from sqlalchemy import UUID, Enum, ForeignKey, String
+from sqlalchemy import UUID, DateTime, Enum, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 
@@ -14,7 +15,37 @@ class StatusAnswerFile(str, enum.Enum):
 
 class AnswerFiles(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    answer_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("answers.id", ondelete="CASCADE"), nullable=False)
+    answer_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("answers.id", ondelete="CASCADE"), nullable=False, index=True)
     key: Mapped[str] = mapped_column(String, nullable=False)
     ai_status: Mapped[StatusAnswerFile] = mapped_column(Enum(StatusAnswerFile), nullable=False, default=StatusAnswerFile.draft)
 
+
+
+class S3DeleteOutbox(Base):
+    """
+    Очередь на удаление объектов из S3. Запись добавляется в той же транзакции,
+    что и изменение данных, а удаляет объекты фоновый воркер (app.workers.s3_delete_worker).
+    """
+    __tablename__ = "s3_delete_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    key: Mapped[str] = mapped_column(String, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class S3ObjectRefs(Base):
+    """
+    Счётчик ссылок на объект в режиме хранения по содержимому (ключ = SHA-256 содержимого).
+    Один и тот же объект может быть привязан к нескольким упражнениям и комментариям,
+    удаляется он только когда счётчик доходит до нуля.
+    При обнулении строка не удаляется, а остаётся надгробием (released_at): объект уже удалён
+    или вот-вот будет удалён, и привязать его можно, только убедившись, что он есть в хранилище.
+    """
+    __tablename__ = "s3_object_refs"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    refcount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    released_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
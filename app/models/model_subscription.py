@@ -5,7 +5,7 @@ import enum
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID, Boolean, DateTime, Enum, Float, ForeignKey, Integer, String, func, true
+from sqlalchemy import UUID, Boolean, DateTime, Enum, Float, ForeignKey, Index, Integer, String, func, true
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -36,6 +36,10 @@ class Subscriptions(Base):
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_subscriptions_user_id_finish_at', 'user_id', 'finish_at'),
+    )
+
     user: Mapped["Users"] = relationship(
       "Users",
       backref="subscription"
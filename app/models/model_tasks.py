@@ -1,24 +1,26 @@
 from datetime import datetime
 import uuid
 
-from sqlalchemy import ARRAY, UUID, DateTime, ForeignKey, Integer, String, UniqueConstraint, func
+from sqlalchemy import ARRAY, UUID, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, func
 from app.models.base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # Можно сделать так, чтобы учитель сам заполнял критерии, можно сделать так, чтобы критерии были из ЕГЭ
 class Criterions(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    exercise_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False)
+    exercise_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String(), nullable=False)
     score: Mapped[int] = mapped_column(Integer(), nullable=False)
 
 
 class Exercises(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    task_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    task_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String(), nullable=False)
     description: Mapped[str] = mapped_column(String())
     order_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Сумма баллов критериев, пересчитывается при записи критериев (RepoTasks.refresh_max_scores)
+    max_score: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     files: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=[])
 
     criterions: Mapped[list["Criterions"]] = relationship(
@@ -38,12 +40,16 @@ class Tasks(Base):
     name: Mapped[str] = mapped_column(String(), nullable=False)
     description: Mapped[str] = mapped_column(String())
     deadline: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Счётчик изменений упражнений и критериев задачи (входит в ETag, см. versions.py)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
         UniqueConstraint('name', 'subject_id', 'teacher_id', name='_name_subject_teacher_uc'),
+        Index('ix_tasks_teacher_id_subject_id', 'teacher_id', 'subject_id'),
+        Index('ix_tasks_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
     )
 
     subject: Mapped["Subjects"] = relationship(
@@ -1,7 +1,7 @@
 from datetime import datetime
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Enum, Table, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Enum, Table, func, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 
 import enum
@@ -21,6 +21,8 @@ teachers_students = Table(
     Column("teacher_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")),
     Column("student_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")),
     Column("classroom_id", UUID(as_uuid=True), ForeignKey("classrooms.id", ondelete="SET NULL"), nullable=True),
+    Index("ix_teachers_students_teacher_id_classroom_id_student_id", "teacher_id", "classroom_id", "student_id"),
+    Index("ix_teachers_students_student_id_teacher_id", "student_id", "teacher_id"),
 )
 
 
@@ -59,4 +61,16 @@ class Users(Base):
         secondaryjoin=lambda: "Classrooms.id" == teachers_students.c.classroom_id,
         viewonly=True,  # Только для чтения, так как связь управляется через teachers_students
         overlaps="students,teachers",  # Указываем, что это relationship перекрывается с students и teachers
-    )
\ No newline at end of file
+    )
+
+
+# Полное имя через ||, а не concat(): concat() не IMMUTABLE и не индексируется.
+# Поиск должен использовать ровно это выражение, иначе trigram-индекс не подхватится
+users_full_name = (Users.__table__.c.first_name + literal_column("' '") + Users.__table__.c.last_name).self_group()
+
+Index(
+    "ix_users_full_name_trgm",
+    users_full_name.label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"},
+)
@@ -2,8 +2,9 @@ from datetime import datetime
 import enum
 import uuid
 
-from sqlalchemy import UUID, Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Table, func
+from sqlalchemy import UUID, Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Table, func
 from app.models.base import Base
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 class StatusWork(str, enum.Enum):
@@ -20,6 +21,10 @@ class Assessments(Base):
     criterion_id:  Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("criterions.id", ondelete="CASCADE"), nullable=False)
     points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    __table_args__ = (
+        Index('ix_assessments_answer_id_criterion_id', 'answer_id', 'criterion_id'),
+    )
+
     criterion: Mapped["Criterions"] = relationship(
         "Criterions",
         backref='assessment'
@@ -28,7 +33,7 @@ class Assessments(Base):
 
 class Answers(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
-    work_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("works.id", ondelete="CASCADE"), nullable=False)
+    work_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("works.id", ondelete="CASCADE"), nullable=False, index=True)
     exercise_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("exercises.id", ondelete="CASCADE"))
     text: Mapped[str] = mapped_column(String, default='')
     general_comment: Mapped[str] = mapped_column(String, default='')
@@ -64,10 +69,21 @@ class Works(Base):
     finish_date: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     status: Mapped[StatusWork] = mapped_column(Enum(StatusWork), default=StatusWork.draft, nullable=False)
     conclusion: Mapped[str] = mapped_column(String, nullable=True)
+    # Счётчик изменений ответов, оценок, комментариев и файлов работы (входит в ETag, см. versions.py)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index('ix_works_student_id_status_created_at', 'student_id', 'status', 'created_at'),
+        # Покрывающий: сводка статусов по задачам учителя читается только из индекса
+        Index(
+            'ix_works_task_id_status_created_at', 'task_id', 'status', 'created_at',
+            postgresql_include=['student_id', 'id'],
+        ),
+    )
+
     answers: Mapped[list["Answers"]] = relationship(
         "Answers",
         back_populates="work",
@@ -80,3 +96,35 @@ class Works(Base):
 
 
 
+
+
+class WorkScores(Base):
+    """
+    Сводка по работе для списков: набранный и максимальный балл, количество ответов.
+    Пересчитывается при изменении ответов, оценок и критериев (RepoWorkScores.refresh).
+    answered_count - ответы с текстом или файлами, graded_count - ответы, за которые выставлены баллы.
+    """
+    __tablename__ = "work_scores"
+
+    work_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("works.id", ondelete="CASCADE"), primary_key=True)
+    score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    answers_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    answered_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    graded_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class WorkDocuments(Base):
+    """
+    Готовый документ WorkRead по работе (в полях file вместо ссылок лежат ключи файлов).
+    Пересобирается при записи работы, оценок и комментариев (RepoWorkDocuments.refresh).
+    source_key - версии работы и задачи, из которых собран документ: при расхождении
+    документ устарел и пересобирается при чтении.
+    """
+    __tablename__ = "work_documents"
+
+    work_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("works.id", ondelete="CASCADE"), primary_key=True)
+    document: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    source_key: Mapped[str] = mapped_column(String, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,80 @@
+import uuid
+from itertools import chain
+
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.model_comments import Comments, Coordinates
+from app.models.model_files import AnswerFiles
+from app.models.model_tasks import Criterions, Exercises, Tasks
+from app.models.model_works import Answers, Assessments, Works
+
+
+# Вложенная сущность -> (уровень родителя, FK на родителя, relationship на родителя)
+PARENTS = {
+    Answers: ("work", "work_id", "work"),
+    Assessments: ("answer", "answer_id", "answer"),
+    Comments: ("answer", "answer_id", "answer"),
+    AnswerFiles: ("answer", "answer_id", "answer"),
+    Coordinates: ("comment", "comment_id", "comment"),
+    Exercises: ("task", "task_id", "task"),
+    Criterions: ("exercise", "exercise_id", "exercise"),
+}
+
+
+def _parent_id(obj, fk: str, relation: str) -> uuid.UUID | None:
+    """
+    id родителя без обращений к базе: из загруженного FK или из загруженного relationship.
+    Новый родитель (ещё без id) сам попадёт в session.new и будет учтён отдельно.
+    """
+    attrs = inspect(obj).attrs
+    value = attrs[fk].loaded_value
+    if isinstance(value, uuid.UUID):
+        return value
+    parent = attrs[relation].loaded_value
+    identity = inspect(parent).identity if parent is not None and hasattr(parent, "__mapper__") else None
+    return identity[0] if identity else None
+
+
+@event.listens_for(Session, "before_flush")
+def bump_versions(session: Session, flush_context, instances):
+    """
+    Увеличивает works.version / tasks.version при любой записи вложенных сущностей через ORM:
+    ответов, оценок, комментариев (и их координат), файлов ответов, упражнений и критериев.
+    Версия вместе с updated_at образует ETag работы и задачи.
+    Запись в обход ORM (update()/delete() по таблицам) должна увеличивать версию сама.
+    """
+    parents: dict[str, set[uuid.UUID]] = {level: set() for level in ("work", "answer", "comment", "task", "exercise")}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        spec = PARENTS.get(type(obj))
+        if spec is None:
+            continue
+        level, fk, relation = spec
+        parent_id = _parent_id(obj, fk, relation)
+        if parent_id is not None:
+            parents[level].add(parent_id)
+
+    work_conditions = []
+    if parents["work"]:
+        work_conditions.append(Works.id.in_(parents["work"]))
+    if parents["answer"]:
+        work_conditions.append(Works.id.in_(select(Answers.work_id).where(Answers.id.in_(parents["answer"]))))
+    if parents["comment"]:
+        work_conditions.append(Works.id.in_(
+            select(Answers.work_id)
+            .join(Comments, Comments.answer_id == Answers.id)
+            .where(Comments.id.in_(parents["comment"]))
+        ))
+
+    task_conditions = []
+    if parents["task"]:
+        task_conditions.append(Tasks.id.in_(parents["task"]))
+    if parents["exercise"]:
+        task_conditions.append(Tasks.id.in_(select(Exercises.task_id).where(Exercises.id.in_(parents["exercise"]))))
+
+    # Через connection, а не session.execute: иначе autoflush внутри flush
+    connection = session.connection()
+    for model, conditions in ((Works, work_conditions), (Tasks, task_conditions)):
+        if conditions:
+            table = model.__table__
+            connection.execute(update(table).where(or_(*conditions)).values(version=table.c.version + 1))
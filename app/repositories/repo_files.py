@@ -0,0 +1,156 @@
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, union, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.boto import is_cas_key, object_exists
+from app.models.model_comments import Comments
+from app.models.model_files import AnswerFiles, S3ObjectRefs
+from app.models.model_tasks import Exercises
+
+
+class RepoFiles:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def stream_referenced_keys(self, batch_size: int = 5000) -> AsyncIterator[str]:
+        """
+        Все ключи объектов, на которые ссылается БД (AnswerFiles.key, Comments.files,
+        Exercises.files), без повторов и в побайтовом порядке (COLLATE "C") -
+        в том же порядке S3 отдаёт листинг бакета. Читается потоком, пачками batch_size.
+        """
+        keys = union(
+            select(AnswerFiles.key.label("key")),
+            select(func.unnest(Comments.files).label("key")),
+            select(func.unnest(Exercises.files).label("key")),
+        ).subquery()
+        stmt = (
+            select(keys.c.key)
+            .order_by(keys.c.key.collate("C"))
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for key in result:
+            yield key
+
+    async def acquire(self, keys: Iterable[str]):
+        """
+        Увеличивает счётчики ссылок для привязываемых ключей хранения по содержимому.
+        Ключ с надгробием (счётчик обнулялся, объект удалён или удаляется) привязывается заново,
+        только если объект есть в хранилище: проверка идёт под блокировкой строки счётчика,
+        после commit параллельного удаления. Иначе - 409, файл нужно загрузить заново.
+        """
+        counts = Counter(key for key in keys if is_cas_key(key))
+        if not counts:
+            return
+        stmt = insert(S3ObjectRefs).values([
+            {"key": key, "refcount": count} for key, count in counts.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[S3ObjectRefs.key],
+            set_={"refcount": S3ObjectRefs.refcount + stmt.excluded.refcount},
+            where=S3ObjectRefs.released_at.is_(None),
+        ).returning(S3ObjectRefs.key)
+        acquired = set((await self.session.execute(stmt)).scalars())
+
+        released = sorted(key for key in counts if key not in acquired)
+        if not released:
+            return
+        await self.session.execute(
+            select(S3ObjectRefs.key).where(S3ObjectRefs.key.in_(released)).with_for_update()
+        )
+        for key in released:
+            if not await object_exists(key):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"File {key} was deleted from storage, upload it again",
+                )
+            await self.session.execute(
+                update(S3ObjectRefs)
+                .where(S3ObjectRefs.key == key)
+                .values(refcount=counts[key], released_at=None)
+            )
+
+    async def release(self, keys: Iterable[str]) -> set[str]:
+        """
+        Уменьшает счётчики ссылок и возвращает ключи, на которые больше никто не ссылается -
+        только их можно удалять из хранилища. Строки счётчиков блокируются до конца транзакции,
+        чтобы параллельная привязка того же ключа не потерялась.
+        Обнулённые счётчики остаются надгробиями (см. S3ObjectRefs), в том числе для ключей,
+        у которых строки не было: параллельная привязка дождётся commit и увидит надгробие.
+        """
+        counts = Counter(key for key in keys if is_cas_key(key))
+        if not counts:
+            return set()
+
+        stmt = (
+            select(S3ObjectRefs)
+            .where(S3ObjectRefs.key.in_(counts))
+            .with_for_update()
+        )
+        refs = {ref.key: ref for ref in (await self.session.execute(stmt)).scalars()}
+
+        unreferenced = set()
+        for key, count in counts.items():
+            ref = refs.get(key)
+            if ref is None or ref.released_at is not None or ref.refcount <= count:
+                unreferenced.add(key)
+                continue
+            await self.session.execute(
+                update(S3ObjectRefs)
+                .where(S3ObjectRefs.key == key)
+                .values(refcount=S3ObjectRefs.refcount - count)
+            )
+        if unreferenced:
+            stmt = insert(S3ObjectRefs).values([
+                {"key": key, "refcount": 0, "released_at": func.now()} for key in sorted(unreferenced)
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[S3ObjectRefs.key],
+                set_={
+                    "refcount": 0,
+                    "released_at": func.coalesce(S3ObjectRefs.released_at, stmt.excluded.released_at),
+                },
+            )
+            await self.session.execute(stmt)
+        return unreferenced
+
+    async def get_released(self, keys: Iterable[str]) -> set[str]:
+        """
+        Ключи хранения по содержимому, которые можно удалять: с надгробием или без строки счётчика.
+        Строки блокируются до конца транзакции - повторная попытка удаления не пересечётся
+        с привязкой заново (acquire).
+        """
+        keys = sorted({key for key in keys if is_cas_key(key)})
+        if not keys:
+            return set()
+        stmt = (
+            select(S3ObjectRefs.key, S3ObjectRefs.released_at)
+            .where(S3ObjectRefs.key.in_(keys))
+            .with_for_update()
+        )
+        live = {key for key, released_at in await self.session.execute(stmt) if released_at is None}
+        return set(keys) - live
+
+    async def prune_tombstones(self, older_than: datetime) -> int:
+        """Удаляет надгробия счётчиков, обнулённых раньше older_than; возвращает их количество"""
+        stmt = (
+            delete(S3ObjectRefs)
+            .where(S3ObjectRefs.released_at.is_not(None), S3ObjectRefs.released_at < older_than)
+            .returning(S3ObjectRefs.key)
+        )
+        return len((await self.session.execute(stmt)).all())
+
+    async def get_referenced(self, keys: Iterable[str]) -> set[str]:
+        """Ключи хранения по содержимому, у которых есть ссылки"""
+        keys = [key for key in keys if is_cas_key(key)]
+        if not keys:
+            return set()
+        stmt = select(S3ObjectRefs.key).where(
+            S3ObjectRefs.key.in_(keys), S3ObjectRefs.refcount > 0, S3ObjectRefs.released_at.is_(None)
+        )
+        return set((await self.session.execute(stmt)).scalars())
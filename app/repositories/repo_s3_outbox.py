@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Sequence
+import uuid
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.model_files import S3DeleteOutbox
+
+
+class RepoS3Outbox:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def add(self, keys: Iterable[str]):
+        """Ставит ключи в очередь на удаление в рамках текущей транзакции (без commit)"""
+        for key in dict.fromkeys(key for key in keys if key):
+            self.session.add(S3DeleteOutbox(key=key))
+
+    async def claim(self, limit: int) -> Sequence[S3DeleteOutbox]:
+        """
+        Забирает пачку записей, у которых подошло время попытки.
+        Строки блокируются до конца транзакции, параллельные воркеры их пропускают.
+        """
+        stmt = (
+            select(S3DeleteOutbox)
+            .where(S3DeleteOutbox.next_attempt_at <= func.now())
+            .order_by(S3DeleteOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def remove(self, ids: list[uuid.UUID]):
+        if not ids:
+            return
+        await self.session.execute(delete(S3DeleteOutbox).where(S3DeleteOutbox.id.in_(ids)))
+
+    async def postpone(self, entry: S3DeleteOutbox, error: str, base: int, max_delay: int):
+        """Откладывает запись с экспоненциальной задержкой: base * 2^attempts, не больше max_delay"""
+        delay = min(base * 2 ** entry.attempts, max_delay)
+        await self.session.execute(
+            update(S3DeleteOutbox)
+            .where(S3DeleteOutbox.id == entry.id)
+            .values(
+                attempts=S3DeleteOutbox.attempts + 1,
+                last_error=error[:1000],
+                next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            )
+        )
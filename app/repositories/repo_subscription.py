@@ -43,6 +43,29 @@ class RepoSubscription:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_entitlements(self, user_id: uuid.UUID):
+        """
+        Права по активной подписке пользователя одним запросом без загрузки ORM-объектов:
+        строка (plan_id, finish_at, verifications_count, used_checks) или None.
+        """
+        stmt = (
+            select(
+                Subscriptions.plan_id,
+                Subscriptions.finish_at,
+                Plans.verifications_count,
+                Subscriptions.used_checks,
+            )
+            .outerjoin(Plans, Subscriptions.plan_id == Plans.id)
+            .where(
+                Subscriptions.user_id == user_id,
+                Subscriptions.finish_at > func.now()
+            )
+            .order_by(Subscriptions.started_at.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.first()
+
     async def get_by_user_id_any(self, user_id: uuid.UUID) -> Optional[Subscriptions]:
         """Получение подписки пользователя без проверки активности (одна запись на пользователя)."""
         stmt = (
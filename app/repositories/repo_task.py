@@ -1,12 +1,13 @@
 from time import time
 import uuid
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
-from app.models.model_tasks import Exercises, Tasks
+from app.models.model_tasks import Criterions, Exercises, Tasks
 from app.models.model_works import Assessments, Answers, Works
 from app.models.model_subjects import Subjects
+from app.repositories.repo_work_scores import RepoWorkScores
 from app.schemas.schema_tasks import TaskRead, TasksFilters
 from app.utils.logger import logger
 
@@ -28,6 +29,39 @@ class RepoTasks():
         response = await self.session.execute(stmt)
         return response.scalars().first()
 
+    async def refresh_max_scores(self, task_ids: list[uuid.UUID]):
+        """
+        Пересчитывает max_score упражнений задач по критериям в текущей транзакции.
+        Вызывается после любой записи критериев, до пересчёта сводки баллов работ.
+        """
+        if not task_ids:
+            return
+        await self.session.flush()
+
+        criterions_sum = (
+            select(func.coalesce(func.sum(Criterions.score), 0))
+            .where(Criterions.exercise_id == Exercises.id)
+            .scalar_subquery()
+        )
+        await self.session.execute(
+            update(Exercises)
+            .where(Exercises.task_id.in_(task_ids))
+            .values(max_score=criterions_sum)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_version(self, task_id: uuid.UUID):
+        """Версия задачи для ETag без загрузки упражнений: (updated_at, version) или None"""
+        stmt = select(Tasks.updated_at, Tasks.version).where(Tasks.id == task_id)
+        response = await self.session.execute(stmt)
+        return response.first()
+
+    async def get_students_ids(self, task_id: uuid.UUID) -> list[uuid.UUID]:
+        """Ученики, которым выдана задача"""
+        stmt = select(Works.student_id).where(Works.task_id == task_id).distinct()
+        response = await self.session.execute(stmt)
+        return list(response.scalars())
+
     async def create_works(
         self,
         task: Tasks,
@@ -70,6 +104,9 @@ class RepoTasks():
         self.session.add_all(all_answers)
         self.session.add_all(all_a_criterions)
 
+        # Сводка баллов новых работ
+        await RepoWorkScores(self.session).refresh(work_ids=[work.id for work in works])
+
     async def get_filters(self, teacher_id: uuid.UUID):
         """
         Получение доступных фильтров для учителя: список предметов и задач
@@ -1,461 +1,654 @@
+from typing import Literal
 import uuid
 from fastapi import HTTPException
-from sqlalchemy import case, func, select
+from sqlalchemy import Float, StatementLambdaElement, String, Text, and_, case, cast, delete, distinct, exists, extract, func, insert, lambda_stmt, literal, literal_column, or_, outerjoin, select, tuple_, type_coerce, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import selectinload
 
 from app.models.model_classroom import Classrooms
 from app.models.model_comments import Comments, Coordinates
 from app.models.model_subjects import Subjects
 from app.models.model_tasks import Criterions, Exercises, Tasks
-from app.models.model_users import RoleUser, Users, teachers_students
-from app.models.model_works import Assessments, StatusWork, Works, Answers
-from app.models.model_files import AnswerFiles
-from app.schemas.schema_work import SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorkAllFilters
+from app.models.model_users import RoleUser, Users, teachers_students, users_full_name
+from app.models.model_works import Assessments, StatusWork, Works, Answers, WorkScores
+from app.models.model_files import AnswerFiles, StatusAnswerFile
+from app.schemas.schema_work import SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorksPageParams, WorksSort, WorksSummaryFilters
 from app.utils.logger import logger
 
-class RepoWorks():
-    def __init__(self, session):
-        self.session = session
-
-    async def get_all(self, filters: WorkAllFilters, user: Users):
-        # 1. Определяем алиасы для удобства
-        # Используем алиас для связей, которые будут использоваться в агрегации
-        
-        # Набранный балл: сумма баллов тех критериев Criterions, где Assessments.points - это баллы
-        # Используем CASE для условного суммирования
-        
-        # 3. Базовый запрос с JOINs
-        stmt = (
-            select(
-                Works.id.label("id"),
-                func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
-                Tasks.name.label("task_name"),
-                func.sum(Assessments.points).label("score"),
-                func.sum(Criterions.score).label("max_score"),
-                Works.status.label("status_work")
+WorksScope = Literal["teacher", "student"]
+
+
+def works_search_condition(scope: WorksScope, search: str):
+    """
+    Работы, у которых имя ученика (для учителя) или название задачи похожи на search.
+    Совпадения ищутся подзапросами по trigram-индексам users и tasks (оператор <% -
+    search похож на часть строки), а не проверкой каждой работы учителя.
+    correlate(None): внешний запрос тоже читает users и tasks, подзапросы от него не зависят.
+    """
+    query = type_coerce(search, String)
+    by_task = Works.task_id.in_(select(Tasks.id).where(query.op("<%")(Tasks.name)).correlate(None))
+    if scope == "student":
+        return by_task
+    by_student = Works.student_id.in_(
+        select(Users.id).where(query.op("<%")(users_full_name)).correlate(None)
+    )
+    return or_(by_student, by_task)
+
+
+def works_relevance(scope: WorksScope, search: str):
+    """Похожесть работы на search: лучшая из похожестей имени ученика и названия задачи"""
+    query = type_coerce(search, String)
+    by_task = func.word_similarity(query, Tasks.name, type_=Float)
+    if scope == "student":
+        return by_task
+    return func.greatest(func.word_similarity(query, users_full_name, type_=Float), by_task, type_=Float)
+
+
+def works_sort_key(sort: WorksSort | None, scope: WorksScope = "teacher", search: str | None = None):
+    if sort is WorksSort.score:
+        return func.coalesce(WorkScores.score, 0)
+    if sort is WorksSort.status:
+        return Works.status
+    if sort is WorksSort.relevance and search:
+        return works_relevance(scope, search)
+    return Works.created_at
+
+
+def _works_list_where(
+    stmt: StatementLambdaElement,
+    scope: WorksScope,
+    user_id: uuid.UUID,
+    filters: SmartFiltersWorkTeacher | SmartFiltersWorkStudent,
+) -> StatementLambdaElement:
+    """
+    Условия видимости и фильтры списка работ. Каждое условие - отдельная лямбда:
+    SQL зависит только от набора заданных фильтров, а их значения уходят в bind-параметры,
+    поэтому для каждого набора запрос компилируется один раз и дальше берётся из кэша.
+    Значения фильтров читаются в локальные переменные: лямбды должны замыкать только их.
+    """
+    if scope == "teacher":
+        # Только ученики этого учителя (и, если указано, из выбранных классов)
+        if filters.classrooms_ids:
+            classrooms_ids = list(filters.classrooms_ids)
+            stmt += lambda s: s.where(
+                Tasks.teacher_id == user_id,
+                exists().where(
+                    teachers_students.c.student_id == Works.student_id,
+                    teachers_students.c.teacher_id == user_id,
+                    teachers_students.c.classroom_id.in_(classrooms_ids),
+                ),
             )
-            .select_from(Works)
-            .join(Users, Works.student_id == Users.id) 
-            .join(Tasks, Works.task_id == Tasks.id)
-            .join(Answers, Works.id == Answers.work_id) 
-            .join(Exercises, Answers.exercise_id == Exercises.id)
-            .join(Criterions, Exercises.id == Criterions.exercise_id)
-            .join(Assessments, (Answers.id == Assessments.answer_id) & (Criterions.id == Assessments.criterion_id))
-            .join(Subjects, Tasks.subject_id == Subjects.id, isouter=True)
-        )
-
-        # 4. Группировка
-        # Группируем по уникальным полям работы, чтобы агрегировать баллы (SUM)
-        stmt = stmt.group_by(
-            Works.id,
-            Users.first_name,
-            Users.last_name,
-            Tasks.name,
-            Works.status
-        )
-
-        # 5. Фильтрация по роли пользователя
-        if user.role == RoleUser.student:
-            stmt = stmt.where(Works.student_id == user.id)
-        elif user.role == RoleUser.teacher:
-            stmt = stmt.where(Tasks.teacher_id == user.id)
-            stmt = stmt.join(teachers_students, user.id == teachers_students.c.teacher_id )
-
-            if filters.classroom_id:
-                stmt = stmt.join(Classrooms, teachers_students.c.classroom_id == Classrooms.id)
-                stmt = stmt.where(Classrooms.id == filters.classroom_id)
-
-            if filters.student_id:
-                stmt = stmt.where(Works.student_id == filters.student_id)
-
-        # 6. Фильтрация по параметрам WorkAllFilters
-        if filters.subject_id:
-            stmt = stmt.where(Tasks.subject_id == filters.subject_id)
-
-
-        if filters.status_work:
-            stmt = stmt.where(Works.status == filters.status_work)
-
-
-        # 7. Выполнение запроса и расчет процента
-        result = await self.session.execute(stmt)
-        # Получаем список кортежей (id, student_name, task_name, score, max_score, status_work)
-        return result.all()
-
-
-    async def get_all_student(
-        self,
-        user: Users,
-        subject_id: uuid.UUID|None = None,
-        status_work: StatusWork| None = None,
-    ):
-
-        stmt = (
-            select(
-                Works.id.label("id"),
-                func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
-                Tasks.name.label("task_name"),
-                func.sum(Assessments.points).label("score"),
-                func.sum(Criterions.score).label("max_score"),
-                Works.status.label("status_work")
+        else:
+            stmt += lambda s: s.where(
+                Tasks.teacher_id == user_id,
+                exists().where(
+                    teachers_students.c.student_id == Works.student_id,
+                    teachers_students.c.teacher_id == user_id,
+                ),
             )
-            .select_from(Works)
-            .join(Users, Works.student_id == Users.id) 
-            .join(Tasks, Works.task_id == Tasks.id)
-            .join(Answers, Works.id == Answers.work_id) 
-            .join(Exercises, Answers.exercise_id == Exercises.id)
-            .join(Criterions, Exercises.id == Criterions.exercise_id)
-            .join(Assessments, (Answers.id == Assessments.answer_id) & (Criterions.id == Assessments.criterion_id))
-            .join(Subjects, Tasks.subject_id == Subjects.id, isouter=True)
-        )
 
-        stmt = stmt.group_by(
-            Works.id,
-            Users.first_name,
-            Users.last_name,
-            Tasks.name,
-            Works.status
+        if filters.students_ids:
+            students_ids = list(filters.students_ids)
+            stmt += lambda s: s.where(Works.student_id.in_(students_ids))
+    else:
+        # Только работы от учителей, к которым привязан ученик
+        stmt += lambda s: s.where(
+            Works.student_id == user_id,
+            exists().where(
+                teachers_students.c.student_id == user_id,
+                teachers_students.c.teacher_id == Tasks.teacher_id,
+            ),
         )
 
-        # 5. Фильтрация по роли пользователя
-
-        stmt = stmt.where(Works.student_id == user.id)
-
-        # 6. Фильтрация по параметрам WorkAllFilters
-        if subject_id:
-            stmt = stmt.where(Tasks.subject_id == subject_id)
-
-
-        if status_work:
-            stmt = stmt.where(Works.status == status_work)
-
-
-        # 7. Выполнение запроса и расчет процента
-        result = await self.session.execute(stmt)
-        # Получаем список кортежей (id, student_name, task_name, score, max_score, status_work)
-        return result.all()
-
-    async def get_all_teacher(
-        self,
-        user: Users,
-        student: uuid.UUID|None = None,
-        subject: uuid.UUID|None = None,
-        statuses: list[StatusWork]| None = None,
-    ):
-
-
-        stmt = (
-            select(
-                Works.id.label("id"),
-                func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
-                Tasks.name.label("task_name"),
-                Subjects.name.label('subject'),
-                func.sum(Assessments.points).label("score"),
-                func.sum(Criterions.score).label("max_score"),
-                Works.status.label("status")
-            )
-            .select_from(Tasks)
-            .where(Tasks.teacher_id == user.id)
+        if filters.teachers_ids:
+            teachers_ids = list(filters.teachers_ids)
+            stmt += lambda s: s.where(Tasks.teacher_id.in_(teachers_ids))
+
+    if filters.statuses:
+        statuses = [StatusWork(s) for s in filters.statuses]
+        stmt += lambda s: s.where(Works.status.in_(statuses))
+
+    if filters.tasks_ids:
+        tasks_ids = list(filters.tasks_ids)
+        stmt += lambda s: s.where(Works.task_id.in_(tasks_ids))
+
+    if filters.subject_id:
+        subject_id = filters.subject_id
+        stmt += lambda s: s.where(Tasks.subject_id == subject_id)
+
+    if filters.min:
+        min_date = filters.min
+        stmt += lambda s: s.where(Works.created_at >= min_date)
+
+    if filters.max:
+        max_date = filters.max
+        stmt += lambda s: s.where(Works.created_at <= max_date)
+
+    search = (filters.search or "").strip()
+    if search:
+        # Условие с search внутри: лямбда замыкает готовое выражение, значение уходит в параметр
+        search_condition = works_search_condition(scope, search)
+        stmt += lambda s: s.where(search_condition)
+
+    return stmt
+
+
+def works_list_stmt(
+    scope: WorksScope,
+    user_id: uuid.UUID,
+    filters: SmartFiltersWorkTeacher | SmartFiltersWorkStudent,
+    page: WorksPageParams,
+    after: tuple | None = None,
+) -> StatementLambdaElement:
+    """
+    Страница списка работ учителя или ученика, отсортированная по (ключ сортировки, id).
+    after - (значение ключа, id) последней строки предыдущей страницы.
+    Запрашивается limit + 1 строка, чтобы понять, есть ли следующая страница.
+    Баллы берутся из сводки work_scores: одна строка на работу, без агрегации по ответам.
+    """
+    stmt = lambda_stmt(lambda: (
+        select(
+            Works.id.label("id"),
+            func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
+            Tasks.name.label("task_name"),
+            Subjects.name.label("subject"),
+            WorkScores.score.label("score"),
+            WorkScores.max_score.label("max_score"),
+            Works.status.label("status"),
         )
+        .select_from(Works)
+        .join(Users, Works.student_id == Users.id)
+        .join(Tasks, Works.task_id == Tasks.id)
+        .join(Subjects, Tasks.subject_id == Subjects.id)
+        .outerjoin(WorkScores, WorkScores.work_id == Works.id)
+    ))
+    stmt = _works_list_where(stmt, scope, user_id, filters)
+
+    # Выражение сортировки входит в ключ кэша лямбды: на каждую сортировку - свой запрос
+    sort_key = works_sort_key(page.sort, scope, (filters.search or "").strip())
+    stmt += lambda s: s.add_columns(sort_key.label("sort_key"))
+
+    if after is not None:
+        # type_coerce: параметр получает тип колонки (timestamptz, statuswork), а не тип значения
+        after_key, after_id = after
+        if page.order == "desc":
+            stmt += lambda s: s.where(tuple_(sort_key, Works.id) < tuple_(type_coerce(after_key, sort_key.type), after_id))
+        else:
+            stmt += lambda s: s.where(tuple_(sort_key, Works.id) > tuple_(type_coerce(after_key, sort_key.type), after_id))
+
+    if page.order == "desc":
+        stmt += lambda s: s.order_by(sort_key.desc(), Works.id.desc())
+    else:
+        stmt += lambda s: s.order_by(sort_key.asc(), Works.id.asc())
+
+    if page.limit is not None:
+        limit = page.limit + 1
+        stmt += lambda s: s.limit(limit)
+
+    return stmt
+
+
+def works_count_stmt(
+    scope: WorksScope,
+    user_id: uuid.UUID,
+    filters: SmartFiltersWorkTeacher | SmartFiltersWorkStudent,
+) -> StatementLambdaElement:
+    """Количество работ по тем же условиям, что и works_list_stmt (без лишних соединений)"""
+    stmt = lambda_stmt(lambda: (
+        select(func.count(Works.id))
+        .select_from(Works)
+        .join(Tasks, Works.task_id == Tasks.id)
+    ))
+    return _works_list_where(stmt, scope, user_id, filters)
+
+
+def _json_object(**fields):
+    """json_build_object с ключами-литералами: ключи не уходят в bind-параметры"""
+    return func.json_build_object(*[
+        item for name, value in fields.items() for item in (literal_column(f"'{name}'"), value)
+    ])
+
+
+def _json_list(element, *where, select_from=None, order_by=None):
+    """Коррелированный подзапрос: JSON-массив элементов (пустой массив, если строк нет)"""
+    aggregated = func.json_agg(aggregate_order_by(element, order_by) if order_by is not None else element)
+    stmt = select(func.coalesce(aggregated, literal_column("'[]'::json")))
+    if select_from is not None:
+        stmt = stmt.select_from(select_from)
+    return stmt.where(*where).scalar_subquery()
+
+
+def _json_files(keys_column):
+    """
+    Ключи файлов из ARRAY-колонки -> [{"key", "file"}]. В "file" пока лежит ключ:
+    ссылки подписываются после загрузки документа (attach_work_file_urls)
+    """
+    keys = func.unnest(keys_column).table_valued("key").render_derived()
+    return _json_list(_json_object(key=keys.c.key, file=keys.c.key), select_from=keys)
+
+
+def _str_datetime(column):
+    """Дата в том же виде, что str(datetime) в UTC, как её отдаёт ORM-путь: 2026-01-01 10:00:00[.ffffff]+00:00"""
+    utc = func.timezone(literal_column("'UTC'"), column)
+    micro = func.to_char(utc, literal_column("'US'"), type_=String)
+    return (
+        func.to_char(utc, literal_column("'YYYY-MM-DD HH24:MI:SS'"), type_=String)
+        + case((micro != literal_column("'000000'"), literal_column("'.'", String) + micro), else_=literal_column("''", String))
+        + literal_column("'+00:00'", String)
+    )
+
+
+def work_document_json():
+    """
+    Документ WorkRead целиком, собранный в Postgres вложенными json_agg.
+    Выражение по строке works JOIN tasks. Ответы упорядочены по порядку упражнений в задаче.
+    """
+    criterion = _json_list(
+        _json_object(id=Criterions.id, name=Criterions.name, score=Criterions.score),
+        Criterions.id == Assessments.criterion_id,
+    )
+    assessments = _json_list(
+        _json_object(
+            id=Assessments.id,
+            answer_id=Assessments.answer_id,
+            criterion_id=Assessments.criterion_id,
+            points=Assessments.points,
+            criterion=criterion,
+        ),
+        Assessments.answer_id == Answers.id,
+    )
+    coordinates = _json_list(
+        _json_object(x1=Coordinates.x1, y1=Coordinates.y1, x2=Coordinates.x2, y2=Coordinates.y2),
+        Coordinates.comment_id == Comments.id,
+    )
+    comments = _json_list(
+        _json_object(
+            id=Comments.id,
+            answer_id=Comments.answer_id,
+            answerfile_id=Comments.answerfile_id,
+            description=Comments.description,
+            type_id=Comments.type_id,
+            coordinates=coordinates,
+            files=_json_files(Comments.files),
+        ),
+        Comments.answer_id == Answers.id,
+    )
+    answer_files = _json_list(
+        _json_object(id=AnswerFiles.id, key=AnswerFiles.key, file=AnswerFiles.key, ai_status=AnswerFiles.ai_status),
+        AnswerFiles.answer_id == Answers.id,
+    )
+    exercise = _json_object(
+        id=Exercises.id,
+        task_id=Exercises.task_id,
+        name=Exercises.name,
+        description=Exercises.description,
+        order_index=Exercises.order_index,
+        files=_json_files(Exercises.files),
+    )
+    answers = _json_list(
+        _json_object(
+            id=Answers.id,
+            work_id=Answers.work_id,
+            exercise_id=Answers.exercise_id,
+            text=Answers.text,
+            general_comment=Answers.general_comment,
+            files=answer_files,
+            exercise=exercise,
+            assessments=assessments,
+            comments=comments,
+        ),
+        Answers.work_id == Works.id,
+        select_from=outerjoin(Answers, Exercises, Answers.exercise_id == Exercises.id),
+        order_by=Exercises.order_index,
+    )
+    task = _json_object(
+        id=Tasks.id,
+        name=Tasks.name,
+        description=Tasks.description,
+        deadline=_str_datetime(Tasks.deadline),
+        subject_id=Tasks.subject_id,
+    )
+    document = _json_object(
+        id=Works.id,
+        task_id=Works.task_id,
+        student_id=Works.student_id,
+        finish_date=Works.finish_date,
+        status=Works.status,
+        conclusion=func.coalesce(Works.conclusion, literal_column("''")),
+        task=task,
+        answers=answers,
+    )
+    return document
+
+
+def work_document_source_key():
+    """Версии работы и задачи, из которых собирается документ (см. WorkDocuments.source_key)"""
+    return func.concat_ws(
+        literal_column("'-'"),
+        Works.version,
+        Tasks.version,
+        extract("epoch", Works.updated_at),
+        extract("epoch", Tasks.updated_at),
+    )
+
+
+def work_document_stmt(work_id: uuid.UUID):
+    """Документ работы и teacher_id задачи для проверки доступа - один запрос вместо цепочек selectinload"""
+    return (
+        select(Tasks.teacher_id, cast(work_document_json(), Text).label("document"))
+        .select_from(Works)
+        .join(Tasks, Works.task_id == Tasks.id)
+        .where(Works.id == work_id)
+    )
 
-        stmt = stmt.join(Subjects, Tasks.subject_id == Subjects.id)
-        if subject is not None:
-            stmt = stmt.where(Subjects.id == subject)
-
-        stmt = stmt.join(Works, Tasks.id == Works.task_id)
-        if statuses is not None :
-            stmt = stmt.where(Works.status.in_(statuses))
-
-        if student is not None:
-            stmt = stmt.where(Works.student_id == student)
-        
-        stmt = (
-            stmt.join(Users, Works.student_id == Users.id) 
-            .join(Answers, Works.id == Answers.work_id) 
-            .join(Exercises, Answers.exercise_id == Exercises.id)
-            .join(Criterions, Exercises.id == Criterions.exercise_id)
-            .join(Assessments, (Answers.id == Assessments.answer_id) & (Criterions.id == Assessments.criterion_id))
-        )
-
-        stmt = stmt.group_by(
-            Works.id,
-            Users.first_name,
-            Users.last_name,
-            Subjects.name,
-            Tasks.name,
-            Works.status
-        )
 
-        result = await self.session.execute(stmt)
-        # Получаем список кортежей (id, student_name, task_name, score, max_score, status_work)
-        return result.all()
+class RepoWorks():
+    def __init__(self, session):
+        self.session = session
 
-    async def get_smart_filters_teacher(self, teacher_id: uuid.UUID, filters: SmartFiltersWorkTeacher): 
+    async def get_smart_filters_teacher(self, teacher_id: uuid.UUID, filters: SmartFiltersWorkTeacher):
+        """
+        Фасеты для фильтров работ учителя: ученики, классы, статусы, задачи, предметы
+        и диапазон дат - одним запросом по работам учеников учителя с учётом фильтров.
+        """
         try:
-            stmt = (
+            rows = (
                 select(
-                    teachers_students.c.student_id  ,
+                    Works.id.label("work_id"),
+                    Works.status.label("status"),
+                    Works.created_at.label("created_at"),
+                    teachers_students.c.student_id.label("student_id"),
                     func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
-
-                    teachers_students.c.classroom_id,
+                    teachers_students.c.classroom_id.label("classroom_id"),
                     Classrooms.name.label("classroom_name"),
-
-                    Works.status,
-                    Works.created_at,
-
-                    Tasks.id.label('task_id'),
-                    Tasks.name.label('name'),
-
-                    Subjects.id.label('subject_id'),
-                    Subjects.name.label('subject'),
+                    Tasks.id.label("task_id"),
+                    Tasks.name.label("task_name"),
+                    Subjects.id.label("subject_id"),
+                    Subjects.name.label("subject_name"),
                 )
                 .select_from(teachers_students)
                 .join(Users, teachers_students.c.student_id == Users.id)
                 .outerjoin(Classrooms, teachers_students.c.classroom_id == Classrooms.id)
-                .outerjoin(Works, Users.id == Works.student_id)
-                .outerjoin(Tasks, Works.task_id == Tasks.id)
-                .outerjoin(Subjects, Tasks.subject_id == Subjects.id)
+                .join(Works, Works.student_id == teachers_students.c.student_id)
+                .join(Tasks, Works.task_id == Tasks.id)
+                .join(Subjects, Tasks.subject_id == Subjects.id)
                 .where(teachers_students.c.teacher_id == teacher_id)
                 .where(Tasks.teacher_id == teacher_id)
             )
 
-            # 2. Применение динамических фильтров
+            # Применение динамических фильтров
             if filters.students_ids:
-                stmt = stmt.where(Users.id.in_(filters.students_ids))
+                rows = rows.where(teachers_students.c.student_id.in_(filters.students_ids))
 
             if filters.classrooms_ids:
-                stmt = stmt.where(Classrooms.id.in_(filters.classrooms_ids))
+                rows = rows.where(teachers_students.c.classroom_id.in_(filters.classrooms_ids))
 
             if filters.statuses:
-                stmt = stmt.where(Works.status.in_(filters.statuses))
+                rows = rows.where(Works.status.in_(filters.statuses))
 
-            if filters.tasks_ids:                
-                stmt = stmt.where(Tasks.id.in_(filters.tasks_ids))
+            if filters.tasks_ids:
+                rows = rows.where(Tasks.id.in_(filters.tasks_ids))
 
             if filters.subject_id:
-                stmt = stmt.where(Subjects.id == filters.subject_id)
+                rows = rows.where(Subjects.id == filters.subject_id)
 
             if filters.min:
-                stmt = stmt.where(Works.created_at >= filters.min)
+                rows = rows.where(Works.created_at >= filters.min)
 
             if filters.max:
-                stmt = stmt.where(Works.created_at <= filters.max)
+                rows = rows.where(Works.created_at <= filters.max)
 
-            # 4. Добавляем DISTINCT, чтобы не было дублей при множественных связях
-            stmt = stmt.distinct()
+            if filters.search and filters.search.strip():
+                rows = rows.where(works_search_condition("teacher", filters.search.strip()))
 
-            response = await self.session.execute(stmt)
-            return response.mappings().all()
+            return await self._select_facets(rows.cte("filter_rows"), {
+                "students": ("student_id", "student_name"),
+                "classrooms": ("classroom_id", "classroom_name"),
+                "statuses": ("status",),
+                "tasks": ("task_id", "task_name"),
+                "subjects": ("subject_id", "subject_name"),
+            })
 
         except Exception as exc:
             logger.exception(exc)
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
-        
-    async def get_smart_filters_student(self, student_id: uuid.UUID, filters: SmartFiltersWorkStudent): 
 
+    async def get_smart_filters_student(self, student_id: uuid.UUID, filters: SmartFiltersWorkStudent):
+        """
+        Фасеты для фильтров работ ученика: учителя, статусы, задачи, предметы
+        и диапазон дат - одним запросом по работам ученика с учётом фильтров.
+        """
         try:
-            stmt = (
+            rows = (
                 select(
-                    teachers_students.c.teacher_id  ,
+                    Works.id.label("work_id"),
+                    Works.status.label("status"),
+                    Works.created_at.label("created_at"),
+                    teachers_students.c.teacher_id.label("teacher_id"),
                     func.concat(Users.first_name, " ", Users.last_name).label("teacher_name"),
-
-                    teachers_students.c.classroom_id,
-                    Classrooms.name.label("classroom_name"),
-
-                    Works.status,
-                    Works.created_at,
-
-                    Tasks.id.label('task_id'),
-                    Tasks.name.label('name'),
-
-                    Subjects.id.label('subject_id'),
-                    Subjects.name.label('subject'),
+                    Tasks.id.label("task_id"),
+                    Tasks.name.label("task_name"),
+                    Subjects.id.label("subject_id"),
+                    Subjects.name.label("subject_name"),
                 )
                 .select_from(teachers_students)
                 .join(Users, teachers_students.c.teacher_id == Users.id)
-                .outerjoin(Classrooms, teachers_students.c.classroom_id == Classrooms.id)
-                .outerjoin(Tasks, Users.id == Tasks.teacher_id)
-                .outerjoin(Works, Tasks.id == Works.task_id)
-                .outerjoin(Subjects, Tasks.subject_id == Subjects.id)
+                .join(Tasks, Tasks.teacher_id == teachers_students.c.teacher_id)
+                .join(Works, Works.task_id == Tasks.id)
+                .join(Subjects, Tasks.subject_id == Subjects.id)
                 .where(teachers_students.c.student_id == student_id)
                 .where(Works.student_id == student_id)
             )
 
-            # 2. Применение динамических фильтров
+            # Применение динамических фильтров
             if filters.teachers_ids:
-                stmt = stmt.where(Users.id.in_(filters.teachers_ids))
+                rows = rows.where(teachers_students.c.teacher_id.in_(filters.teachers_ids))
 
             if filters.statuses:
-                stmt = stmt.where(Works.status.in_(filters.statuses))
+                rows = rows.where(Works.status.in_(filters.statuses))
 
-            if filters.tasks_ids:                
-                stmt = stmt.where(Tasks.id.in_(filters.tasks_ids))
+            if filters.tasks_ids:
+                rows = rows.where(Tasks.id.in_(filters.tasks_ids))
 
             if filters.subject_id:
-                stmt = stmt.where(Subjects.id == filters.subject_id)
+                rows = rows.where(Subjects.id == filters.subject_id)
 
             if filters.min:
-                stmt = stmt.where(Works.created_at >= filters.min)
+                rows = rows.where(Works.created_at >= filters.min)
 
             if filters.max:
-                stmt = stmt.where(Works.created_at <= filters.max)
+                rows = rows.where(Works.created_at <= filters.max)
 
-            # 4. Добавляем DISTINCT, чтобы не было дублей при множественных связях
-            stmt = stmt.distinct()
+            if filters.search and filters.search.strip():
+                rows = rows.where(works_search_condition("student", filters.search.strip()))
 
-            response = await self.session.execute(stmt)
-            return response.mappings().all()
+            return await self._select_facets(rows.cte("filter_rows"), {
+                "teachers": ("teacher_id", "teacher_name"),
+                "statuses": ("status",),
+                "tasks": ("task_id", "task_name"),
+                "subjects": ("subject_id", "subject_name"),
+            })
 
         except Exception as exc:
             logger.exception(exc)
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    async def get_works_list_teacher(self, teacher_id: uuid.UUID, filters: SmartFiltersWorkTeacher):
-        """Получение списка работ для учителя с применением умных фильтров"""
+    async def get_status_summary_teacher(self, teacher_id: uuid.UUID, filters: WorksSummaryFilters):
+        """
+        Количество работ учеников учителя по статусам: по задачам, по классам и всего -
+        одним запросом GROUPING SETS. GROUPING(task_id, classroom_id) определяет набор строки:
+        1 - задача, 2 - класс, 3 - итог по статусу.
+        """
         try:
-            # Базовый запрос для получения работ с подсчетом баллов
-            stmt = (
+            rows = (
                 select(
-                    Works.id.label("id"),
-                    func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
+                    Works.id.label("work_id"),
+                    Works.status.label("status"),
+                    Tasks.id.label("task_id"),
                     Tasks.name.label("task_name"),
-                    Subjects.name.label('subject'),
-                    func.sum(Assessments.points).label("score"),
-                    func.sum(Criterions.score).label("max_score"),
-                    Works.status.label("status")
+                    teachers_students.c.classroom_id.label("classroom_id"),
+                    Classrooms.name.label("classroom_name"),
                 )
-                .select_from(Works)
-                .join(Users, Works.student_id == Users.id)
-                .join(Tasks, Works.task_id == Tasks.id)
-                .join(Subjects, Tasks.subject_id == Subjects.id)
-                .join(teachers_students, 
-                      (teachers_students.c.student_id == Works.student_id) & 
-                      (teachers_students.c.teacher_id == teacher_id))
-                .outerjoin(Answers, Works.id == Answers.work_id)
-                .outerjoin(Exercises, Answers.exercise_id == Exercises.id)
-                .outerjoin(Criterions, Exercises.id == Criterions.exercise_id)
-                .outerjoin(Assessments, 
-                          (Answers.id == Assessments.answer_id) & 
-                          (Criterions.id == Assessments.criterion_id))
+                .select_from(Tasks)
+                .join(Works, Works.task_id == Tasks.id)
+                .join(teachers_students, and_(
+                    teachers_students.c.student_id == Works.student_id,
+                    teachers_students.c.teacher_id == teacher_id,
+                ))
+                .outerjoin(Classrooms, teachers_students.c.classroom_id == Classrooms.id)
                 .where(Tasks.teacher_id == teacher_id)
             )
 
-            # Применение фильтров
-            if filters.students_ids:
-                stmt = stmt.where(Users.id.in_(filters.students_ids))
-
-            if filters.classrooms_ids:
-                # Используем join для фильтрации по классам
-                stmt = stmt.join(Classrooms, teachers_students.c.classroom_id == Classrooms.id)
-                stmt = stmt.where(Classrooms.id.in_(filters.classrooms_ids))
-
-            if filters.statuses:
-                # Преобразуем строки в StatusWork enum
-                status_enum_list = [StatusWork(s) for s in filters.statuses]
-                stmt = stmt.where(Works.status.in_(status_enum_list))
-
-            if filters.tasks_ids:
-                stmt = stmt.where(Tasks.id.in_(filters.tasks_ids))
-
             if filters.subject_id:
-                stmt = stmt.where(Subjects.id == filters.subject_id)
+                rows = rows.where(Tasks.subject_id == filters.subject_id)
 
             if filters.min:
-                stmt = stmt.where(Works.created_at >= filters.min)
+                rows = rows.where(Works.created_at >= filters.min)
 
             if filters.max:
-                stmt = stmt.where(Works.created_at <= filters.max)
-
-            # Группировка для агрегации баллов
-            stmt = stmt.group_by(
-                Works.id,
-                Users.first_name,
-                Users.last_name,
-                Subjects.name,
-                Tasks.name,
-                Works.status
-            )
+                rows = rows.where(Works.created_at <= filters.max)
 
-            result = await self.session.execute(stmt)
-            return result.all()
-
-        except Exception as exc:
-            logger.exception(exc)
-            await self.session.rollback()
-            raise HTTPException(status_code=500, detail="Internal Server Error")
-
-    async def get_works_list_student(self, student_id: uuid.UUID, filters: SmartFiltersWorkStudent):
-        """Получение списка работ для ученика с применением умных фильтров"""
-        try:
-            # Базовый запрос для получения работ с подсчетом баллов
+            rows = rows.cte("summary_rows")
             stmt = (
                 select(
-                    Works.id.label("id"),
-                    func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
-                    Tasks.name.label("task_name"),
-                    Subjects.name.label('subject'),
-                    func.sum(Assessments.points).label("score"),
-                    func.sum(Criterions.score).label("max_score"),
-                    Works.status.label("status")
+                    rows.c.status,
+                    rows.c.task_id,
+                    rows.c.task_name,
+                    rows.c.classroom_id,
+                    rows.c.classroom_name,
+                    func.grouping(rows.c.task_id, rows.c.classroom_id).label("summary_set"),
+                    func.count(distinct(rows.c.work_id)).label("count"),
                 )
-                .select_from(Works)
-                .join(Users, Works.student_id == Users.id)
-                .join(Tasks, Works.task_id == Tasks.id)
-                .join(Subjects, Tasks.subject_id == Subjects.id)
-                .join(teachers_students, 
-                      (teachers_students.c.student_id == student_id) & 
-                      (teachers_students.c.teacher_id == Tasks.teacher_id))
-                .outerjoin(Answers, Works.id == Answers.work_id)
-                .outerjoin(Exercises, Answers.exercise_id == Exercises.id)
-                .outerjoin(Criterions, Exercises.id == Criterions.exercise_id)
-                .outerjoin(Assessments, 
-                          (Answers.id == Assessments.answer_id) & 
-                          (Criterions.id == Assessments.criterion_id))
-                .where(Works.student_id == student_id)
+                .group_by(func.grouping_sets(
+                    tuple_(rows.c.task_id, rows.c.task_name, rows.c.status),
+                    tuple_(rows.c.classroom_id, rows.c.classroom_name, rows.c.status),
+                    tuple_(rows.c.status),
+                ))
             )
+            response = await self.session.execute(stmt)
 
-            # Применение фильтров
-            if filters.teachers_ids:
-                stmt = stmt.where(Tasks.teacher_id.in_(filters.teachers_ids))
-
-
-            if filters.statuses:
-                # Преобразуем строки в StatusWork enum
-                status_enum_list = [StatusWork(s) for s in filters.statuses]
-                stmt = stmt.where(Works.status.in_(status_enum_list))
-
-            if filters.tasks_ids:
-                stmt = stmt.where(Tasks.id.in_(filters.tasks_ids))
+            result = {"tasks": [], "classrooms": [], "statuses": []}
+            sets = {1: "tasks", 2: "classrooms", 3: "statuses"}
+            for row in response.mappings():
+                result[sets[row["summary_set"]]].append(row)
+            return result
 
-            if filters.subject_id:
-                stmt = stmt.where(Subjects.id == filters.subject_id)
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
 
-            if filters.min:
-                stmt = stmt.where(Works.created_at >= filters.min)
+    async def _select_facets(self, rows, facets: dict[str, tuple[str, ...]]):
+        """
+        Считает фасеты по отфильтрованным строкам rows (CTE с колонками work_id и created_at)
+        одним запросом GROUPING SETS: набор группировки на каждый фасет плюс пустой набор
+        для общего диапазона дат. Значения фасетов уникальны, count - число работ с этим значением.
+        Возвращает {фасет: [строки]} и "dates" - строку с min_date / max_date.
+        """
+        columns = list(dict.fromkeys(name for names in facets.values() for name in names))
+        # Первая колонка набора однозначно определяет фасет: GROUPING() по ним - битовая маска,
+        # в которой сброшен только бит фасета строки (у пустого набора выставлены все биты)
+        key_columns = [rows.c[names[0]] for names in facets.values()]
+        all_bits = (1 << len(key_columns)) - 1
+        facet_by_mask = {
+            all_bits ^ (1 << (len(key_columns) - 1 - i)): facet
+            for i, facet in enumerate(facets)
+        }
 
-            if filters.max:
-                stmt = stmt.where(Works.created_at <= filters.max)
-
-            # Группировка для агрегации баллов
-            stmt = stmt.group_by(
-                Works.id,
-                Users.first_name,
-                Users.last_name,
-                Subjects.name,
-                Tasks.name,
-                Works.status
+        stmt = (
+            select(
+                *[rows.c[name] for name in columns],
+                func.grouping(*key_columns).label("facet_mask"),
+                func.count(distinct(rows.c.work_id)).label("count"),
+                func.min(rows.c.created_at).label("min_date"),
+                func.max(rows.c.created_at).label("max_date"),
             )
+            .group_by(func.grouping_sets(
+                *[tuple_(*[rows.c[name] for name in names]) for names in facets.values()],
+                tuple_(),
+            ))
+        )
+        response = await self.session.execute(stmt)
+
+        result = {facet: [] for facet in facets}
+        result["dates"] = None
+        for row in response.mappings():
+            if row["facet_mask"] == all_bits:
+                result["dates"] = row
+            else:
+                result[facet_by_mask[row["facet_mask"]]].append(row)
+        return result
+
+    async def get_works_list_teacher(
+        self,
+        teacher_id: uuid.UUID,
+        filters: SmartFiltersWorkTeacher,
+        page: WorksPageParams | None = None,
+        after: tuple | None = None,
+    ):
+        """Получение списка работ для учителя с применением умных фильтров"""
+        try:
+            return await self._fetch_page("teacher", teacher_id, filters, page, after)
 
-            result = await self.session.execute(stmt)
-            return result.all()
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def get_works_list_student(
+        self,
+        student_id: uuid.UUID,
+        filters: SmartFiltersWorkStudent,
+        page: WorksPageParams | None = None,
+        after: tuple | None = None,
+    ):
+        """Получение списка работ для ученика с применением умных фильтров"""
+        try:
+            return await self._fetch_page("student", student_id, filters, page, after)
 
         except Exception as exc:
             logger.exception(exc)
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    async def stream_works_list_teacher(
+        self,
+        teacher_id: uuid.UUID,
+        filters: SmartFiltersWorkTeacher,
+        batch_size: int = 1000,
+    ):
+        """
+        Все работы учителя по фильтрам (новые первыми) пачками по batch_size строк.
+        Строки читаются серверным курсором, в памяти одновременно только одна пачка.
+        """
+        page = WorksPageParams(sort=WorksSort.created_at, order="desc")
+        result = await self.session.stream(
+            works_list_stmt("teacher", teacher_id, filters, page),
+            execution_options={"yield_per": batch_size},
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def _fetch_page(
+        self,
+        scope: WorksScope,
+        user_id: uuid.UUID,
+        filters: SmartFiltersWorkTeacher | SmartFiltersWorkStudent,
+        page: WorksPageParams | None,
+        after: tuple | None,
+    ):
+        """Возвращает (строки страницы, общее количество или None)"""
+        page = page or WorksPageParams()
+
+        total = None
+        if page.with_total:
+            total = await self.session.scalar(works_count_stmt(scope, user_id, filters))
+
+        result = await self.session.execute(works_list_stmt(scope, user_id, filters, page, after))
+        return result.all(), total
+
     async def get(self, work_id: uuid.UUID) -> Works | None:
         """Получение работы с полными связями (answers, assessments, comments, task, exercise)"""
         try:
@@ -484,4 +677,203 @@ class RepoWorks():
             logger.exception(exc)
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
-      
\ No newline at end of file
+
+    async def get_version(self, work_id: uuid.UUID):
+        """
+        Версия работы для ETag и данные для проверки доступа без загрузки графа:
+        updated_at и version работы и её задачи (задача тоже входит в ответ), student_id, teacher_id.
+        """
+        try:
+            stmt = (
+                select(
+                    Works.updated_at,
+                    Works.version,
+                    Tasks.updated_at.label("task_updated_at"),
+                    Tasks.version.label("task_version"),
+                    Works.student_id,
+                    Tasks.teacher_id,
+                )
+                .join(Tasks, Works.task_id == Tasks.id)
+                .where(Works.id == work_id)
+            )
+            result = await self.session.execute(stmt)
+            return result.first()
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def get_document(self, work_id: uuid.UUID):
+        """Работа одним JSON-документом в форме WorkRead (см. work_document_stmt): строка (teacher_id, document) или None"""
+        try:
+            result = await self.session.execute(work_document_stmt(work_id))
+            return result.first()
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+      
+    # Точечные изменения для частичного обновления (PATCH): по одному UPDATE/INSERT/DELETE без загрузки графа.
+    # Запись идёт в обход ORM, поэтому версию работы увеличивает save_patched_work.
+
+    async def get_patch_target(self, work_id: uuid.UUID):
+        """
+        Статус работы и данные для проверки доступа: строка (status, finish_date, student_id, teacher_id) или None.
+        Строка работы блокируется до конца транзакции, чтобы параллельные изменения статуса не пересекались.
+        """
+        try:
+            stmt = (
+                select(Works.status, Works.finish_date, Works.student_id, Tasks.teacher_id)
+                .join(Tasks, Works.task_id == Tasks.id)
+                .where(Works.id == work_id)
+                .with_for_update(of=Works)
+            )
+            result = await self.session.execute(stmt)
+            return result.first()
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def set_answer_text(self, work_id: uuid.UUID, answer_id: uuid.UUID, text: str):
+        """Текст ответа работы: строка (id, text) или None, если в работе нет такого ответа"""
+        try:
+            stmt = (
+                update(Answers)
+                .where(Answers.id == answer_id, Answers.work_id == work_id)
+                .values(text=text)
+                .returning(Answers.id, Answers.text)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            return result.first()
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def set_assessment_points(self, work_id: uuid.UUID, assessment_id: uuid.UUID, points: int):
+        """
+        Баллы оценки, если они не больше максимума критерия: строка оценки вместе с критерием или None,
+        если оценки нет в работе или баллов слишком много (см. get_assessment_max_score).
+        """
+        try:
+            stmt = (
+                update(Assessments)
+                .where(
+                    Assessments.id == assessment_id,
+                    Assessments.answer_id == Answers.id,
+                    Answers.work_id == work_id,
+                    Assessments.criterion_id == Criterions.id,
+                    Criterions.score >= points,
+                )
+                .values(points=points)
+                .returning(
+                    Assessments.id,
+                    Assessments.answer_id,
+                    Assessments.criterion_id,
+                    Assessments.points,
+                    Criterions.name.label("criterion_name"),
+                    Criterions.score.label("criterion_score"),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            return result.first()
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def get_assessment_max_score(self, work_id: uuid.UUID, assessment_id: uuid.UUID) -> int | None:
+        """Максимум баллов по критерию оценки работы или None, если в работе нет такой оценки"""
+        try:
+            stmt = (
+                select(Criterions.score)
+                .join(Assessments, Assessments.criterion_id == Criterions.id)
+                .join(Answers, Assessments.answer_id == Answers.id)
+                .where(Assessments.id == assessment_id, Answers.work_id == work_id)
+            )
+            return await self.session.scalar(stmt)
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def add_answer_file(self, work_id: uuid.UUID, answer_id: uuid.UUID, key: str):
+        """
+        Новый файл ответа работы: строка (id, key, ai_status) или None,
+        если в работе нет такого ответа или у ответа уже есть файл с этим ключом.
+        """
+        try:
+            source = (
+                select(
+                    literal(uuid.uuid4(), AnswerFiles.id.type),
+                    Answers.id,
+                    literal(key, AnswerFiles.key.type),
+                    literal(StatusAnswerFile.draft, AnswerFiles.ai_status.type),
+                )
+                .where(
+                    Answers.id == answer_id,
+                    Answers.work_id == work_id,
+                    ~exists().where(AnswerFiles.answer_id == answer_id, AnswerFiles.key == key),
+                )
+            )
+            stmt = (
+                insert(AnswerFiles)
+                .from_select(["id", "answer_id", "key", "ai_status"], source)
+                .returning(AnswerFiles.id, AnswerFiles.key, AnswerFiles.ai_status)
+            )
+            result = await self.session.execute(stmt)
+            return result.first()
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def remove_answer_file(self, work_id: uuid.UUID, file_id: uuid.UUID):
+        """Удаление файла ответа работы: строка (id, key) или None, если в работе нет такого файла"""
+        try:
+            stmt = (
+                delete(AnswerFiles)
+                .where(
+                    AnswerFiles.id == file_id,
+                    AnswerFiles.answer_id == Answers.id,
+                    Answers.work_id == work_id,
+                )
+                .returning(AnswerFiles.id, AnswerFiles.key)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            return result.first()
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    async def save_patched_work(self, work_id: uuid.UUID, **values):
+        """
+        Завершает частичное обновление: записывает изменённые поля работы (status, finish_date)
+        и увеличивает её версию. Возвращает строку (id, status, finish_date, version).
+        """
+        try:
+            stmt = (
+                update(Works)
+                .where(Works.id == work_id)
+                .values(version=Works.version + 1, **values)
+                .returning(Works.id, Works.status, Works.finish_date, Works.version)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            return result.one()
+
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
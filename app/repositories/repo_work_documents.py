@@ -0,0 +1,83 @@
+import uuid
+
+from sqlalchemy import Text, cast, func, or_, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.model_tasks import Tasks
+from app.models.model_works import Answers, WorkDocuments, Works
+from app.repositories.repo_work import work_document_json, work_document_source_key
+
+
+class RepoWorkDocuments:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def document_select():
+        """Документы работ вместе с версиями, из которых они собраны"""
+        return (
+            select(
+                Works.id,
+                cast(work_document_json(), JSONB),
+                work_document_source_key(),
+                func.now(),
+            )
+            .select_from(Works)
+            .join(Tasks, Works.task_id == Tasks.id)
+        )
+
+    def _upsert(self, source):
+        columns = ["work_id", "document", "source_key", "updated_at"]
+        stmt = insert(WorkDocuments).from_select(columns, source)
+        return stmt.on_conflict_do_update(
+            index_elements=[WorkDocuments.work_id],
+            set_={name: stmt.excluded[name] for name in columns[1:]},
+        )
+
+    async def refresh(
+        self,
+        work_ids: list[uuid.UUID] | None = None,
+        answer_ids: list[uuid.UUID] | None = None,
+    ):
+        """
+        Пересобирает документы указанных работ (или работ, которым принадлежат ответы)
+        в текущей транзакции. Несохранённые изменения сессии сначала отправляются в БД.
+        """
+        if not work_ids and not answer_ids:
+            return
+        await self.session.flush()
+
+        conditions = []
+        if work_ids:
+            conditions.append(Works.id.in_(work_ids))
+        if answer_ids:
+            conditions.append(Works.id.in_(select(Answers.work_id).where(Answers.id.in_(answer_ids))))
+        await self.session.execute(self._upsert(self.document_select().where(or_(*conditions))))
+
+    async def rebuild(self, work_id: uuid.UUID) -> str:
+        """Пересобирает документ одной работы и возвращает его (JSON-строкой)"""
+        stmt = self._upsert(self.document_select().where(Works.id == work_id))
+        result = await self.session.execute(stmt.returning(cast(WorkDocuments.document, Text)))
+        return result.scalar_one()
+
+    async def get(self, work_id: uuid.UUID):
+        """
+        Сохранённый документ работы (JSON-строкой) и данные для проверки доступа:
+        строка (student_id, teacher_id, document, fresh) или None, если работы нет.
+        document = NULL, если документ ещё не собирался; fresh = false, если он устарел.
+        """
+        stmt = (
+            select(
+                Works.student_id,
+                Tasks.teacher_id,
+                cast(WorkDocuments.document, Text).label("document"),
+                (WorkDocuments.source_key == work_document_source_key()).label("fresh"),
+            )
+            .select_from(Works)
+            .join(Tasks, Works.task_id == Tasks.id)
+            .outerjoin(WorkDocuments, WorkDocuments.work_id == Works.id)
+            .where(Works.id == work_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.first()
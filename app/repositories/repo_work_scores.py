@@ -0,0 +1,95 @@
+import uuid
+
+from sqlalchemy import and_, distinct, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.model_files import AnswerFiles
+from app.models.model_tasks import Criterions, Exercises
+from app.models.model_works import Answers, Assessments, WorkScores, Works
+
+
+class RepoWorkScores:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def summary_select():
+        """
+        Сводка по каждой работе из ответов, критериев и оценок.
+        Баллы считаются так же, как раньше в списках работ: критерии упражнений,
+        на которые есть ответы, и оценки по этим критериям.
+        Максимум берётся из сохранённого Exercises.max_score, без обхода критериев.
+        """
+        answer_criterions = (
+            select(Answers.id)
+            .join(Criterions, Criterions.exercise_id == Answers.exercise_id)
+            .where(Answers.work_id == Works.id)
+        )
+        score = (
+            answer_criterions
+            .with_only_columns(func.coalesce(func.sum(Assessments.points), 0))
+            .join(Assessments, and_(Assessments.answer_id == Answers.id, Assessments.criterion_id == Criterions.id))
+            .scalar_subquery()
+        )
+        max_score = (
+            select(func.coalesce(func.sum(Exercises.max_score), 0))
+            .join(Answers, Answers.exercise_id == Exercises.id)
+            .where(Answers.work_id == Works.id)
+            .scalar_subquery()
+        )
+        answers_count = (
+            select(func.count(Answers.id))
+            .where(Answers.work_id == Works.id)
+            .scalar_subquery()
+        )
+        answered_count = (
+            select(func.count(Answers.id))
+            .where(
+                Answers.work_id == Works.id,
+                or_(Answers.text != '', exists().where(AnswerFiles.answer_id == Answers.id)),
+            )
+            .scalar_subquery()
+        )
+        graded_count = (
+            select(func.count(distinct(Answers.id)))
+            .join(Assessments, Assessments.answer_id == Answers.id)
+            .where(Answers.work_id == Works.id, Assessments.points > 0)
+            .scalar_subquery()
+        )
+        return select(
+            Works.id,
+            score,
+            max_score,
+            answers_count,
+            answered_count,
+            graded_count,
+            func.now(),
+        )
+
+    async def refresh(
+        self,
+        work_ids: list[uuid.UUID] | None = None,
+        task_ids: list[uuid.UUID] | None = None,
+    ):
+        """
+        Пересчитывает сводку для указанных работ (или всех работ задач) в текущей транзакции.
+        Несохранённые изменения сессии сначала отправляются в БД.
+        """
+        if not work_ids and not task_ids:
+            return
+        await self.session.flush()
+
+        source = self.summary_select()
+        if work_ids:
+            source = source.where(Works.id.in_(work_ids))
+        if task_ids:
+            source = source.where(Works.task_id.in_(task_ids))
+
+        columns = ["work_id", "score", "max_score", "answers_count", "answered_count", "graded_count", "updated_at"]
+        stmt = insert(WorkScores).from_select(columns, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WorkScores.work_id],
+            set_={name: stmt.excluded[name] for name in columns[1:]},
+        )
+        await self.session.execute(stmt)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.exceptions.responses import ErrorRolePermissionDenied
+from app.models.model_users import RoleUser, Users
+from app.utils.filters_cache import filters_cache
+from app.utils.oAuth import get_current_user
+
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/filters/stats")
+async def get_filters_stats(user: Users = Depends(get_current_user)):
+    """Попадания и промахи кэша фильтров по эндпоинтам (только для администратора)"""
+    if user.role is not RoleUser.admin:
+        raise ErrorRolePermissionDenied(RoleUser.admin, user.role)
+    return await filters_cache.stats()
@@ -4,7 +4,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.db import get_async_session
 from app.models.model_users import Users
-from app.schemas.schema_files import UploadFileResponse
+from app.schemas.schema_files import (
+    MultipartAbortRequest,
+    MultipartCompleteRequest,
+    UploadFileResponse,
+    UploadLinkBatchItem,
+    UploadLinksRequest,
+)
 from app.services.service_files import ServiceFiles
 from app.utils.oAuth import get_current_user
 
@@ -30,6 +36,48 @@ async def upload_file(
     return await service.create(file_name, user)
 
 
+@router.post("/get_upload_links", response_model=list[UploadLinkBatchItem])
+async def upload_files(
+    data: UploadLinksRequest,
+    session: AsyncSession = Depends(get_async_session),
+    user: Users = Depends(get_current_user)
+):
+    """
+    Ссылки на загрузку для нескольких файлов за один запрос.
+
+    - **files**: Список файлов (имя и, по возможности, размер в байтах)
+
+    Ссылки возвращаются в том же порядке, что и файлы в запросе.
+    Для файлов больше порога вместо upload_link возвращается multipart:
+    upload_id, размер части и ссылки на загрузку каждой части (PUT).
+    После загрузки всех частей нужно вызвать /files/multipart/complete
+    с ETag каждой части.
+    """
+
+    service = ServiceFiles(session)
+    return await service.create_many(data, user)
+
+
+@router.post("/multipart/complete")
+async def complete_multipart(
+    data: MultipartCompleteRequest,
+    session: AsyncSession = Depends(get_async_session),
+    user: Users = Depends(get_current_user)
+):
+    service = ServiceFiles(session)
+    return await service.complete_multipart(data, user)
+
+
+@router.post("/multipart/abort")
+async def abort_multipart(
+    data: MultipartAbortRequest,
+    session: AsyncSession = Depends(get_async_session),
+    user: Users = Depends(get_current_user)
+):
+    service = ServiceFiles(session)
+    return await service.abort_multipart(data, user)
+
+
 @router.delete("/")
 async def delete(
     keys: list[str],
@@ -1,5 +1,6 @@
+from typing import Annotated
 import uuid
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.db import get_async_session
@@ -7,6 +8,7 @@ from app.models.model_users import Users
 from app.schemas.schema_tasks import *
 from app.services.service_tasks import ServiceTasks
 from app.services.service_work import ServiceWork
+from app.utils.etag import CACHE_CONTROL
 from app.utils.oAuth import get_current_user
 
 
@@ -44,11 +46,18 @@ async def get_all(
 @router.get("/{id}", response_model=TaskRead)
 async def get(
     id: uuid.UUID,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(get_async_session),
     teacher: Users = Depends(get_current_user)
 ):
     service = ServiceTasks(session)
-    return await service.get(id, teacher)
+    etag, task = await service.get_if_modified(id, teacher, if_none_match)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if task is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return task
 
 @router.post("/{id}/start")
 async def create_works(
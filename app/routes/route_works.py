@@ -1,14 +1,15 @@
-from typing import Annotated
+from typing import Annotated, Literal
 import uuid
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.db import get_async_session
 from app.models.model_users import Users
 from app.schemas.schema_comment import *
-from app.schemas.schema_work import SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorkRead, WorkUpdate, WorksFilterResponseStudent, WorksFilterResponseTeacher
+from app.schemas.schema_work import SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorkPatch, WorkPatchResult, WorkRead, WorkUpdate, WorksFilterResponseStudent, WorksFilterResponseTeacher, WorksPage, WorksPageParams, WorksStatusSummary, WorksSummaryFilters, WorkLoader
 from app.services.service_comments import ServiceComments
 from app.services.service_work import ServiceWork, WorkEasyRead
+from app.utils.etag import CACHE_CONTROL
 from app.utils.oAuth import get_current_user
 
 
@@ -33,34 +34,86 @@ async def get_filters_student(
     service = ServiceWork(session)
     return await service.get_smart_filters_student(user, filters)
 
+@router.get("/teacher/summary", response_model=WorksStatusSummary)
+async def get_status_summary_teacher(
+    filters: Annotated[WorksSummaryFilters, Depends()],
+    session: AsyncSession = Depends(get_async_session),
+    user: Users = Depends(get_current_user),
+):
+    """Количество работ по статусам: всего, по задачам и по классам учителя"""
+    service = ServiceWork(session)
+    return await service.get_status_summary_teacher(user, filters)
+
+
+@router.get("/teacher/export")
+async def export_works_teacher(
+    filters: Annotated[SmartFiltersWorkTeacher, Depends()],
+    format: Literal["csv", "ndjson"] = "csv",
+    session: AsyncSession = Depends(get_async_session),
+    user: Users = Depends(get_current_user),
+):
+    """Выгрузка всех работ учителя по фильтрам (CSV или NDJSON) потоком, без загрузки списка в память"""
+    service = ServiceWork(session)
+    return await service.export_works_teacher(user, filters, format)
+
+def set_page_headers(response: Response, page: WorksPage):
+    # Тело ответа остаётся списком, данные страницы передаются в заголовках
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+
+
 @router.get("/teacher/list", response_model=list[WorkEasyRead])
 async def get_works_list_teacher(
     filters: Annotated[SmartFiltersWorkTeacher, Depends()],
+    page: Annotated[WorksPageParams, Depends()],
+    response: Response,
     session: AsyncSession = Depends(get_async_session),
     user: Users = Depends(get_current_user),
 ):
-    """Получение списка работ для учителя с применением умных фильтров"""
+    """
+    Получение списка работ для учителя с применением умных фильтров.
+    С limit возвращается одна страница, курсор следующей - в заголовке X-Next-Cursor.
+    """
     service = ServiceWork(session)
-    return await service.get_works_list_teacher(user, filters)
+    works_page = await service.get_works_list_teacher(user, filters, page)
+    set_page_headers(response, works_page)
+    return works_page.items
 
 @router.get("/student/list", response_model=list[WorkEasyRead])
 async def get_works_list_student(
     filters: Annotated[SmartFiltersWorkStudent, Depends()],
+    page: Annotated[WorksPageParams, Depends()],
+    response: Response,
     session: AsyncSession = Depends(get_async_session),
     user: Users = Depends(get_current_user),
 ):
-    """Получение списка работ для ученика с применением умных фильтров"""
+    """
+    Получение списка работ для ученика с применением умных фильтров.
+    С limit возвращается одна страница, курсор следующей - в заголовке X-Next-Cursor.
+    """
     service = ServiceWork(session)
-    return await service.get_works_list_student(user, filters)
+    works_page = await service.get_works_list_student(user, filters, page)
+    set_page_headers(response, works_page)
+    return works_page.items
 
 @router.get("/{id}", response_model=WorkRead)
 async def get(
     id: uuid.UUID,
+    response: Response,
+    loader: WorkLoader = "document",
+    if_none_match: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(get_async_session),
     user: Users = Depends(get_current_user)
 ):
     service = ServiceWork(session)
-    return await service.get(id, user)
+    etag, work = await service.get_if_modified(id, user, if_none_match, loader)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if work is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return work
 
 @router.put("/{work_id}", response_model=WorkRead)
 async def update(
@@ -72,6 +125,16 @@ async def update(
     service = ServiceWork(session)
     return await service.update(work_id, data, user)
 
+@router.patch("/{work_id}", response_model=WorkPatchResult)
+async def patch(
+    work_id: uuid.UUID,
+    data: WorkPatch,
+    session: AsyncSession = Depends(get_async_session),
+    user: Users = Depends(get_current_user)
+):
+    service = ServiceWork(session)
+    return await service.patch(work_id, data, user)
+
 
 @router.post("/{work_id}/ai_verification")
 async def send_work_to_verification(
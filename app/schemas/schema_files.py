@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Optional
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 if TYPE_CHECKING:
     from app.models.model_files import StatusAnswerFile
@@ -9,6 +9,43 @@ class UploadFileResponse(BaseModel):
     key: str
     upload_link: str
 
+class UploadFileRequest(BaseModel):
+    file_name: str
+    size: int | None = Field(None, ge=0)
+    # SHA-256 содержимого (hex), используется в режиме хранения по содержимому
+    sha256: str | None = Field(None, pattern=r"^[0-9a-fA-F]{64}$")
+
+class UploadLinksRequest(BaseModel):
+    files: list[UploadFileRequest] = Field(..., min_length=1, max_length=100)
+
+class MultipartUploadResponse(BaseModel):
+    upload_id: str
+    part_size: int
+    part_links: list[str]
+
+class UploadLinkBatchItem(BaseModel):
+    """
+    Для обычной загрузки заполнен upload_link, для загрузки по частям - multipart.
+    exists=True - такой файл уже есть в хранилище, загружать его не нужно.
+    """
+    key: str
+    upload_link: str | None = None
+    multipart: MultipartUploadResponse | None = None
+    exists: bool = False
+
+class MultipartPart(BaseModel):
+    part_number: int = Field(..., ge=1, le=10000)
+    etag: str
+
+class MultipartCompleteRequest(BaseModel):
+    key: str
+    upload_id: str
+    parts: list[MultipartPart] = Field(..., min_length=1)
+
+class MultipartAbortRequest(BaseModel):
+    key: str
+    upload_id: str
+
 class IFile(BaseModel):
     key: str
     file: str
@@ -49,3 +49,11 @@ class SubscriptionStartPeriodRequest(BaseModel):
 class SubscriptionCancel(BaseModel):
     """Схема для отмены подписки."""
     id: uuid.UUID
+
+
+class SubscriptionEntitlements(BaseModelConfig):
+    """Права по активной подписке пользователя (кэшируются, см. EntitlementsCache)."""
+    plan_id: uuid.UUID | None
+    finish_at: datetime
+    verifications_count: int | None  # None, если у подписки нет плана
+    used_checks: int
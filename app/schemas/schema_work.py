@@ -1,11 +1,12 @@
 
 
 from datetime import datetime
+import enum
 import uuid
 from fastapi import Query
 from pydantic import BaseModel, Field
 
-from typing import List, Optional, Dict
+from typing import Annotated, List, Literal, Optional, Dict, Union
 from datetime import datetime, date
 
 from app.models.model_works import StatusWork
@@ -66,6 +67,11 @@ class AnswerRead(BaseModelConfig):
     comments: list["CommentRead"]  # CommentRead из другого модуля
 
 
+# Способ загрузки работы: сохранённый снимок из work_documents, ORM-объекты (selectinload)
+# или JSON-документ, собранный Postgres на лету
+WorkLoader = Literal["document", "orm", "json"]
+
+
 class WorkRead(BaseModelConfig):
     id: uuid.UUID
     task_id: uuid.UUID
@@ -106,6 +112,68 @@ class WorkUpdate(BaseModelConfig):
     answers: list[AnswerUpdate]  # AnswerUpdate определен в том же файле
 
 
+# Операции частичного обновления работы (PATCH): каждая меняет одно поле одним UPDATE
+class SetAnswerText(BaseModelConfig):
+    """Студент: текст ответа"""
+    op: Literal["set_answer_text"]
+    answer_id: uuid.UUID
+    text: str
+
+
+class SetAssessmentPoints(BaseModelConfig):
+    """Учитель: баллы по существующей оценке"""
+    op: Literal["set_assessment_points"]
+    assessment_id: uuid.UUID
+    points: int = Field(ge=0)
+
+
+class SetStatus(BaseModelConfig):
+    """Студент и учитель: статус работы (те же правила, что и в PUT)"""
+    op: Literal["set_status"]
+    status: StatusWork
+
+
+class AddAnswerFile(BaseModelConfig):
+    """Студент: новый файл ответа"""
+    op: Literal["add_file"]
+    answer_id: uuid.UUID
+    key: str
+
+
+class RemoveAnswerFile(BaseModelConfig):
+    """Студент: удаление файла ответа"""
+    op: Literal["remove_file"]
+    file_id: uuid.UUID
+
+
+WorkPatchOperation = Annotated[
+    Union[SetAnswerText, SetAssessmentPoints, SetStatus, AddAnswerFile, RemoveAnswerFile],
+    Field(discriminator="op"),
+]
+
+
+class WorkPatch(BaseModelConfig):
+    operations: list[WorkPatchOperation] = Field(min_length=1, max_length=100)
+
+
+class AnswerTextRead(BaseModelConfig):
+    id: uuid.UUID
+    text: str
+
+
+class WorkPatchResult(BaseModelConfig):
+    """Только изменённые части работы; status, finish_date и version - всегда актуальные"""
+    id: uuid.UUID
+    status: StatusWork
+    finish_date: datetime | None
+    version: int
+
+    answers: list[AnswerTextRead] = []
+    assessments: list[AssessmentRead] = []
+    added_files: list["IFileAnswer"] = []
+    removed_files: list[uuid.UUID] = []
+
+
 class WorkEasyRead(BaseModelConfig):
     id: uuid.UUID
     task_name: str
@@ -117,12 +185,39 @@ class WorkEasyRead(BaseModelConfig):
     status_work: StatusWork
 
 
+class WorksSort(str, enum.Enum):
+    created_at = "created_at"
+    score      = "score"
+    status     = "status"
+    relevance  = "relevance"  # Похожесть на search, только вместе с ним
+
+
+class WorksPageParams(BaseModelConfig):
+    """
+    Постраничная выдача списка работ (keyset): без limit возвращается весь список.
+    cursor - значение из заголовка X-Next-Cursor предыдущей страницы.
+    Без sort работы сортируются по дате, а при заданном search - по похожести.
+    """
+    limit: Optional[int] = Field(None, ge=1, le=500)
+    cursor: Optional[str] = None
+    sort: Optional[WorksSort] = None
+    order: Literal["asc", "desc"] = "desc"
+    with_total: bool = False
+
+
+class WorksPage(BaseModelConfig):
+    items: List[WorkEasyRead]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
 class SmartFiltersWorkTeacher(BaseModelConfig):
     students_ids: Optional[List[uuid.UUID]] = Field(Query(None))
     classrooms_ids: Optional[List[uuid.UUID]] = Field(Query(None))
     statuses: Optional[List[str]] = Field(Query(None))
     tasks_ids: Optional[List[uuid.UUID]] = Field(Query(None))
     subject_id: Optional[uuid.UUID] = None
+    search: Optional[str] = Field(None, min_length=2, max_length=100)  # Имя ученика или название задачи
 
     min: Optional[datetime] = None
     max: Optional[datetime] = None
@@ -133,6 +228,7 @@ class SmartFiltersWorkStudent(BaseModelConfig):
     statuses: Optional[List[str]] = Field(Query(None))
     tasks_ids: Optional[List[uuid.UUID]] = Field(Query(None))
     subject_id: Optional[uuid.UUID] = None
+    search: Optional[str] = Field(None, min_length=2, max_length=100)  # Название задачи
 
     min: Optional[datetime] = None
     max: Optional[datetime] = None
@@ -143,18 +239,21 @@ class UserItem(BaseModelConfig):
     """Модель для представления студента в фильтрах"""
     id: uuid.UUID  # user_id
     name: str  # user_name
+    count: int = 0  # Количество работ
 
 
 class ClassroomItem(BaseModelConfig):
     """Модель для представления класса в фильтрах"""
     id: uuid.UUID  # classroom_id
     name: str  # classroom_name
+    count: int = 0  # Количество работ
 
 
 class SubjectItem(BaseModelConfig):
     """Модель для представления предмета в фильтрах"""
     id: uuid.UUID  # subject_id
     name: str  # subject
+    count: int = 0  # Количество работ
 
 
 class DatesRange(BaseModelConfig):
@@ -171,6 +270,8 @@ class WorksFilterResponseTeacher(BaseModelConfig):
     dates: Optional[DatesRange] = None  # Диапазон дат (min, max) или None
     tasks: Dict[str, List[uuid.UUID]]  # Словарь: название задачи -> список ID задач
     subjects: List[SubjectItem]  # Список предметов (id, name)
+    statuses_counts: Dict[str, int] = {}  # Словарь: статус -> количество работ
+    tasks_counts: Dict[str, int] = {}  # Словарь: название задачи -> количество работ
 
 class WorksFilterResponseStudent(BaseModelConfig):
     """Схема ответа для фильтров работ учителя"""
@@ -179,6 +280,30 @@ class WorksFilterResponseStudent(BaseModelConfig):
     dates: Optional[DatesRange] = None  # Диапазон дат (min, max) или None
     tasks: Dict[str, List[uuid.UUID]]  # Словарь: название задачи -> список ID задач
     subjects: List[SubjectItem]  # Список предметов (id, name)
+    statuses_counts: Dict[str, int] = {}  # Словарь: статус -> количество работ
+    tasks_counts: Dict[str, int] = {}  # Словарь: название задачи -> количество работ
+
+
+class WorksSummaryFilters(BaseModelConfig):
+    """Фильтры сводки статусов работ учителя"""
+    subject_id: Optional[uuid.UUID] = None
+    min: Optional[datetime] = None
+    max: Optional[datetime] = None
+
+
+class StatusCountsItem(BaseModelConfig):
+    """Количество работ по статусам для задачи или класса"""
+    id: uuid.UUID
+    name: str
+    counts: Dict[str, int] = {}  # Словарь: статус -> количество работ
+    total: int = 0
+
+
+class WorksStatusSummary(BaseModelConfig):
+    """Сводка статусов работ учителя: всего, по задачам и по классам"""
+    statuses: Dict[str, int] = {}  # Словарь: статус -> количество работ
+    tasks: List[StatusCountsItem] = []
+    classrooms: List[StatusCountsItem] = []
 
 
 # Вызов model_rebuild() для разрешения forward references
@@ -199,5 +324,6 @@ def _rebuild_models():
     # Модели Update (используют IFileAnserUpdate из другого модуля)
     AnswerUpdate.model_rebuild()  # использует IFileAnserUpdate из другого модуля и AssessmentUpdate
     WorkUpdate.model_rebuild()  # использует AnswerUpdate
+    WorkPatchResult.model_rebuild()  # использует IFileAnswer из другого модуля
 
 _rebuild_models()
@@ -15,6 +15,7 @@ from app.schemas.schema_AI import SchemaIncomingBack, SchemaIncomingFront
 from app.schemas.schema_comment import SchemaCommentTypesRead
 from app.services.service_base import ServiceBase
 from app.services.service_comments import ServiceComments
+from app.utils.entitlements_cache import entitlements_cache
 from app.utils.logger import logger
 
 
@@ -121,7 +122,10 @@ class ServiceAI(ServiceBase):
 
             # Отправляем на обработку через ServiceComments
             service_comments = ServiceComments(self.session)
-            return await service_comments.send_to_ai_processing(schema_back, teacher)
+            response = await service_comments.send_to_ai_processing(schema_back, teacher)
+            # used_checks изменился и закоммичен - сбрасываем кэш прав по подписке
+            await entitlements_cache.invalidate([teacher.id])
+            return response
             
         except HTTPException:
             await self.session.rollback()
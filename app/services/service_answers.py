@@ -6,6 +6,7 @@ from sqlalchemy.orm import selectinload
 from app.exceptions.responses import ErrorNotExists, ErrorPermissionDenied, ErrorRolePermissionDenied, Success
 from app.models.model_users import RoleUser, Users
 from app.models.model_works import Answers, Works
+from app.repositories.repo_work_documents import RepoWorkDocuments
 from app.schemas.schema_work import AnswerUpdate
 from app.services.service_base import ServiceBase
 from app.utils.logger import logger
@@ -35,6 +36,7 @@ class ServiceAnswers(ServiceBase):
                 raise ErrorNotExists()
 
             answer_db.general_comment = general_comment
+            await RepoWorkDocuments(self.session).refresh(work_ids=[work_id])
             await self.session.commit()
 
             return Success
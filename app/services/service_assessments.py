@@ -8,6 +8,8 @@ from app.exceptions.responses import Success
 from app.models.model_tasks import Tasks
 from app.models.model_users import Users
 from app.models.model_works import Answers, Assessments, Works
+from app.repositories.repo_work_scores import RepoWorkScores
+from app.repositories.repo_work_documents import RepoWorkDocuments
 from app.services.service_base import ServiceBase
 from app.utils.logger import logger
 
@@ -51,6 +53,8 @@ class ServiceAssessments(ServiceBase):
                 raise HTTPException(400, "Too many points")
 
             assessment_db.points = points
+            await RepoWorkScores(self.session).refresh(work_ids=[work_id])
+            await RepoWorkDocuments(self.session).refresh(work_ids=[work_id])
             await self.session.commit()
 
             return Success()
@@ -23,6 +23,7 @@ from app.utils.email_hash import get_email_hash
 from fastapi.security import OAuth2PasswordRequestForm
 from app.services.service_mail import ServiceMail
 from app.services.service_base import ServiceBase
+from app.utils.entitlements_cache import entitlements_cache
 from app.utils.logger import logger
 from app.config.redis import red_client
 from datetime import datetime, timedelta, timezone
@@ -234,6 +235,7 @@ class ServiceAuth(ServiceBase):
                 existing_subscription.self_writing = False
 
             await self.session.commit()
+            await entitlements_cache.invalidate([user.id])
             return {"message": "Почта подтверждена"}    
 
         except HTTPException as exc:
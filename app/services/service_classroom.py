@@ -7,6 +7,7 @@ from app.models.model_classroom import Classrooms
 from app.models.model_users import Users, teachers_students
 from app.repositories.repo_classrooms import RepoClassroom
 from app.repositories.repo_teacher import RepoTeacher
+from app.utils.filters_cache import FiltersCache, filters_cache
 from app.utils.logger import logger
 from app.services.service_base import ServiceBase
 
@@ -32,6 +33,7 @@ class ServiceClassroom(ServiceBase):
 
             self.session.add(classroom)
             await self.session.commit()
+            await filters_cache.invalidate([FiltersCache.teacher_tag(teacher.id)])
             return classroom
         except HTTPException:
             raise
@@ -64,7 +66,9 @@ class ServiceClassroom(ServiceBase):
             raise HTTPException(status.HTTP_404_NOT_FOUND, "This classroom doesn't exists")
 
         classroom.name = name
+        teacher_id = classroom.teacher_id
         await self.session.commit()
+        await filters_cache.invalidate([FiltersCache.teacher_tag(teacher_id)])
         return {"message": "success"}
 
 
@@ -85,16 +89,20 @@ class ServiceClassroom(ServiceBase):
             )
 
         # Если нужно удалить студентов, удаляем их связи с учителем
+        tags = [FiltersCache.teacher_tag(teacher.id)]
         if delete_users:
             delete_stmt = (
                 delete(teachers_students)
                 .where(teachers_students.c.teacher_id == teacher.id)
                 .where(teachers_students.c.classroom_id == id)
+                .returning(teachers_students.c.student_id)
             )
-            await self.session.execute(delete_stmt)
+            result = await self.session.execute(delete_stmt)
+            tags.extend(FiltersCache.student_tag(student_id) for student_id in result.scalars())
         
         await self.session.delete(classroom)
         await self.session.commit()
+        await filters_cache.invalidate(tags)
         return {"message": "success"}
 
 
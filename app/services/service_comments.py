@@ -14,10 +14,14 @@ from app.models.model_works import Answers, Works
 from app.schemas.schema_AI import SchemaIncomingBack, SchemaOutgoing
 from app.schemas.schema_comment import CommentCreate, CommentUpdate
 from app.schemas.schema_files import compare_lists
-from app.config.boto import delete_files_from_s3
+from app.config.boto import promote_temp_keys
+from app.repositories.repo_files import RepoFiles
+from app.repositories.repo_s3_outbox import RepoS3Outbox
+from app.repositories.repo_work_documents import RepoWorkDocuments
 from app.models.model_subscription import Subscriptions
 from app.models.model_tasks import Tasks
 from app.repositories.repo_subscription import RepoSubscription
+from app.utils.entitlements_cache import entitlements_cache
 from app.utils.logger import logger
 from app.services.service_base import ServiceBase
 
@@ -61,6 +65,7 @@ class ServiceComments(ServiceBase):
             )
             result_work = await self.session.execute(stmt_work)
             work = result_work.scalar_one_or_none()
+            refunded_user_id = None
             if work is not None:
                 task = await self.session.get(Tasks, work.task_id)
                 if task is not None:
@@ -80,6 +85,7 @@ class ServiceComments(ServiceBase):
                                 subscription.used_checks - banned_count,
                             )
                             await self.session.flush()
+                            refunded_user_id = subscription.user_id
 
             for answer in data.answers:
                 orm_comments: list[Comments] = []
@@ -124,8 +130,11 @@ class ServiceComments(ServiceBase):
                         self.session.add(new_file)
                 
 
+                await RepoWorkDocuments(self.session).refresh(answer_ids=[answer.id])
                 await self.session.commit()
 
+            # Возвращённые проверки закоммичены вместе с первым ответом
+            await entitlements_cache.invalidate([refunded_user_id])
             return Success()
 
         except HTTPException:
@@ -146,13 +155,16 @@ class ServiceComments(ServiceBase):
             if user.role is RoleUser.student:
                 raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
 
+            # Новые загрузки переносим из временной области в постоянную
+            promoted = await promote_temp_keys(comment.files)
+
             comment_orm = Comments(
                 answer_id=comment.answer_id,
                 answerfile_id=comment.answerfile_id,
                 description=comment.description,
                 type_id=comment.type_id,
                 human=comment.human,
-                files=comment.files
+                files=[promoted.get(key, key) for key in comment.files]
             )
 
             comment_orm.coordinates.extend(
@@ -164,6 +176,8 @@ class ServiceComments(ServiceBase):
               ) for coordinate in comment.coordinates)
 
             self.session.add(comment_orm)
+            await RepoFiles(self.session).acquire(comment_orm.files)
+            await RepoWorkDocuments(self.session).refresh(answer_ids=[comment_orm.answer_id])
             await self.session.commit()
             return Success()
 
@@ -195,10 +209,13 @@ class ServiceComments(ServiceBase):
             # Обрабатываем файлы отдельно, если они переданы
             files_to_delete = []
             if update_data.files is not None:
+                promoted = await promote_temp_keys(update_data.files)
+                update_data.files = [promoted.get(key, key) for key in update_data.files]
                 # Сравниваем старый и новый список файлов
                 old_files = comment_db.files if comment_db.files else []
                 file_changes = compare_lists(old_files, update_data.files)
                 files_to_delete = file_changes['removed']
+                await RepoFiles(self.session).acquire(file_changes['added'])
                 # Обновляем список файлов
                 comment_db.files = update_data.files
 
@@ -208,13 +225,9 @@ class ServiceComments(ServiceBase):
                 if hasattr(comment_db, key):
                     setattr(comment_db, key, value)
 
-            # Удаляем файлы из S3, если есть удаленные
-            if files_to_delete:
-                try:
-                    await delete_files_from_s3(files_to_delete)
-                except Exception as s3_exc:
-                    # Логируем ошибку, но продолжаем обновление комментария
-                    logger.warning(f"Failed to delete files from S3: {s3_exc}")
+            # Ставим удалённые файлы в очередь на удаление из S3 (в той же транзакции)
+            RepoS3Outbox(self.session).add(files_to_delete)
+            await RepoWorkDocuments(self.session).refresh(answer_ids=[comment_db.answer_id])
 
             await self.session.commit()
             return JSONResponse(
@@ -247,6 +260,7 @@ class ServiceComments(ServiceBase):
 
 
             await self.session.delete(comment_db)
+            await RepoWorkDocuments(self.session).refresh(answer_ids=[comment_db.answer_id])
             await self.session.commit()
             return JSONResponse({"status": "ok"}, 200)
 
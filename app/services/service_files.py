@@ -5,15 +5,45 @@ import uuid
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
-from app.config.boto import delete_files_from_s3, get_presigned_url, get_upload_link_to_temp
+from app.config.boto import (
+    abort_multipart_upload,
+    complete_multipart_upload,
+    delete_files_from_s3,
+    get_presigned_url,
+    get_upload_link_to_temp,
+    get_upload_links,
+    is_cas_key,
+)
 from app.config.config_app import settings
+from app.config.redis import red_async_client
 from app.exceptions.responses import *
 from app.models.model_users import Users
-from app.schemas.schema_files import UploadFileResponse, UploadFileResponse
+from app.schemas.schema_files import (
+    MultipartAbortRequest,
+    MultipartCompleteRequest,
+    UploadFileResponse,
+    UploadLinkBatchItem,
+    UploadLinksRequest,
+)
 from app.utils.logger import logger
 from app.services.service_base import ServiceBase
 
 
+# Незавершённые multipart upload отменяет правило жизненного цикла через сутки (provision_bucket),
+# правило срабатывает раз в сутки - владелец хранится с запасом
+MULTIPART_OWNER_TTL = 2 * 24 * 3600
+
+
+def _multipart_owner_key(upload_id: str) -> str:
+    return f"multipart:{upload_id}"
+
+
+async def _check_multipart_owner(upload_id: str, key: str, user: Users):
+    """Завершить или отменить загрузку по частям может только тот, кто её начал"""
+    owner = await red_async_client.get(_multipart_owner_key(upload_id))
+    if owner != f"{user.id}|{key}":
+        raise ErrorPermissionDenied()
+
 
 class ServiceFiles(ServiceBase):
 
@@ -36,9 +66,64 @@ class ServiceFiles(ServiceBase):
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+    async def create_many(self, data: UploadLinksRequest, user: Users) -> list[UploadLinkBatchItem]:
+        try:
+            items = await get_upload_links(data.files)
+            multipart = [item for item in items if item.multipart is not None]
+            if multipart:
+                async with red_async_client.pipeline(transaction=False) as pipe:
+                    for item in multipart:
+                        pipe.set(
+                            _multipart_owner_key(item.multipart.upload_id),
+                            f"{user.id}|{item.key}",
+                            ex=MULTIPART_OWNER_TTL,
+                        )
+                    await pipe.execute()
+            return items
+
+        except Exception as exc:
+            logger.exception(exc)
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+    async def complete_multipart(self, data: MultipartCompleteRequest, user: Users) -> JSONResponse:
+        try:
+            await _check_multipart_owner(data.upload_id, data.key, user)
+            await complete_multipart_upload(data)
+            await red_async_client.delete(_multipart_owner_key(data.upload_id))
+            return JSONResponse(
+                {"status": "ok"},
+                200
+            )
+
+        except HTTPException:
+            raise
+        except Exception as exc:
+            logger.exception(exc)
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+    async def abort_multipart(self, data: MultipartAbortRequest, user: Users) -> JSONResponse:
+        try:
+            await _check_multipart_owner(data.upload_id, data.key, user)
+            await abort_multipart_upload(data.key, data.upload_id)
+            await red_async_client.delete(_multipart_owner_key(data.upload_id))
+            return JSONResponse(
+                {"status": "ok"},
+                200
+            )
+
+        except HTTPException:
+            raise
+        except Exception as exc:
+            logger.exception(exc)
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
     async def delete(self, keys: list[str]) -> JSONResponse:
         try:
-            await delete_files_from_s3(keys)
+            # Объекты по содержимому общие для многих записей: их удаляет очередь или сборщик мусора
+            await delete_files_from_s3([key for key in keys if not is_cas_key(key)])
             return JSONResponse(
                 {"status": "ok"},
                 200
@@ -5,8 +5,7 @@ from app.exceptions.responses import ErrorPermissionDenied
 from app.models.model_users import Users, teachers_students, RoleUser
 from app.models.model_classroom import Classrooms
 from app.models.model_tasks import Tasks
-from app.models.model_works import Works, Answers, Assessments, StatusWork
-from app.models.model_tasks import Criterions, Exercises
+from app.models.model_works import Works, StatusWork, WorkScores
 from app.schemas.schema_journal import (
     ClassroomPerformanse,
     FiltersClassroomJournalResponse,
@@ -16,6 +15,7 @@ from app.schemas.schema_journal import (
     StudentWorkPerformanse
 )
 from app.services.service_base import ServiceBase
+from app.utils.filters_cache import FiltersCache, filters_cache
 from app.utils.logger import logger
 from fastapi import HTTPException
 
@@ -33,52 +33,9 @@ class ServiceJournal(ServiceBase):
             if teacher.role is  RoleUser.student:
                 raise ErrorPermissionDenied()
 
-            # Получаем список классов учителя
-            classrooms_stmt = (
-                select(Classrooms.id, Classrooms.name)
-                .where(Classrooms.teacher_id == teacher.id)
-            )
-            classrooms_result = await self.session.execute(classrooms_stmt)
-            classrooms_rows = classrooms_result.all()
-            classrooms = [
-                NameFilter(id=row.id, name=row.name)
-                for row in classrooms_rows
-            ]
-
-            # Получаем список задач учителя
-            tasks_stmt = (
-                select(Tasks.id, Tasks.name)
-                .where(Tasks.teacher_id == teacher.id)
-            )
-            tasks_result = await self.session.execute(tasks_stmt)
-            tasks_rows = tasks_result.all()
-            tasks = [
-                NameFilter(id=row.id, name=row.name)
-                for row in tasks_rows
-            ]
-
-            # Получаем диапазон дат из работ учителя (min/max created_at)
-            dates_stmt = (
-                select(
-                    func.min(Works.created_at).label("min_date"),
-                    func.max(Works.created_at).label("max_date")
-                )
-                .select_from(Works)
-                .join(Tasks, Works.task_id == Tasks.id)
-                .where(Tasks.teacher_id == teacher.id)
-            )
-            dates_result = await self.session.execute(dates_stmt)
-            dates_row = dates_result.first()
-
-            # Форматируем даты в строки или используем пустые строки, если данных нет
-            start_date = dates_row.min_date.strftime("%Y-%m-%d") if dates_row and dates_row.min_date else ""
-            end_date = dates_row.max_date.strftime("%Y-%m-%d") if dates_row and dates_row.max_date else ""
-
-            return FiltersClassroomJournalResponse(
-                start_date=start_date,
-                end_date=end_date,
-                classrooms=classrooms,
-                tasks=tasks
+            return await filters_cache.get_or_load(
+                "journal", teacher.id, None, [FiltersCache.teacher_tag(teacher.id)],
+                FiltersClassroomJournalResponse, lambda: self._load_filters(teacher),
             )
 
         except Exception as exc:
@@ -86,6 +43,55 @@ class ServiceJournal(ServiceBase):
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    async def _load_filters(self, teacher: Users) -> FiltersClassroomJournalResponse:
+        # Получаем список классов учителя
+        classrooms_stmt = (
+            select(Classrooms.id, Classrooms.name)
+            .where(Classrooms.teacher_id == teacher.id)
+        )
+        classrooms_result = await self.session.execute(classrooms_stmt)
+        classrooms_rows = classrooms_result.all()
+        classrooms = [
+            NameFilter(id=row.id, name=row.name)
+            for row in classrooms_rows
+        ]
+
+        # Получаем список задач учителя
+        tasks_stmt = (
+            select(Tasks.id, Tasks.name)
+            .where(Tasks.teacher_id == teacher.id)
+        )
+        tasks_result = await self.session.execute(tasks_stmt)
+        tasks_rows = tasks_result.all()
+        tasks = [
+            NameFilter(id=row.id, name=row.name)
+            for row in tasks_rows
+        ]
+
+        # Получаем диапазон дат из работ учителя (min/max created_at)
+        dates_stmt = (
+            select(
+                func.min(Works.created_at).label("min_date"),
+                func.max(Works.created_at).label("max_date")
+            )
+            .select_from(Works)
+            .join(Tasks, Works.task_id == Tasks.id)
+            .where(Tasks.teacher_id == teacher.id)
+        )
+        dates_result = await self.session.execute(dates_stmt)
+        dates_row = dates_result.first()
+
+        # Форматируем даты в строки или используем пустые строки, если данных нет
+        start_date = dates_row.min_date.strftime("%Y-%m-%d") if dates_row and dates_row.min_date else ""
+        end_date = dates_row.max_date.strftime("%Y-%m-%d") if dates_row and dates_row.max_date else ""
+
+        return FiltersClassroomJournalResponse(
+            start_date=start_date,
+            end_date=end_date,
+            classrooms=classrooms,
+            tasks=tasks
+        )
+
     async def get(self, filters: FiltersClassroomJournalRequest, teacher: Users) -> ClassroomPerformanse:
         """
         Получение данных журнала класса:
@@ -138,19 +144,12 @@ class ServiceJournal(ServiceBase):
                         Works.id.label("work_id"),
                         Tasks.name.label("task_name"),
                         Works.status.label("status"),
-                        func.sum(Assessments.points).label("score"),
-                        func.sum(Criterions.score).label("max_score")
+                        WorkScores.score.label("score"),
+                        WorkScores.max_score.label("max_score")
                     )
                     .select_from(Works)
                     .join(Tasks, Works.task_id == Tasks.id)
-                    .outerjoin(Answers, Works.id == Answers.work_id)
-                    .outerjoin(Exercises, Answers.exercise_id == Exercises.id)
-                    .outerjoin(Criterions, Exercises.id == Criterions.exercise_id)
-                    .outerjoin(
-                        Assessments,
-                        (Answers.id == Assessments.answer_id) &
-                        (Criterions.id == Assessments.criterion_id)
-                    )
+                    .outerjoin(WorkScores, WorkScores.work_id == Works.id)
                     .where(Works.student_id == student_id)
                     .where(Tasks.teacher_id == teacher.id)
                 )
@@ -180,19 +179,13 @@ class ServiceJournal(ServiceBase):
                         # Если дата невалидна, пропускаем фильтр
                         pass
 
-                # Группируем для агрегации баллов
-                works_stmt = works_stmt.group_by(
-                    Works.id,
-                    Tasks.name,
-                    Works.status
-                )
-
                 works_result = await self.session.execute(works_stmt)
                 works_rows = works_result.all()
 
                 # Формируем список работ
                 works_list = []
                 verificated_works_count = 0
+                scored_works_count = 0
                 total_score = 0
 
                 for work_row in works_rows:
@@ -211,15 +204,18 @@ class ServiceJournal(ServiceBase):
                     )
 
                     # Подсчитываем верифицированные работы и баллы
-                    if work_row.status == StatusWork.verificated:
+                    if work_row.status == StatusWork.verified:
                         verificated_works_count += 1
-                        total_score += score/max_score
+                        # У задачи без критериев максимум 0 - такую работу в средний балл не берём
+                        if max_score > 0:
+                            scored_works_count += 1
+                            total_score += score/max_score
 
                 # Вычисляем средний балл (только для верифицированных работ)
                 average_score = 0
-                if verificated_works_count > 0:
+                if scored_works_count > 0:
                     # Средний балл в процентах, округленный до целого
-                    average_score = round((total_score / verificated_works_count) * 100)
+                    average_score = round((total_score / scored_works_count) * 100)
 
                 students_performance.append(
                     StudentsPerformanseItem(
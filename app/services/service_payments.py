@@ -16,6 +16,7 @@ from app.schemas.schema_payments import (
     YooKassaWebhookNotification,
 )
 from app.services.service_base import ServiceBase
+from app.utils.entitlements_cache import entitlements_cache
 from app.utils.logger import logger
 
 
@@ -155,7 +156,7 @@ class ServicePayments(ServiceBase):
         3. Обновить payment.status = succeeded
         4. Найти subscription_id
         5. Обновить подписку: продлить дату, увеличить лимиты
-        6. Закоммитить транзакцию
+        6. Закоммитить транзакцию, сбросить кэш прав по подписке
         """
         payment_provider_id = payment_object.id
         internal_payment_id = None
@@ -219,8 +220,9 @@ class ServicePayments(ServiceBase):
         subscription.used_checks = 0
         # Если used_checks становится отрицательным, устанавливаем в 0
 
-        # Шаг 6: Закоммитить транзакцию
+        # Шаг 6: Закоммитить транзакцию и сбросить кэш прав по подписке
         await self.session.commit()
+        await entitlements_cache.invalidate([subscription.user_id])
         logger.info(
             f"Платеж {payment.id} успешно обработан. Подписка {subscription.id} обновлена: "
             f"finish_at={subscription.finish_at}, used_checks={subscription.used_checks}"
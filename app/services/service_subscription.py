@@ -9,14 +9,23 @@ from app.config.config_app import settings
 from app.exceptions.responses import ErrorNotExists
 from app.models.model_subscription import PaymentStatus, Subscriptions, Payments, Plans
 from app.repositories.repo_subscription import RepoSubscription
-from app.schemas.schema_subscription import SubscriptionCancel, SubscriptionStartPeriodRequest, SubscriptionRead
+from app.schemas.schema_subscription import SubscriptionCancel, SubscriptionEntitlements, SubscriptionStartPeriodRequest, SubscriptionRead
 from app.services.service_base import ServiceBase
+from app.utils.entitlements_cache import entitlements_cache
 from app.utils.logger import logger
 
 
 class ServiceSubscription(ServiceBase):
     """Сервис для управления подписками"""
 
+    async def get_entitlements(self, user_id: uuid.UUID) -> SubscriptionEntitlements | None:
+        """Права по активной подписке пользователя (через кэш); None - активной подписки нет"""
+        async def load():
+            row = await RepoSubscription(self.session).get_entitlements(user_id)
+            return SubscriptionEntitlements.model_validate(row) if row is not None else None
+
+        return await entitlements_cache.get_or_load(user_id, load)
+
     async def cancel_subscription(self, data: SubscriptionCancel, user_id: uuid.UUID) -> dict:
         """
         Отмена подписки с проверкой условий возврата средств.
@@ -128,6 +137,7 @@ class ServiceSubscription(ServiceBase):
                     payment.status = PaymentStatus.refunded
                     subscription.finish_at = datetime.now(timezone.utc)
                     await self.session.commit()
+                    await entitlements_cache.invalidate([subscription.user_id])
                     
                     logger.info(
                         f"Возврат средств успешно создан в ЮКассе. "
@@ -156,6 +166,7 @@ class ServiceSubscription(ServiceBase):
                 # Отменяем подписку без возврата: устанавливаем finish_at на текущую дату
                 subscription.finish_at = datetime.now(timezone.utc)
                 await self.session.commit()
+                await entitlements_cache.invalidate([subscription.user_id])
                 
                 return {
                     "status": "cancelled",
@@ -201,6 +212,7 @@ class ServiceSubscription(ServiceBase):
         subscription.started_at = now_utc
         subscription.finish_at = now_utc + timedelta(days=plan.expiration_days)
         await self.session.commit()
+        await entitlements_cache.invalidate([user_id])
         # Перезагружаем подписку с планом для ответа
         subscription = await repo.get(data.id)
         return SubscriptionRead.model_validate(subscription)
@@ -12,9 +12,14 @@ from app.repositories.repo_task import RepoTasks
 from app.schemas.schema_tasks import *
 from app.models.model_tasks import  Criterions, Exercises, Tasks
 from app.schemas.schema_files import IFile, compare_lists
-from app.config.boto import delete_files_from_s3, get_presigned_url
+from app.config.boto import presign_many, promote_temp_keys, url_epoch
+from app.repositories.repo_files import RepoFiles
+from app.repositories.repo_s3_outbox import RepoS3Outbox
+from app.repositories.repo_work_scores import RepoWorkScores
 
 from app.models.model_users import RoleUser, Users
+from app.utils.etag import etag_matches, make_etag
+from app.utils.filters_cache import FiltersCache, filters_cache
 from app.utils.logger import logger
 from app.services.service_base import ServiceBase
 
@@ -29,9 +34,13 @@ class ServiceTasks(ServiceBase):
             task_dict = data.model_dump(exclude={"exercises"})
             task = Tasks(teacher_id=teacher.id, **task_dict)
 
+            # Новые загрузки переносим из временной области в постоянную
+            promoted = await promote_temp_keys(key for exercise in data.exercises for key in exercise.files)
+
             # Создаем вложенные объекты Exercises и Criterions
             exercises_orm = []
             for exercise_data in data.exercises:
+                exercise_data.files = [promoted.get(key, key) for key in exercise_data.files]
                 # Создаем критерии для каждого упражнения
                 criterions_orm = [
                     Criterions(**criterion.model_dump())
@@ -49,8 +58,11 @@ class ServiceTasks(ServiceBase):
             task.exercises = exercises_orm
 
             self.session.add(task)
+            await RepoFiles(self.session).acquire(key for exercise in exercises_orm for key in exercise.files)
             await self.session.flush()  # Получаем ID задачи и упражнений
+            await RepoTasks(self.session).refresh_max_scores([task.id])
             await self.session.commit()
+            await filters_cache.invalidate([FiltersCache.teacher_tag(teacher.id)])
             task_read = await orm_to_task_read(task)
 
             return JSONResponse(
@@ -120,6 +132,20 @@ class ServiceTasks(ServiceBase):
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+    async def get_if_modified(self, id: uuid.UUID, teacher: Users, if_none_match: str | None) -> tuple[str, dict | None]:
+        """Условный GET задачи: (ETag, задача) или (ETag, None), если у клиента актуальная версия"""
+        if teacher.role is RoleUser.student:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User don't have permission to delete this task")
+
+        version = await RepoTasks(self.session).get_version(id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+        etag = make_etag(int(version.updated_at.timestamp() * 1e6), version.version, url_epoch())
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        return etag, await self.get(id, teacher)
+
     async def update(self, id: uuid.UUID, update_data: TaskUpdate, teacher: Users) -> TaskRead:
         try:
             if teacher.role is RoleUser.student:
@@ -141,19 +167,26 @@ class ServiceTasks(ServiceBase):
 
             exercises_orm = []
             files_to_delete = []
+            files_to_attach = []
 
             exercise_files = {}
 
             for ex_db in task_db.exercises:
               exercise_files[ex_db.id] = ex_db.files
 
+            # Новые загрузки переносим из временной области в постоянную
+            promoted = await promote_temp_keys(key for exercise in update_data.exercises for key in exercise.files)
+
             for exercise_data in update_data.exercises:
+                exercise_data.files = [promoted.get(key, key) for key in exercise_data.files]
                 criterions_orm = [
                     Criterions(**criterion.model_dump())
                     for criterion in exercise_data.criterions
                 ]
 
-                files_to_delete.extend(compare_lists(exercise_files[exercise_data.id], exercise_data.files)['removed'])
+                file_changes = compare_lists(exercise_files[exercise_data.id], exercise_data.files)
+                files_to_delete.extend(file_changes['removed'])
+                files_to_attach.extend(file_changes['added'])
 
                 exercise_dict = exercise_data.model_dump(exclude={"criterions"})
                 exercise_orm = Exercises(**exercise_dict)
@@ -166,8 +199,18 @@ class ServiceTasks(ServiceBase):
             task_orm.exercises = exercises_orm
 
             await self.session.merge(task_orm)
-            await delete_files_from_s3(files_to_delete)
+            await RepoFiles(self.session).acquire(files_to_attach)
+            RepoS3Outbox(self.session).add(files_to_delete)
+            # Критерии могли измениться - пересчитываем максимальные баллы и сводку баллов всех работ задачи
+            await RepoTasks(self.session).refresh_max_scores([id])
+            await RepoWorkScores(self.session).refresh(task_ids=[id])
+            # Название и предмет задачи входят в фильтры учителя и учеников с работами по ней
+            students_ids = await RepoTasks(self.session).get_students_ids(id)
             await self.session.commit()
+            await filters_cache.invalidate([
+                FiltersCache.teacher_tag(teacher.id),
+                *[FiltersCache.student_tag(student_id) for student_id in students_ids],
+            ])
 
             task_read = await orm_to_task_read(task_orm)
             # Возвращаем JSON
@@ -214,18 +257,19 @@ class ServiceTasks(ServiceBase):
                 for exercise in task.exercises:
                     file_keys_to_delete.extend(exercise.files)
 
-            # Удаляем файлы из S3, если есть ключи для удаления
-            if file_keys_to_delete:
-                try:
-                    await delete_files_from_s3(file_keys_to_delete)
-                except Exception as s3_exc:
-                    # Логируем ошибку, но продолжаем удаление задачи из БД
-                    logger.warning(f"Failed to delete files from S3: {s3_exc}")
+            # Ставим файлы в очередь на удаление из S3 (удалятся после commit фоновым воркером)
+            RepoS3Outbox(self.session).add(file_keys_to_delete)
+
+            students_ids = await RepoTasks(self.session).get_students_ids(id)
 
             # Удаляем задачу из БД (каскадно удалятся упражнения и критерии)
             stmt = (delete(Tasks).where(Tasks.id == id))
             await self.session.execute(stmt)
             await self.session.commit()
+            await filters_cache.invalidate([
+                FiltersCache.teacher_tag(teacher.id),
+                *[FiltersCache.student_tag(student_id) for student_id in students_ids],
+            ])
 
             return JSONResponse(
                 content={"status": "ok"},
@@ -250,6 +294,12 @@ class ServiceTasks(ServiceBase):
                 detail="User don't have permission to get filters"
             )
 
+        return await filters_cache.get_or_load(
+            "tasks", teacher.id, None, [FiltersCache.teacher_tag(teacher.id)],
+            TasksFiltersReadSchema, lambda: self._load_filters(teacher),
+        )
+
+    async def _load_filters(self, teacher: Users) -> TasksFiltersReadSchema:
         repo = RepoTasks(self.session)
         rows = await repo.get_filters(teacher.id)
 
@@ -269,16 +319,13 @@ class ServiceTasks(ServiceBase):
             tasks=tasks_list
         )
 
-async def orm_to_exercise_read(exercise_orm: Exercises) -> ExerciseRead:
-    # Получаем presigned URLs для файлов
-    files: list[IFile] = []
-    if exercise_orm.files:
-        for key in exercise_orm.files:
-            try:
-                presigned_url = await get_presigned_url(key)
-                files.append(IFile(key=key, file=presigned_url))
-            except Exception as exc:
-                logger.warning(f"Failed to get presigned URL for file {key}: {exc}")
+async def orm_to_exercise_read(exercise_orm: Exercises, urls: dict[str, str]) -> ExerciseRead:
+    # Presigned URLs уже получены пачкой в orm_to_task_read
+    files: list[IFile] = [
+        IFile(key=key, file=urls[key])
+        for key in (exercise_orm.files or [])
+        if key in urls
+    ]
 
     # Преобразуем Criterions → CriterionRead
     criterions: list[CriterionRead] = [
@@ -302,10 +349,13 @@ async def orm_to_exercise_read(exercise_orm: Exercises) -> ExerciseRead:
     )
 
 async def orm_to_task_read(task_orm: Tasks) -> TaskRead:
-    # Асинхронно преобразуем все упражнения
-    exercises: list[ExerciseRead] = await asyncio.gather(
-        *[orm_to_exercise_read(ex) for ex in task_orm.exercises]
+    # Подписываем файлы всех упражнений одной пачкой
+    urls = await presign_many(
+        key for ex in task_orm.exercises for key in (ex.files or [])
     )
+    exercises: list[ExerciseRead] = [
+        await orm_to_exercise_read(ex, urls) for ex in task_orm.exercises
+    ]
 
     return TaskRead(
         id=task_orm.id,
@@ -1,6 +1,11 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal
+
 from fastapi import HTTPException, status
 import uuid
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import pika
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -13,19 +18,27 @@ from app.models.model_users import  RoleUser, Users, teachers_students
 from app.models.model_works import Assessments, Answers, StatusWork, Works
 from app.models.model_files import AnswerFiles, StatusAnswerFile
 from app.repositories.repo_task import RepoTasks
-from app.repositories.repo_subscription import RepoSubscription
+from app.repositories.repo_files import RepoFiles
+from app.repositories.repo_s3_outbox import RepoS3Outbox
 from datetime import datetime, timezone
 from app.schemas.schema_comment import CommentRead, Coordinates as CoordinatesSchema
 from app.schemas.schema_files import IFile, IFileAnswer, IFileAnserUpdate, compare_lists
-from app.schemas.schema_work import AnswerUpdate, CriterionRead, ExerciseRead, TaskRead
-from app.config.boto import delete_files_from_s3, get_presigned_url
+from app.schemas.schema_work import AddAnswerFile, AnswerTextRead, AnswerUpdate, CriterionRead, ExerciseRead, RemoveAnswerFile, SetAnswerText, SetAssessmentPoints, SetStatus, TaskRead, WorkPatch, WorkPatchResult
+from app.config.boto import presign_many, promote_temp_keys, url_epoch
+from app.config.db import AsyncSessionLocal
 from app.config.rabbit import WorkRequestDTO, channel
-from app.schemas.schema_work import AnswerRead, AssessmentRead, SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorkEasyRead, WorkRead, WorkUpdate, WorksFilterResponseStudent, WorksFilterResponseTeacher
+from app.schemas.schema_work import AnswerRead, AssessmentRead, SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorkEasyRead, WorkRead, WorkUpdate, WorksFilterResponseStudent, WorksFilterResponseTeacher, WorksPage, WorksPageParams, WorksSort, WorksStatusSummary, WorksSummaryFilters, WorkLoader
+from app.utils.filters_cache import FiltersCache, filters_cache
 from app.utils.logger import logger
+from app.utils.etag import etag_matches, make_etag
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
 from app.transformers.transformer_work import TransformerWorks
 
 from app.repositories.repo_work import RepoWorks
+from app.repositories.repo_work_scores import RepoWorkScores
+from app.repositories.repo_work_documents import RepoWorkDocuments
 from app.services.service_base import ServiceBase
+from app.services.service_subscription import ServiceSubscription
 
 class ServiceWork(ServiceBase):
 
@@ -34,8 +47,14 @@ class ServiceWork(ServiceBase):
         if user.role is RoleUser.student:
             raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
 
-        rows = await repo.get_smart_filters_teacher(user.id, filters)
-        return TransformerWorks.handle_filters_response(user, rows)
+        async def load():
+            rows = await repo.get_smart_filters_teacher(user.id, filters)
+            return TransformerWorks.handle_filters_response(user, rows)
+
+        return await filters_cache.get_or_load(
+            "works_teacher", user.id, filters.model_dump(mode="json"),
+            [FiltersCache.teacher_tag(user.id)], WorksFilterResponseTeacher, load,
+        )
 
 
     async def get_smart_filters_student(self, user: Users, filters: SmartFiltersWorkStudent)-> WorksFilterResponseStudent:
@@ -43,22 +62,54 @@ class ServiceWork(ServiceBase):
         if user.role is RoleUser.teacher:
             raise ErrorRolePermissionDenied(RoleUser.student, user.role)
 
-        rows = await repo.get_smart_filters_student(user.id, filters)
-        return TransformerWorks.handle_filters_response(user, rows)
+        async def load():
+            rows = await repo.get_smart_filters_student(user.id, filters)
+            return TransformerWorks.handle_filters_response(user, rows)
+
+        return await filters_cache.get_or_load(
+            "works_student", user.id, filters.model_dump(mode="json"),
+            [FiltersCache.student_tag(user.id)], WorksFilterResponseStudent, load,
+        )
+
+    async def get_status_summary_teacher(self, user: Users, filters: WorksSummaryFilters) -> WorksStatusSummary:
+        """Количество работ по статусам для задач и классов учителя (бейджи на дашборде)"""
+        try:
+            repo = RepoWorks(self.session)
+            if user.role is RoleUser.student:
+                raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
+
+            async def load():
+                summary = await repo.get_status_summary_teacher(user.id, filters)
+                return TransformerWorks.handle_status_summary(summary)
+
+            # Тот же тег, что и у фильтров: сбрасывается при любом изменении работ учеников учителя
+            return await filters_cache.get_or_load(
+                "works_summary", user.id, filters.model_dump(mode="json"),
+                [FiltersCache.teacher_tag(user.id)], WorksStatusSummary, load,
+            )
+
+        except HTTPException as exc:
+            raise
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
 
     async def get_works_list_teacher(
         self,
         user: Users,
-        filters: SmartFiltersWorkTeacher
-    ) -> list[WorkEasyRead]:
+        filters: SmartFiltersWorkTeacher,
+        page: WorksPageParams | None = None,
+    ) -> WorksPage:
         """Получение списка работ для учителя с применением умных фильтров"""
         try:
             if user.role is RoleUser.student and user.role is not RoleUser.admin:
                 raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
 
+            page = resolve_works_page(page or WorksPageParams(), filters)
             repo = RepoWorks(self.session)
-            rows = await repo.get_works_list_teacher(user.id, filters)
-            return rows_to_easy_read(rows)
+            rows, total = await repo.get_works_list_teacher(user.id, filters, page, decode_works_cursor(page))
+            return rows_to_works_page(rows, total, page)
 
         except HTTPException as exc:
             raise
@@ -70,16 +121,18 @@ class ServiceWork(ServiceBase):
     async def get_works_list_student(
         self,
         user: Users,
-        filters: SmartFiltersWorkStudent
-    ) -> list[WorkEasyRead]:
+        filters: SmartFiltersWorkStudent,
+        page: WorksPageParams | None = None,
+    ) -> WorksPage:
         """Получение списка работ для ученика с применением умных фильтров"""
         try:
             if user.role is RoleUser.teacher and user.role is not RoleUser.admin:
                 raise ErrorRolePermissionDenied(RoleUser.student, user.role)
 
+            page = resolve_works_page(page or WorksPageParams(), filters)
             repo = RepoWorks(self.session)
-            rows = await repo.get_works_list_student(user.id, filters)
-            return rows_to_easy_read(rows)
+            rows, total = await repo.get_works_list_student(user.id, filters, page, decode_works_cursor(page))
+            return rows_to_works_page(rows, total, page)
 
         except HTTPException as exc:
             raise
@@ -88,6 +141,39 @@ class ServiceWork(ServiceBase):
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    async def export_works_teacher(
+        self,
+        user: Users,
+        filters: SmartFiltersWorkTeacher,
+        export_format: Literal["csv", "ndjson"] = "csv",
+    ) -> StreamingResponse:
+        """
+        Выгрузка всех работ учителя по фильтрам в CSV или NDJSON.
+        Строки кодируются и отдаются клиенту по мере чтения из серверного курсора.
+        """
+        if user.role is not RoleUser.teacher:
+            raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
+
+        teacher_id = user.id
+
+        async def batches():
+            # Своя сессия: ответ отдаётся уже после выхода из обработчика запроса
+            async with AsyncSessionLocal() as session:
+                async for rows in RepoWorks(session).stream_works_list_teacher(teacher_id, filters):
+                    yield [row_to_export(row) for row in rows]
+
+        if export_format == "ndjson":
+            return StreamingResponse(
+                encode_ndjson(batches()),
+                media_type="application/x-ndjson",
+                headers={"Content-Disposition": 'attachment; filename="works.ndjson"'},
+            )
+        return StreamingResponse(
+            encode_csv(batches()),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="works.csv"'},
+        )
+
 
     async def create_works(
         self,
@@ -116,6 +202,10 @@ class ServiceWork(ServiceBase):
 
             await repo.create_works(task_db, students_ids)
             await self.session.commit()
+            await filters_cache.invalidate([
+                FiltersCache.teacher_tag(teacher.id),
+                *[FiltersCache.student_tag(student_id) for student_id in students_ids],
+            ])
 
             return JSONResponse(
                 content={"status": "ok"},
@@ -131,34 +221,42 @@ class ServiceWork(ServiceBase):
             raise HTTPException(status_code=500, detail="Internal Server Error")  
 
 
-    async def get(self, work_id: uuid.UUID, user: Users) -> WorkRead:
-        """Получение работы с проверкой прав доступа"""
+    async def get(self, work_id: uuid.UUID, user: Users, loader: WorkLoader = "document") -> WorkRead:
+        """
+        Получение работы с проверкой прав доступа.
+        loader="document" - сохранённый снимок из work_documents (пересобирается, если устарел),
+        loader="json" - вся работа одним запросом в виде JSON-документа, без ORM-объектов.
+        """
         try:
             repo = RepoWorks(self.session)
+
+            if loader == "document":
+                repo_documents = RepoWorkDocuments(self.session)
+                row = await repo_documents.get(work_id)
+                if row is None:
+                    raise ErrorNotExists(Works)
+                await self._check_read_access(user, row.student_id, row.teacher_id)
+                document = row.document
+                if document is None or not row.fresh:
+                    # Снимка ещё нет или работа менялась в обход refresh - собираем заново
+                    document = await repo_documents.rebuild(work_id)
+                    await self.session.commit()
+                return await attach_work_file_urls(WorkRead.model_validate_json(document))
+
+            if loader == "json":
+                row = await repo.get_document(work_id)
+                if row is None:
+                    raise ErrorNotExists(Works)
+                work_read = WorkRead.model_validate_json(row.document)
+                await self._check_read_access(user, work_read.student_id, row.teacher_id)
+                return await attach_work_file_urls(work_read)
+
             work_db = await repo.get(work_id)
             
             if work_db is None:
                 raise ErrorNotExists(Works)
             
-            # Проверка прав доступа: студент может видеть только свои работы, учитель - работы своих студентов
-            if user.role is RoleUser.student:
-                if work_db.student_id != user.id:
-                    raise ErrorPermissionDenied()
-            elif user.role is RoleUser.teacher:
-                # Учитель может видеть только работы по своим задачам
-                if work_db.task.teacher_id != user.id:
-                    raise ErrorPermissionDenied()
-                
-                # Проверка наличия активной подписки для учителя
-                # get_by_user_id уже проверяет finish_at > datetime.now(timezone.utc)
-                repo_subscription = RepoSubscription(self.session)
-                subscription = await repo_subscription.get_by_user_id(user.id)
-                
-                if subscription is None or subscription.plan_id is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Данный функционал доступен по подписке. Пожалуйста, оформите подписку для доступа к проверке работ учеников."
-                    )
+            await self._check_read_access(user, work_db.student_id, work_db.task.teacher_id)
             
             # Преобразуем ORM в схему
             work_read = await orm_to_work_read(work_db)
@@ -171,6 +269,54 @@ class ServiceWork(ServiceBase):
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    async def get_if_modified(
+        self,
+        work_id: uuid.UUID,
+        user: Users,
+        if_none_match: str | None,
+        loader: WorkLoader = "document",
+    ) -> tuple[str, WorkRead | None]:
+        """
+        Условный GET: сначала одним лёгким запросом сверяет версию работы с If-None-Match.
+        Возвращает (ETag, работа) или (ETag, None), если у клиента актуальная версия.
+        """
+        repo = RepoWorks(self.session)
+        version = await repo.get_version(work_id)
+        if version is None:
+            raise ErrorNotExists(Works)
+
+        etag = make_etag(
+            int(version.updated_at.timestamp() * 1e6), version.version,
+            int(version.task_updated_at.timestamp() * 1e6), version.task_version,
+            url_epoch(),
+        )
+        if etag_matches(if_none_match, etag):
+            await self._check_read_access(user, version.student_id, version.teacher_id)
+            return etag, None
+        return etag, await self.get(work_id, user, loader)
+
+    async def _check_read_access(self, user: Users, student_id: uuid.UUID, teacher_id: uuid.UUID):
+        """Студент может видеть только свои работы, учитель - работы по своим задачам и только с подпиской"""
+        if user.role is RoleUser.student:
+            if student_id != user.id:
+                raise ErrorPermissionDenied()
+        elif user.role is RoleUser.teacher:
+            # Учитель может видеть только работы по своим задачам
+            if teacher_id != user.id:
+                raise ErrorPermissionDenied()
+            
+            # Проверка наличия активной подписки для учителя (из кэша прав, без запроса к БД)
+            await self._check_subscription(user)
+
+    async def _check_subscription(self, user: Users):
+        """Функционал проверки работ доступен учителю только с активной подпиской с планом"""
+        entitlements = await ServiceSubscription(self.session).get_entitlements(user.id)
+        if entitlements is None or entitlements.plan_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Данный функционал доступен по подписке. Пожалуйста, оформите подписку для доступа к проверке работ учеников."
+            )
+
     async def update(self, work_id: uuid.UUID, update_data: WorkUpdate, user: Users) -> WorkRead:
         """Обновление работы с проверкой прав доступа и ограничений по полям"""
         try:
@@ -188,24 +334,20 @@ class ServiceWork(ServiceBase):
                 if work_db.task.teacher_id != user.id:
                     raise ErrorPermissionDenied()
                 
-                # Проверка наличия активной подписки для учителя
-                # get_by_user_id уже проверяет finish_at > datetime.now(timezone.utc)
-                repo_subscription = RepoSubscription(self.session)
-                subscription = await repo_subscription.get_by_user_id(user.id)
-                
-                if subscription is None or subscription.plan_id is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Данный функционал доступен по подписке. Пожалуйста, оформите подписку для доступа к проверке работ учеников."
-                    )
+                # Проверка наличия активной подписки для учителя (из кэша прав, без запроса к БД)
+                await self._check_subscription(user)
 
             # Применяем изменения с учетом прав доступа
             await apply_work_updates(work_db, update_data, user, self.session)
-            # Явно добавляем объект в сессию для отслеживания изменений
-            # Это гарантирует, что SQLAlchemy отследит все изменения
-            
+            # Пересчитываем сводку баллов работы в той же транзакции
+            await RepoWorkScores(self.session).refresh(work_ids=[work_db.id])
+            await RepoWorkDocuments(self.session).refresh(work_ids=[work_db.id])
+            # Статус работы входит в фильтры учителя и ученика
+            tags = [FiltersCache.teacher_tag(work_db.task.teacher_id), FiltersCache.student_tag(work_db.student_id)]
+
             await self.session.commit()
-            
+            await filters_cache.invalidate(tags)
+
             # Получаем обновленную работу
             work_db = await repo.get(work_id)
             work_read = await orm_to_work_read(work_db)
@@ -219,6 +361,136 @@ class ServiceWork(ServiceBase):
             await self.session.rollback()
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    async def patch(self, work_id: uuid.UUID, patch_data: WorkPatch, user: Users) -> WorkPatchResult:
+        """
+        Частичное обновление работы: каждая операция - один точечный запрос, без загрузки графа.
+        Возвращает только изменённые ответы, оценки и файлы.
+        """
+        try:
+            if user.role not in (RoleUser.student, RoleUser.teacher):
+                raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
+
+            repo = RepoWorks(self.session)
+            target = await repo.get_patch_target(work_id)
+            if target is None:
+                raise ErrorNotExists(Works)
+            await self._check_read_access(user, target.student_id, target.teacher_id)
+
+            # Новые загрузки переносим из временной области в постоянную
+            promoted = await promote_temp_keys(
+                operation.key for operation in patch_data.operations if isinstance(operation, AddAnswerFile)
+            )
+
+            work_status, finish_date = target.status, target.finish_date
+            answers: dict[uuid.UUID, AnswerTextRead] = {}
+            assessments: dict[uuid.UUID, AssessmentRead] = {}
+            added_files: list[IFileAnswer] = []
+            removed_files: list[uuid.UUID] = []
+            files_to_delete: list[str] = []
+
+            for operation in patch_data.operations:
+                if isinstance(operation, SetStatus):
+                    check_status_change(user.role, work_status, operation.status)
+                    work_status = operation.status
+                    # Как и в PUT: учителю дата завершения проставляется автоматически
+                    if (
+                        user.role is RoleUser.teacher
+                        and work_status in [StatusWork.verification, StatusWork.verified]
+                        and not finish_date
+                    ):
+                        finish_date = datetime.utcnow()
+
+                elif isinstance(operation, SetAssessmentPoints):
+                    if user.role is not RoleUser.teacher:
+                        raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
+                    row = await repo.set_assessment_points(work_id, operation.assessment_id, operation.points)
+                    if row is None:
+                        max_score = await repo.get_assessment_max_score(work_id, operation.assessment_id)
+                        if max_score is None:
+                            raise HTTPException(status_code=404, detail="Assessment not found")
+                        raise HTTPException(400, "Too many points")
+                    assessments[row.id] = AssessmentRead(
+                        id=row.id,
+                        answer_id=row.answer_id,
+                        criterion_id=row.criterion_id,
+                        points=row.points,
+                        criterion=[CriterionRead(id=row.criterion_id, name=row.criterion_name, score=row.criterion_score)],
+                    )
+
+                elif user.role is not RoleUser.student:
+                    # Ответы и их файлы меняет только студент
+                    raise ErrorRolePermissionDenied(RoleUser.student, user.role)
+
+                elif isinstance(operation, SetAnswerText):
+                    row = await repo.set_answer_text(work_id, operation.answer_id, operation.text)
+                    if row is None:
+                        raise ErrorNotExists(Answers)
+                    answers[row.id] = AnswerTextRead(id=row.id, text=row.text)
+
+                elif isinstance(operation, AddAnswerFile):
+                    key = promoted.get(operation.key, operation.key)
+                    row = await repo.add_answer_file(work_id, operation.answer_id, key)
+                    if row is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Answer {operation.answer_id} not found or file with key {key} already exists"
+                        )
+                    await RepoFiles(self.session).acquire([row.key])
+                    added_files.append(IFileAnswer(id=row.id, key=row.key, file="", ai_status=row.ai_status))
+
+                elif isinstance(operation, RemoveAnswerFile):
+                    row = await repo.remove_answer_file(work_id, operation.file_id)
+                    if row is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"File with id {operation.file_id} not found"
+                        )
+                    removed_files.append(row.id)
+                    files_to_delete.append(row.key)
+
+            # Ставим удалённые файлы в очередь на удаление из S3 (в той же транзакции)
+            RepoS3Outbox(self.session).add(files_to_delete)
+
+            changes = {}
+            if work_status != target.status:
+                changes["status"] = work_status
+            if finish_date != target.finish_date:
+                changes["finish_date"] = finish_date
+            # Запись шла в обход ORM: версию работы (ETag) увеличиваем явно
+            work_row = await repo.save_patched_work(work_id, **changes)
+
+            if assessments or added_files or removed_files or answers:
+                await RepoWorkScores(self.session).refresh(work_ids=[work_id])
+            await RepoWorkDocuments(self.session).refresh(work_ids=[work_id])
+            await self.session.commit()
+            if changes:
+                await filters_cache.invalidate([
+                    FiltersCache.teacher_tag(target.teacher_id), FiltersCache.student_tag(target.student_id)
+                ])
+
+            # Как и в orm_to_work_read: файлы, которые не удалось подписать, в ответ не попадают
+            urls = await presign_many(file.key for file in added_files)
+            added_files = [file.model_copy(update={"file": urls[file.key]}) for file in added_files if file.key in urls]
+
+            return WorkPatchResult(
+                id=work_row.id,
+                status=work_row.status,
+                finish_date=work_row.finish_date,
+                version=work_row.version,
+                answers=list(answers.values()),
+                assessments=list(assessments.values()),
+                added_files=added_files,
+                removed_files=removed_files,
+            )
+
+        except HTTPException:
+            await self.session.rollback()
+            raise
+        except Exception as exc:
+            logger.exception(exc)
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
     async def send_work_to_verification(
         self,
         work_id: uuid.UUID,
@@ -228,16 +500,8 @@ class ServiceWork(ServiceBase):
             if user.role is RoleUser.student:
                 raise ErrorRolePermissionDenied(RoleUser.teacher, user.role)
 
-            # Проверка наличия активной подписки для учителя
-            # get_by_user_id уже проверяет finish_at > datetime.now(timezone.utc)
-            repo_subscription = RepoSubscription(self.session)
-            subscription = await repo_subscription.get_by_user_id(user.id)
-            
-            if subscription is None or subscription.plan_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Данный функционал доступен по подписке. Пожалуйста, оформите подписку для доступа к проверке работ учеников."
-                )
+            # Проверка наличия активной подписки для учителя (из кэша прав, без запроса к БД)
+            await self._check_subscription(user)
 
             stmt = (
                 select(Works)
@@ -285,6 +549,47 @@ class ServiceWork(ServiceBase):
 
 
 
+def resolve_works_page(page: WorksPageParams, filters: SmartFiltersWorkTeacher | SmartFiltersWorkStudent) -> WorksPageParams:
+    """Сортировка по умолчанию: по похожести при поиске, иначе по дате"""
+    search = (filters.search or "").strip()
+    if page.sort is None:
+        return page.model_copy(update={"sort": WorksSort.relevance if search else WorksSort.created_at})
+    if page.sort is WorksSort.relevance and not search:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Sort by relevance requires search")
+    return page
+
+
+def decode_works_cursor(page: WorksPageParams) -> tuple | None:
+    """Курсор страницы -> (значение ключа сортировки, id работы); курсор от другой сортировки - ошибка 400"""
+    if page.cursor is None:
+        return None
+    try:
+        sort, order, value, work_id = decode_cursor(page.cursor)
+        if sort != page.sort.value or order != page.order:
+            raise InvalidCursor("Cursor does not match sort order")
+        if page.sort is WorksSort.created_at:
+            value = datetime.fromisoformat(value)
+        elif page.sort is WorksSort.score:
+            value = int(value)
+        elif page.sort is WorksSort.relevance:
+            value = float(value)
+        else:
+            value = StatusWork(value)
+        return value, uuid.UUID(work_id)
+    except (InvalidCursor, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def rows_to_works_page(rows, total: int | None, page: WorksPageParams) -> WorksPage:
+    next_cursor = None
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        sort_value = last.sort_key.value if isinstance(last.sort_key, StatusWork) else last.sort_key
+        next_cursor = encode_cursor(page.sort.value, page.order, sort_value, last.id)
+    return WorksPage(items=rows_to_easy_read(rows), next_cursor=next_cursor, total=total)
+
+
 def rows_to_easy_read(rows):
     work_list = []
     for row in rows:
@@ -309,6 +614,45 @@ def rows_to_easy_read(rows):
     return work_list
 
 
+EXPORT_COLUMNS = ["id", "created_at", "student_name", "subject", "task_name", "status", "score", "max_score", "percent"]
+
+
+def row_to_export(row) -> dict:
+    """Строка списка работ -> словарь для выгрузки (без pydantic, проценты как в rows_to_easy_read)"""
+    score = row.score if row.score is not None else 0
+    max_score = row.max_score if row.max_score is not None and row.max_score > 0 else 1
+    return {
+        "id": str(row.id),
+        "created_at": row.sort_key.isoformat(),
+        "student_name": row.student_name,
+        "subject": row.subject,
+        "task_name": row.task_name,
+        "status": row.status.value,
+        "score": score,
+        "max_score": max_score,
+        "percent": round((score / max_score) * 100),
+    }
+
+
+async def encode_csv(batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """CSV по пачкам строк: один фрагмент ответа на пачку. BOM - чтобы Excel открыл UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_ndjson(batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """NDJSON по пачкам строк: по объекту JSON на строку"""
+    async for rows in batches:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
 
 async def get_students_from_classrooms(
     session: AsyncSession,
@@ -358,19 +702,16 @@ async def orm_to_assessment_read(assessment_orm: Assessments) -> AssessmentRead:
     )
 
 
-async def orm_to_comment_read(comment_orm: Comments) -> CommentRead:
+async def orm_to_comment_read(comment_orm: Comments, urls: dict[str, str]) -> CommentRead:
     """Преобразование Comment ORM в CommentRead схему"""
-    # Получаем presigned URLs для файлов
+    # Presigned URLs уже получены пачкой в orm_to_work_read
     # В модели Comments поле называется 'files', а не 'file_keys'
     file_keys = comment_orm.files if comment_orm.files else []
-    files = []
-    if file_keys:
-        for key in file_keys:
-            try:
-                presigned_url = await get_presigned_url(key)
-                files.append(IFile(key=key, file=presigned_url))
-            except Exception as exc:
-                logger.warning(f"Failed to get presigned URL for file {key}: {exc}")
+    files = [
+        IFile(key=key, file=urls[key])
+        for key in file_keys
+        if key in urls
+    ]
     
     # Преобразуем coordinates из ORM объектов в схему Coordinates
     # coordinates уже загружены через selectinload в репозитории, поэтому lazy load не произойдет
@@ -397,12 +738,13 @@ async def orm_to_comment_read(comment_orm: Comments) -> CommentRead:
     )
 
 
-async def orm_answer_files_to_ifile_answer(answer_files: list[AnswerFiles]) -> list[IFileAnswer]:
+async def orm_answer_files_to_ifile_answer(answer_files: list[AnswerFiles], urls: dict[str, str]) -> list[IFileAnswer]:
     """
     Преобразование списка AnswerFiles ORM в список IFileAnswer схем.
     
     Args:
         answer_files: Список объектов AnswerFiles из базы данных
+        urls: Заранее подписанные ссылки по ключам файлов
         
     Returns:
         Список IFileAnswer с presigned URLs и статусами
@@ -410,41 +752,35 @@ async def orm_answer_files_to_ifile_answer(answer_files: list[AnswerFiles]) -> l
     files = []
     if answer_files:
         for answer_file in answer_files:
-            try:
-                # Получаем presigned URL для файла
-                presigned_url = await get_presigned_url(answer_file.key)
-                # Создаём IFileAnswer с ключом, URL и статусом AI
-                files.append(IFileAnswer(
-                    id=answer_file.id,
-                    key=answer_file.key,
-                    file=presigned_url,
-                    ai_status=answer_file.ai_status
-                ))
-            except Exception as exc:
-                logger.warning(f"Failed to get presigned URL for file {answer_file.key}: {exc}")
+            if answer_file.key not in urls:
+                continue
+            # Создаём IFileAnswer с ключом, URL и статусом AI
+            files.append(IFileAnswer(
+                id=answer_file.id,
+                key=answer_file.key,
+                file=urls[answer_file.key],
+                ai_status=answer_file.ai_status
+            ))
     return files
 
 
-async def orm_to_answer_read(answer_orm: Answers) -> AnswerRead:
+async def orm_to_answer_read(answer_orm: Answers, urls: dict[str, str]) -> AnswerRead:
     """Преобразование Answer ORM в AnswerRead схему"""
-    import asyncio
-
     # Получаем файлы ответов с использованием новой логики
-    files = await orm_answer_files_to_ifile_answer(answer_orm.files if answer_orm.files else [])
+    files = await orm_answer_files_to_ifile_answer(answer_orm.files if answer_orm.files else [], urls)
     
     # Преобразуем assessments и comments
     assessments = [await orm_to_assessment_read(ass) for ass in answer_orm.assessments]
-    comments = [await orm_to_comment_read(comm) for comm in answer_orm.comments]
+    comments = [await orm_to_comment_read(comm, urls) for comm in answer_orm.comments]
     
     # Преобразуем exercise
     exercise_files = []
     if answer_orm.exercise and answer_orm.exercise.files:
-        for key in answer_orm.exercise.files:
-            try:
-                presigned_url = await get_presigned_url(key)
-                exercise_files.append(IFile(key=key, file=presigned_url))
-            except Exception as exc:
-                logger.warning(f"Failed to get presigned URL for file {key}: {exc}")
+        exercise_files = [
+            IFile(key=key, file=urls[key])
+            for key in answer_orm.exercise.files
+            if key in urls
+        ]
     
     exercise_read = None
     if answer_orm.exercise:
@@ -470,6 +806,45 @@ async def orm_to_answer_read(answer_orm: Answers) -> AnswerRead:
     )
 
 
+def collect_work_file_keys(work_orm: Works) -> list[str]:
+    """Все ключи файлов работы: файлы ответов, комментариев и упражнений"""
+    keys = []
+    for answer in work_orm.answers:
+        keys.extend(answer_file.key for answer_file in (answer.files or []))
+        for comment in answer.comments:
+            keys.extend(comment.files or [])
+        if answer.exercise:
+            keys.extend(answer.exercise.files or [])
+    return keys
+
+
+async def attach_work_file_urls(work: WorkRead) -> WorkRead:
+    """
+    Подписывает ссылки в документе работы из RepoWorks.get_document, где в file пока лежит ключ.
+    Как и в orm_to_work_read: все ключи одной пачкой, файлы без ссылки из ответа убираются.
+    """
+    def signed(files, urls):
+        for file in files:
+            if file.key in urls:
+                file.file = urls[file.key]
+                yield file
+
+    keys = []
+    for answer in work.answers:
+        keys.extend(file.key for file in answer.files)
+        keys.extend(file.key for file in answer.exercise.files)
+        for comment in answer.comments:
+            keys.extend(file.key for file in comment.files)
+    urls = await presign_many(keys)
+
+    for answer in work.answers:
+        answer.files = list(signed(answer.files, urls))
+        answer.exercise.files = list(signed(answer.exercise.files, urls))
+        for comment in answer.comments:
+            comment.files = list(signed(comment.files, urls))
+    return work
+
+
 async def orm_to_task_read_for_work(task_orm: Tasks) -> TaskRead:
     """Преобразование Task ORM в TaskRead схему для работы"""
     return TaskRead(
@@ -483,12 +858,10 @@ async def orm_to_task_read_for_work(task_orm: Tasks) -> TaskRead:
 
 async def orm_to_work_read(work_orm: Works) -> WorkRead:
     """Преобразование Work ORM в WorkRead схему"""
-    import asyncio
-    
-    # Асинхронно преобразуем все ответы
-    answers = await asyncio.gather(
-        *[orm_to_answer_read(answer) for answer in work_orm.answers]
-    )
+    # Подписываем все ключи работы одной пачкой (без дублей), затем собираем ответ
+    urls = await presign_many(collect_work_file_keys(work_orm))
+
+    answers = [await orm_to_answer_read(answer, urls) for answer in work_orm.answers]
     
     # Преобразуем задачу
     task_read = await orm_to_task_read_for_work(work_orm.task)
@@ -505,17 +878,56 @@ async def orm_to_work_read(work_orm: Works) -> WorkRead:
     )
 
 
+# Статусы работы в порядке возрастания
+STATUS_ORDER = {
+    StatusWork.draft: 0,
+    StatusWork.inProgress: 1,
+    StatusWork.verification: 2,
+    StatusWork.verified: 3,
+    StatusWork.canceled: 4
+}
+
+
+def check_status_change(role: RoleUser, current: StatusWork, new: StatusWork):
+    """
+    Проверка смены статуса работы (PUT и PATCH):
+    студент - только draft -> inProgress -> verification, нельзя уменьшать;
+    учитель - любые, но verified только после verification.
+    """
+    if role is RoleUser.student:
+        if new == current:
+            return
+        # Студент не может обновлять работу со статусом verification или выше
+        if current in [StatusWork.verification, StatusWork.verified]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Student cannot update work with status beyond 'inProgress'"
+            )
+        
+        # Студент может устанавливать только inProgress или verification
+        if new not in [StatusWork.inProgress, StatusWork.verification]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Student can only set status to 'inProgress' or 'verification'"
+            )
+        
+        # Нельзя уменьшать статус
+        if STATUS_ORDER[new] < STATUS_ORDER[current]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Status can only be increased or kept the same, not decreased"
+            )
+
+    elif role is RoleUser.teacher:
+        if new == StatusWork.verified and current != StatusWork.verification:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Teacher can set 'verified' only after 'verification'"
+            )
+
+
 async def apply_work_updates(work_db: Works, update_data: WorkUpdate, user: Users, session: AsyncSession):
     """Применение обновлений к работе с проверкой прав доступа"""
-    # Определяем статусы в порядке возрастания
-    status_order = {
-        StatusWork.draft: 0,
-        StatusWork.inProgress: 1,
-        StatusWork.verification: 2,
-        StatusWork.verified: 3,
-        StatusWork.canceled: 4
-    }
-    
     if user.role is RoleUser.student:
         # Студент может изменять:
         # - answers.text
@@ -523,29 +935,8 @@ async def apply_work_updates(work_db: Works, update_data: WorkUpdate, user: User
         # - status (только draft -> inProgress -> verification, нельзя уменьшать)
         
         # Проверка статуса
-        if update_data.status != work_db.status:
-            # Студент не может обновлять работу со статусом verification или выше
-            if work_db.status in [StatusWork.verification, StatusWork.verified]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Student cannot update work with status beyond 'inProgress'"
-                )
-            
-            # Студент может устанавливать только inProgress или verification
-            if update_data.status not in [StatusWork.inProgress, StatusWork.verification]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Student can only set status to 'inProgress' or 'verification'"
-                )
-            
-            # Нельзя уменьшать статус
-            if status_order[update_data.status] < status_order[work_db.status]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Status can only be increased or kept the same, not decreased"
-                )
-            
-            work_db.status = update_data.status
+        check_status_change(user.role, work_db.status, update_data.status)
+        work_db.status = update_data.status
         
         # Проверка conclusion - студент не может устанавливать
         if update_data.conclusion and update_data.conclusion != work_db.conclusion:
@@ -567,11 +958,7 @@ async def apply_work_updates(work_db: Works, update_data: WorkUpdate, user: User
 
 
         # Проверка статуса verified
-        if update_data.status == StatusWork.verified and work_db.status != StatusWork.verification:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Teacher can set 'verified' only after 'verification'"
-            )
+        check_status_change(user.role, work_db.status, update_data.status)
 
         # Проверка finish_date - учитель не может изменять напрямую
         if update_data.finish_date and update_data.finish_date != work_db.finish_date:
@@ -622,6 +1009,7 @@ async def update_answer_files(
         Список ключей файлов, которые нужно удалить из S3
     """
     files_to_delete = []
+    files_to_attach = []
     
     # Создаём словари существующих файлов по id и по ключу
     existing_files_by_id = {file.id: file for file in (answer_db.files or [])}
@@ -637,7 +1025,7 @@ async def update_answer_files(
     for file_id in ids_to_remove:
         file_to_remove = existing_files_by_id[file_id]
         files_to_delete.append(file_to_remove.key)  # Добавляем ключ для удаления из S3
-        session.delete(file_to_remove)  # Удаляем из базы данных
+        await session.delete(file_to_remove)  # Удаляем из базы данных
     
     # Обрабатываем файлы из обновления
     for file_update in files_update:
@@ -671,13 +1059,23 @@ async def update_answer_files(
                 ai_status=file_update.ai_status or StatusAnswerFile.draft
             )
             answer_db.files.append(new_file)
-    
+            files_to_attach.append(new_file.key)
+
+    await RepoFiles(session).acquire(files_to_attach)
     return files_to_delete
 
 
 async def update_answers_for_student(work_db: Works, answers_update: list[AnswerUpdate], session: AsyncSession):
     """Обновление ответов студентом (только text и files)"""
     files_to_delete = []
+
+    # Новые загрузки переносим из временной области в постоянную
+    promoted = await promote_temp_keys(
+        file.key for answer_update in answers_update for file in (answer_update.files or [])
+    )
+    for answer_update in answers_update:
+        for file in answer_update.files or []:
+            file.key = promoted.get(file.key, file.key)
     
     # Создаем словарь существующих ответов по ID
     existing_answers = {answer.id: answer for answer in work_db.answers}
@@ -700,9 +1098,8 @@ async def update_answers_for_student(work_db: Works, answers_update: list[Answer
                 )
                 files_to_delete.extend(deleted_keys)
     
-    # Удаляем файлы из S3
-    if files_to_delete:
-        await delete_files_from_s3(files_to_delete)
+    # Ставим файлы в очередь на удаление из S3 (в той же транзакции)
+    RepoS3Outbox(session).add(files_to_delete)
 
 
 async def update_answers_for_teacher(work_db: Works, answers_update: list[AnswerUpdate], session: AsyncSession):
@@ -16,6 +16,7 @@ from app.schemas.schema_students import (
     StudentFilterItem,
     ClassroomFilterItem
 )
+from app.utils.filters_cache import FiltersCache, filters_cache
 from app.utils.logger import logger
 from app.services.service_base import ServiceBase
 
@@ -75,6 +76,7 @@ class ServiceStudents(ServiceBase):
                 )
             await repo.move_to_class(user.id, student_id, classroom_id)
             await self.session.commit()
+            await filters_cache.invalidate([FiltersCache.teacher_tag(user.id), FiltersCache.student_tag(student_id)])
             return JSONResponse(content={"status": "ok"}, status_code=status.HTTP_200_OK)
         except HTTPException:
             raise
@@ -105,6 +107,7 @@ class ServiceStudents(ServiceBase):
                 )
             await repo.remove_from_class(user.id, student_id, )
             await self.session.commit()
+            await filters_cache.invalidate([FiltersCache.teacher_tag(user.id), FiltersCache.student_tag(student_id)])
             return JSONResponse(content={"status": "ok"}, status_code=status.HTTP_200_OK)
         except HTTPException:
             raise
@@ -129,6 +132,7 @@ class ServiceStudents(ServiceBase):
                 )
             await repo.delete(teacher_id=user.id, student_id=student_id)
             await self.session.commit()
+            await filters_cache.invalidate([FiltersCache.teacher_tag(user.id), FiltersCache.student_tag(student_id)])
             return JSONResponse(content={"status": "ok"}, status_code=status.HTTP_200_OK)
         except HTTPException:
             raise
@@ -147,6 +151,7 @@ class ServiceStudents(ServiceBase):
         repo = RepoStudents(self.session)
         await repo.add_teacher(teacher_id, student.id)
         await self.session.commit()
+        await filters_cache.invalidate([FiltersCache.teacher_tag(teacher_id), FiltersCache.student_tag(student.id)])
         return JSONResponse(
             {"status": "ok"},
             status.HTTP_201_CREATED
@@ -159,6 +164,12 @@ class ServiceStudents(ServiceBase):
         if user.role != RoleUser.teacher:
             raise ErrorRolePermissionDenied(RoleUser.teacher)
 
+        return await filters_cache.get_or_load(
+            "students", user.id, None, [FiltersCache.teacher_tag(user.id)],
+            StudentsReadSchemaTeacher, lambda: self._load_filters(user),
+        )
+
+    async def _load_filters(self, user: Users) -> StudentsReadSchemaTeacher:
         repo = RepoStudents(self.session)
         rows = await repo.get_filters(user.id)
 
@@ -5,148 +5,108 @@ from app.schemas.schema_work import (
     UserItem,
     ClassroomItem,
     SubjectItem,
-    DatesRange
+    DatesRange,
+    StatusCountsItem,
+    WorksStatusSummary,
 )
 
 
 class TransformerWorks:
-    
+
     @staticmethod
-    def handle_filters_response(user: Users, rows) -> WorksFilterResponseTeacher | WorksFilterResponseStudent | None:
+    def handle_filters_response(user: Users, facets) -> WorksFilterResponseTeacher | WorksFilterResponseStudent | None:
         """
-        Обрабатывает ответ с фильтрами работ, собирая все данные из rows в один объект.
-        Возвращает один объект WorksFilterResponseTeacher или WorksFilterResponseStudent.
+        Собирает ответ с фильтрами работ из фасетов RepoWorks.get_smart_filters_*.
+        Значения фасетов уже уникальны и посчитаны в БД, здесь только преобразование в схемы.
         """
-        # Инициализация структур для сбора данных
-        if user.role is RoleUser.teacher:
-            students_set = set()  # Множество для уникальных студентов (id, name)
-        elif user.role is RoleUser.student:
-            teachers_set = set()  # Множество для уникальных учителей (id, name)
-
-        classrooms_set = set()  # Множество для уникальных классов (id, name)
-        statuses_set = set()  # Множество для уникальных статусов
-        tasks_dict = {}  # Словарь: название задачи -> множество ID задач
-        subjects_set = set()  # Множество для уникальных предметов (id, name)
-        dates_min = None  # Минимальная дата
-        dates_max = None  # Максимальная дата
-
-        # Обработка всех строк из rows
-        for row in rows:
-            # Обработка студентов (для учителя) или учителей (для студента)
-            if user.role is RoleUser.teacher:
-                if row.get("student_id") and row.get("student_name"):
-                    students_set.add((row["student_id"], row["student_name"]))
-            elif user.role is RoleUser.student:
-                if row.get("teacher_id") and row.get("teacher_name"):
-                    teachers_set.add((row["teacher_id"], row["teacher_name"]))
-            
-            # Обработка классов
-            if row.get("classroom_id") and row.get("classroom_name"):
-                classrooms_set.add((row["classroom_id"], row["classroom_name"]))
-                
-            # Обработка статусов
-            if row.get("status"):
-                statuses_set.add(row["status"])
-
-            # Обработка задач
-            if row.get("name") and row.get("task_id"):
-                task_name = row["name"]
-                task_id = row["task_id"]
-                
-                if task_name not in tasks_dict:
-                    tasks_dict[task_name] = set()
-                    
-                tasks_dict[task_name].add(task_id)
+        # Формирование объекта DatesRange, если есть даты
+        dates_range = None
+        dates = facets["dates"]
+        if dates is not None and dates["min_date"] is not None:
+            dates_range = DatesRange(min=dates["min_date"].date(), max=dates["max_date"].date())
 
-            # Обработка дат
-            if row.get("created_at"):
-                row_date = row["created_at"].date()
-                if dates_min is None:
-                    dates_min = row_date
-                    dates_max = row_date
-                else:
-                    dates_min = min(dates_min, row_date)
-                    dates_max = max(dates_max, row_date)
+        # Статусы: список значений и количество работ по каждому
+        statuses_counts = {
+            row["status"].value: row["count"]
+            for row in facets["statuses"]
+            if row["status"] is not None
+        }
 
-            # Обработка предметов
-            if row.get("subject_id") and row.get("subject"):
-                subjects_set.add((row["subject_id"], row["subject"]))
+        # Задачи группируются по названию: название -> список ID задач и общее количество работ
+        tasks_dict = {}
+        tasks_counts = {}
+        for row in facets["tasks"]:
+            if row["task_id"] is None:
+                continue
+            tasks_dict.setdefault(row["task_name"], []).append(row["task_id"])
+            tasks_counts[row["task_name"]] = tasks_counts.get(row["task_name"], 0) + row["count"]
 
-        # Формирование объекта DatesRange, если есть даты
-        dates_range = None
-        if dates_min is not None and dates_max is not None:
-            dates_range = DatesRange(min=dates_min, max=dates_max)
+        # Формирование списка предметов
+        subjects_list = [
+            SubjectItem(id=row["subject_id"], name=row["subject_name"], count=row["count"])
+            for row in facets["subjects"]
+            if row["subject_id"] is not None
+        ]
 
-        # Преобразование множеств в списки объектов и формирование финального ответа
         if user.role is RoleUser.teacher:
-            # Формирование списка студентов
             students_list = [
-                UserItem(id=student_id, name=student_name)
-                for student_id, student_name in students_set
+                UserItem(id=row["student_id"], name=row["student_name"], count=row["count"])
+                for row in facets["students"]
+                if row["student_id"] is not None
             ]
-            
-            # Формирование списка классов
+            # Ученики без класса попадают в фасет с classroom_id = NULL, в список классов он не входит
             classrooms_list = [
-                ClassroomItem(id=classroom_id, name=classroom_name)
-                for classroom_id, classroom_name in classrooms_set
-            ]
-            
-            # Формирование списка статусов
-            statuses_list = list(statuses_set)
-            
-            # Преобразование словаря задач: множество -> список
-            tasks_dict_final = {
-                task_name: list(task_ids)
-                for task_name, task_ids in tasks_dict.items()
-            }
-            
-            # Формирование списка предметов
-            subjects_list = [
-                SubjectItem(id=subject_id, name=subject_name)
-                for subject_id, subject_name in subjects_set
+                ClassroomItem(id=row["classroom_id"], name=row["classroom_name"], count=row["count"])
+                for row in facets["classrooms"]
+                if row["classroom_id"] is not None
             ]
-            
-            # Возврат одного объекта WorksFilterResponseTeacher
+
             return WorksFilterResponseTeacher(
                 students=students_list,
                 classrooms=classrooms_list,
-                statuses=statuses_list,
+                statuses=list(statuses_counts),
                 dates=dates_range,
-                tasks=tasks_dict_final,
-                subjects=subjects_list
+                tasks=tasks_dict,
+                subjects=subjects_list,
+                statuses_counts=statuses_counts,
+                tasks_counts=tasks_counts,
             )
-        
+
         elif user.role is RoleUser.student:
-            # Формирование списка учителей
             teachers_list = [
-                UserItem(id=teacher_id, name=teacher_name)
-                for teacher_id, teacher_name in teachers_set
-            ]
-            
-            # Формирование списка статусов
-            statuses_list = list(statuses_set)
-            
-            # Преобразование словаря задач: множество -> список
-            tasks_dict_final = {
-                task_name: list(task_ids)
-                for task_name, task_ids in tasks_dict.items()
-            }
-            
-            # Формирование списка предметов
-            subjects_list = [
-                SubjectItem(id=subject_id, name=subject_name)
-                for subject_id, subject_name in subjects_set
+                UserItem(id=row["teacher_id"], name=row["teacher_name"], count=row["count"])
+                for row in facets["teachers"]
+                if row["teacher_id"] is not None
             ]
-            
-            # Возврат одного объекта WorksFilterResponseStudent
+
             return WorksFilterResponseStudent(
                 teachers=teachers_list,
-                statuses=statuses_list,
+                statuses=list(statuses_counts),
                 dates=dates_range,
-                tasks=tasks_dict_final,
-                subjects=subjects_list
+                tasks=tasks_dict,
+                subjects=subjects_list,
+                statuses_counts=statuses_counts,
+                tasks_counts=tasks_counts,
             )
-        
+
         return None
-        
 
+    @staticmethod
+    def handle_status_summary(summary) -> WorksStatusSummary:
+        """Собирает сводку статусов из строк RepoWorks.get_status_summary_teacher"""
+        def group(rows, id_key: str, name_key: str) -> list[StatusCountsItem]:
+            items: dict = {}
+            for row in rows:
+                # Ученики без класса дают строку с classroom_id = NULL - в сводку по классам не входит
+                if row[id_key] is None:
+                    continue
+                item = items.setdefault(row[id_key], StatusCountsItem(id=row[id_key], name=row[name_key]))
+                item.counts[row["status"].value] = row["count"]
+                item.total += row["count"]
+            return list(items.values())
+
+        return WorksStatusSummary(
+            statuses={row["status"].value: row["count"] for row in summary["statuses"]},
+            tasks=group(summary["tasks"], "task_id", "task_name"),
+            classrooms=group(summary["classrooms"], "classroom_id", "classroom_name"),
+        )
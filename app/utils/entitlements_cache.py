@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable
+
+from app.config.config_app import settings
+from app.config.redis import red_async_client
+from app.schemas.schema_subscription import SubscriptionEntitlements
+from app.utils.logger import logger
+
+
+# Значение в Redis для пользователя без активной подписки
+NO_SUBSCRIPTION = "null"
+
+
+class EntitlementsCache:
+    """
+    Кэш прав по подписке в Redis: plan_id, finish_at, verifications_count и used_checks на пользователя.
+
+    Проверка подписки на каждом запросе учителя обходится без запроса к БД.
+    Отсутствие подписки тоже кэшируется. Сервисы сбрасывают запись после commit
+    изменений подписки (оплата, отмена, новый период, списание и возврат проверок).
+    Короткий TTL ограничивает жизнь записи, если сброс где-то не сработал;
+    запись не живёт дольше finish_at подписки. Redis - вспомогательный уровень:
+    при его недоступности права читаются из БД.
+    """
+
+    def __init__(self, redis_client, ttl: int = 60, prefix: str = "entitlements"):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, user_id: uuid.UUID) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def get_or_load(
+        self,
+        user_id: uuid.UUID,
+        loader: Callable[[], Awaitable[SubscriptionEntitlements | None]],
+    ) -> SubscriptionEntitlements | None:
+        """Права из кэша или из loader (с сохранением в кэш); None - нет активной подписки"""
+        if self.redis is None:
+            return await loader()
+
+        key = self._key(user_id)
+        try:
+            cached = await self.redis.get(key)
+        except Exception as exc:
+            logger.warning(f"Entitlements cache: redis unavailable: {exc}")
+            return await loader()
+
+        now = datetime.now(timezone.utc)
+        if cached == NO_SUBSCRIPTION:
+            return None
+        if cached is not None:
+            entitlements = SubscriptionEntitlements.model_validate_json(cached)
+            return entitlements if entitlements.finish_at > now else None
+
+        entitlements = await loader()
+        ttl = self.ttl
+        if entitlements is not None:
+            ttl = min(ttl, int((entitlements.finish_at - now).total_seconds()))
+        if ttl <= 0:
+            return entitlements
+        try:
+            value = entitlements.model_dump_json() if entitlements is not None else NO_SUBSCRIPTION
+            await self.redis.set(key, value, ex=ttl)
+        except Exception as exc:
+            logger.warning(f"Entitlements cache: redis unavailable: {exc}")
+        return entitlements
+
+    async def invalidate(self, user_ids: Iterable[uuid.UUID | None]):
+        """Удаляет записи пользователей (после commit изменений их подписок)"""
+        keys = [self._key(user_id) for user_id in set(user_ids) if user_id is not None]
+        if not keys or self.redis is None:
+            return
+        try:
+            await self.redis.delete(*keys)
+        except Exception as exc:
+            logger.warning(f"Entitlements cache: redis unavailable: {exc}")
+
+
+entitlements_cache = EntitlementsCache(
+    red_async_client if settings.ENTITLEMENTS_CACHE_ENABLED else None,
+    ttl=settings.ENTITLEMENTS_CACHE_TTL,
+)
@@ -0,0 +1,26 @@
+from typing import Any
+
+
+# Ответ с ETag браузер всегда перепроверяет, но хранит только у себя
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Слабый ETag из частей версии. Слабый - потому что одинаковые версии дают
+    равнозначные, но не обязательно побайтно одинаковые ответы (порядок вложенных списков)
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Проверка If-None-Match по правилам слабого сравнения (RFC 9110, 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import uuid
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+from pydantic import BaseModel
+
+from app.config.config_app import settings
+from app.config.redis import red_async_client
+from app.utils.logger import logger
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class FiltersCache:
+    """
+    Кэш ответов эндпоинтов фильтров в Redis: на пользователя и хэш параметров фильтра.
+
+    Каждая запись помечается тегами (teacher:<id>, student:<id>); тег - это множество
+    ключей записей, сброс тега удаляет их все. Сервисы сбрасывают теги после commit
+    изменений, которые влияют на фильтры. TTL ограничивает жизнь записи, если сброс
+    где-то не сработал. Redis - вспомогательный уровень: при его недоступности
+    данные просто читаются из БД.
+    """
+
+    def __init__(self, redis_client, ttl: int = 300, prefix: str = "filters"):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @staticmethod
+    def teacher_tag(teacher_id: uuid.UUID) -> str:
+        return f"teacher:{teacher_id}"
+
+    @staticmethod
+    def student_tag(student_id: uuid.UUID) -> str:
+        return f"student:{student_id}"
+
+    def _key(self, name: str, user_id: uuid.UUID, params: dict | None) -> str:
+        raw = json.dumps(params or {}, sort_keys=True, default=str)
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{name}:{user_id}:{digest}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    async def get_or_load(
+        self,
+        name: str,
+        user_id: uuid.UUID,
+        params: dict | None,
+        tags: Iterable[str],
+        schema: type[ModelT],
+        loader: Callable[[], Awaitable[ModelT]],
+    ) -> ModelT:
+        """Ответ из кэша или из loader (с сохранением в кэш). name - имя эндпоинта для статистики"""
+        if self.redis is None:
+            return await loader()
+
+        key = self._key(name, user_id, params)
+        try:
+            # Чтение и учёт запроса - за один проход до Redis
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.hincrby(self._stats_key(), f"{name}:requests", 1)
+                cached, _ = await pipe.execute()
+        except Exception as exc:
+            logger.warning(f"Filters cache: redis unavailable: {exc}")
+            return await loader()
+
+        if cached is not None:
+            return schema.model_validate_json(cached)
+
+        value = await loader()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hincrby(self._stats_key(), f"{name}:misses", 1)
+                pipe.set(key, value.model_dump_json(), ex=self.ttl)
+                for tag in tags:
+                    pipe.sadd(self._tag_key(tag), key)
+                    pipe.expire(self._tag_key(tag), self.ttl)
+                await pipe.execute()
+        except Exception as exc:
+            logger.warning(f"Filters cache: redis unavailable: {exc}")
+        return value
+
+    async def invalidate(self, tags: Iterable[str]):
+        """Удаляет все записи, помеченные любым из тегов"""
+        tag_keys = [self._tag_key(tag) for tag in set(tags)]
+        if not tag_keys or self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = set().union(*members)
+            await self.redis.delete(*keys, *tag_keys)
+        except Exception as exc:
+            logger.warning(f"Filters cache: redis unavailable: {exc}")
+
+    async def stats(self) -> dict[str, dict[str, int]]:
+        """Количество попаданий и промахов по эндпоинтам"""
+        if self.redis is None:
+            return {}
+        raw = await self.redis.hgetall(self._stats_key())
+        result: dict[str, dict[str, int]] = {}
+        for field, count in raw.items():
+            name, counter = field.rsplit(":", 1)
+            result.setdefault(name, {"requests": 0, "misses": 0})[counter] = int(count)
+        for counters in result.values():
+            counters["hits"] = counters["requests"] - counters["misses"]
+        return result
+
+
+filters_cache = FiltersCache(
+    red_async_client if settings.FILTERS_CACHE_ENABLED else None,
+    ttl=settings.FILTERS_CACHE_TTL,
+)
@@ -0,0 +1,144 @@
+import asyncio
+from collections import OrderedDict
+import json
+import time
+from typing import Iterable
+
+from app.utils.logger import logger
+
+
+class PresignedUrlCache:
+    """
+    Двухуровневый кэш presigned URL по ключу объекта: LRU в памяти процесса + Redis.
+
+    Ссылка отдаётся из кэша, только пока до её истечения осталось больше
+    min_ttl секунд, иначе считается промахом и подписывается заново.
+    Redis - вспомогательный уровень: при его недоступности кэш работает только в памяти.
+
+    evict рассылает удалённые ключи через Redis pub/sub, и каждый процесс, в котором
+    запущен listen, выбрасывает их из своей памяти. Запись в памяти живёт не дольше
+    local_ttl секунд: так пропущенное сообщение (обрыв подписки) держит устаревшую
+    ссылку в процессе ограниченное время.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        max_size: int = 10000,
+        min_ttl: int = 600,
+        local_ttl: int = 60,
+        prefix: str = "presign",
+    ):
+        self.redis = redis_client
+        self.max_size = max_size
+        self.min_ttl = min_ttl
+        self.local_ttl = local_ttl
+        self.prefix = prefix
+        # ключ -> (url, expires_at ссылки, момент, до которого запись годна в памяти)
+        self._local: OrderedDict[str, tuple[str, int, float]] = OrderedDict()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _channel(self) -> str:
+        return f"{self.prefix}:evict"
+
+    def _is_fresh(self, expires_at: int, now: float) -> bool:
+        return expires_at - now > self.min_ttl
+
+    def _remember(self, key: str, url: str, expires_at: int):
+        if self.max_size <= 0:
+            return
+        self._local[key] = (url, expires_at, time.time() + self.local_ttl)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        now = time.time()
+        result: dict[str, str] = {}
+        missing: list[str] = []
+
+        for key in keys:
+            cached = self._local.get(key)
+            if cached is not None and cached[2] > now and self._is_fresh(cached[1], now):
+                self._local.move_to_end(key)
+                result[key] = cached[0]
+            else:
+                self._local.pop(key, None)
+                missing.append(key)
+
+        if not missing or self.redis is None:
+            return result
+
+        try:
+            values = await self.redis.mget([self._redis_key(key) for key in missing])
+        except Exception as exc:
+            logger.warning(f"Presigned URL cache: redis unavailable: {exc}")
+            return result
+
+        for key, value in zip(missing, values):
+            if not value:
+                continue
+            expires_at, url = value.split("|", 1)
+            if self._is_fresh(int(expires_at), now):
+                self._remember(key, url, int(expires_at))
+                result[key] = url
+        return result
+
+    async def set_many(self, urls: dict[str, str], expires_at: int):
+        if not urls:
+            return
+        for key, url in urls.items():
+            self._remember(key, url, expires_at)
+
+        # В Redis запись живёт ровно до момента, когда она перестанет быть пригодной
+        ttl = int(expires_at - time.time()) - self.min_ttl
+        if self.redis is None or ttl <= 0:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, url in urls.items():
+                    pipe.set(self._redis_key(key), f"{expires_at}|{url}", ex=ttl)
+                await pipe.execute()
+        except Exception as exc:
+            logger.warning(f"Presigned URL cache: redis unavailable: {exc}")
+
+    def _drop_local(self, keys: Iterable[str]):
+        for key in keys:
+            self._local.pop(key, None)
+
+    async def evict(self, keys: Iterable[str]):
+        keys = list(keys)
+        if not keys:
+            return
+        self._drop_local(keys)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(*[self._redis_key(key) for key in keys])
+            # Остальные процессы выбросят ключи из памяти в listen
+            await self.redis.publish(self._channel(), json.dumps(keys))
+        except Exception as exc:
+            logger.warning(f"Presigned URL cache: redis unavailable: {exc}")
+
+    async def listen(self, retry_delay: float = 5):
+        """
+        Подписка на удаления из других процессов; запускается фоновой задачей на время жизни приложения.
+        После обрыва подписки память процесса очищается целиком: сообщения за это время потеряны.
+        """
+        if self.redis is None:
+            return
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel())
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._drop_local(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Presigned URL cache: eviction subscription lost: {exc}")
+            self._local.clear()
+            await asyncio.sleep(retry_delay)
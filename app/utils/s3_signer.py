@@ -0,0 +1,160 @@
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _encode_query(items) -> str:
+    return "&".join(
+        f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+        for name, value in items
+    )
+
+
+class SigV4Presigner:
+    """
+    Лёгкий SigV4-подписчик presigned URL для S3-совместимого хранилища (MinIO).
+
+    Подпись ссылки - это чистая работа с HMAC, поэтому здесь нет botocore
+    с его объектами запросов, хуками и резолвером эндпоинтов.
+    Ключ подписи зависит только от даты, поэтому он вычисляется один раз в сутки
+    и кэшируется. Ссылки совпадают побайтно с тем, что выдаёт botocore
+    (path-style, signature_version='s3v4') для того же момента времени.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        service: str = "s3",
+    ):
+        parts = urlsplit(endpoint_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.host = parts.netloc
+        # botocore не включает стандартный порт в заголовок host
+        if (parts.scheme, parts.port) in (("http", 80), ("https", 443)):
+            self.host = parts.hostname
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+
+        self._key_datestamp: str | None = None
+        self._signing_key: bytes | None = None
+
+    def signing_key(self, datestamp: str) -> bytes:
+        """Ключ подписи на дату (YYYYMMDD), пересчитывается только при смене даты"""
+        if self._key_datestamp != datestamp:
+            k_date = _hmac(f"AWS4{self.secret_key}".encode("utf-8"), datestamp)
+            k_region = _hmac(k_date, self.region)
+            k_service = _hmac(k_region, self.service)
+            self._signing_key = _hmac(k_service, "aws4_request")
+            self._key_datestamp = datestamp
+        return self._signing_key
+
+    def presign(
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        expires_in: int = 3600,
+        content_type: str | None = None,
+        now: datetime | None = None,
+        extra_query: dict[str, str] | None = None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> str:
+        if now is None:
+            now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = amz_date[:8]
+        scope = f"{datestamp}/{self.region}/{self.service}/aws4_request"
+
+        headers = {"host": self.host}
+        if content_type:
+            headers["content-type"] = content_type
+        # Подписанные заголовки клиент обязан отправить с теми же значениями
+        headers.update(extra_headers or {})
+        signed_headers = ";".join(sorted(headers))
+
+        query = {
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": signed_headers,
+        }
+        extra_query = extra_query or {}
+        canonical_query = _encode_query(sorted({**extra_query, **query}.items()))
+
+        path = f"/{bucket}/{quote(key, safe='/~')}"
+        canonical_headers = "".join(f"{name}:{headers[name]}\n" for name in sorted(headers))
+        canonical_request = "\n".join([
+            method,
+            path,
+            canonical_query,
+            canonical_headers,
+            signed_headers,
+            UNSIGNED_PAYLOAD,
+        ])
+
+        string_to_sign = "\n".join([
+            ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ])
+        signature = hmac.new(
+            self.signing_key(datestamp), string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+        # Как и botocore: сначала параметры запроса, затем параметры авторизации
+        url_query = _encode_query([*extra_query.items(), *sorted(query.items())])
+        return f"{self.scheme}://{self.netloc}{path}?{url_query}&X-Amz-Signature={signature}"
+
+    def presign_get(
+        self,
+        bucket: str,
+        key: str,
+        expires_in: int = 3600,
+        now: datetime | None = None,
+        cache_control: str | None = None,
+    ) -> str:
+        extra_query = {"response-cache-control": cache_control} if cache_control else None
+        return self.presign("GET", bucket, key, expires_in, now=now, extra_query=extra_query)
+
+    def presign_put(
+        self,
+        bucket: str,
+        key: str,
+        expires_in: int = 3600,
+        content_type: str | None = None,
+        now: datetime | None = None,
+        checksum_sha256: str | None = None,
+    ) -> str:
+        """checksum_sha256 (base64) - хранилище отклонит загрузку, если содержимое с ним не совпадёт"""
+        extra_headers = {"x-amz-checksum-sha256": checksum_sha256} if checksum_sha256 else None
+        return self.presign("PUT", bucket, key, expires_in, content_type=content_type, now=now, extra_headers=extra_headers)
+
+    def presign_upload_part(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        expires_in: int = 3600,
+        now: datetime | None = None,
+    ) -> str:
+        # Порядок параметров как у botocore для UploadPart: uploadId, затем partNumber
+        extra_query = {"uploadId": upload_id, "partNumber": str(part_number)}
+        return self.presign("PUT", bucket, key, expires_in, now=now, extra_query=extra_query)
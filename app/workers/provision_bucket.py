@@ -0,0 +1,15 @@
+from app.config.boto import provision_bucket
+from app.utils.logger import logger
+
+
+def main():
+    """
+    Подготовка бакета: создание и правила жизненного цикла.
+    Запускается один раз при старте контейнера (entrypoint.sh), а не в каждом воркере приложения.
+    """
+    provision_bucket()
+    logger.info("S3 bucket provisioned")
+
+
+if __name__ == "__main__":
+    main()
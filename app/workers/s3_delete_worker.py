@@ -0,0 +1,72 @@
+import asyncio
+
+from app.config.boto import close_s3, delete_objects_batch, init_s3, is_cas_key
+from app.config.config_app import settings
+from app.config.db import AsyncSessionLocal
+from app.repositories.repo_files import RepoFiles
+from app.repositories.repo_s3_outbox import RepoS3Outbox
+from app.utils.logger import logger
+
+
+async def drain_once() -> int:
+    """
+    Один проход по очереди s3_delete_outbox: забирает пачку ключей,
+    удаляет их из S3 пачками DeleteObjects, удачные записи убирает из очереди,
+    неудачные откладывает с экспоненциальной задержкой.
+    Объекты, хранимые по содержимому, удаляются только когда на них не осталось ссылок.
+    Возвращает количество обработанных записей.
+    """
+    async with AsyncSessionLocal() as session:
+        repo = RepoS3Outbox(session)
+        entries = await repo.claim(settings.S3_DELETE_BATCH_SIZE)
+        if not entries:
+            return 0
+
+        # Счётчик ссылок уменьшается один раз - при первой попытке. Повторная попытка удаляет
+        # объект, только если он всё ещё не привязан заново (надгробие на месте)
+        repo_files = RepoFiles(session)
+        unreferenced = await repo_files.release(entry.key for entry in entries if entry.attempts == 0)
+        unreferenced |= await repo_files.get_released(entry.key for entry in entries if entry.attempts > 0)
+        failed = await delete_objects_batch([
+            entry.key for entry in entries
+            if not is_cas_key(entry.key) or entry.key in unreferenced
+        ])
+
+        await repo.remove([entry.id for entry in entries if entry.key not in failed])
+        for entry in entries:
+            if entry.key in failed:
+                await repo.postpone(
+                    entry,
+                    failed[entry.key],
+                    settings.S3_DELETE_RETRY_BASE,
+                    settings.S3_DELETE_RETRY_MAX,
+                )
+        await session.commit()
+
+        if failed:
+            logger.warning(f"S3 delete outbox: {len(failed)} keys postponed")
+        logger.info(f"S3 delete outbox: deleted {len(entries) - len(failed)} keys")
+        return len(entries)
+
+
+async def main():
+    """
+    Воркер очереди удаления файлов из S3.
+    Пока очередь не пуста - обрабатывает пачки подряд, иначе ждёт S3_DELETE_POLL_INTERVAL.
+    """
+    await init_s3()
+    try:
+        while True:
+            try:
+                processed = await drain_once()
+            except Exception as exc:
+                logger.exception(f"S3 delete outbox: drain failed: {exc}")
+                processed = 0
+            if processed < settings.S3_DELETE_BATCH_SIZE:
+                await asyncio.sleep(settings.S3_DELETE_POLL_INTERVAL)
+    finally:
+        await close_s3()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
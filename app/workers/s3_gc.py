@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+from app.config.boto import S3_DELETE_OBJECTS_LIMIT, close_s3, delete_objects_batch, get_boto_client, init_s3, is_temp_key
+from app.config.config_app import settings
+from app.config.db import AsyncSessionLocal
+from app.repositories.repo_files import RepoFiles
+from app.utils.logger import logger
+
+
+class GcStats(BaseModel):
+    objects_scanned: int = 0
+    bytes_scanned: int = 0
+    orphans_found: int = 0
+    orphans_in_grace: int = 0
+    orphans_referenced: int = 0
+    objects_deleted: int = 0
+    bytes_reclaimed: int = 0
+    delete_failed: int = 0
+    tombstones_pruned: int = 0
+
+
+async def list_bucket_objects() -> AsyncIterator[dict]:
+    """Листинг бакета потоком по страницам; S3 отдаёт ключи в побайтовом порядке"""
+    async with get_boto_client() as s3:
+        paginator = s3.get_paginator('list_objects_v2')
+        async for page in paginator.paginate(Bucket=settings.BUCKET):
+            for obj in page.get('Contents', []):
+                yield obj
+
+
+async def iter_orphans(objects: AsyncIterator[dict], referenced: AsyncIterator[str]) -> AsyncIterator[dict]:
+    """
+    Слияние двух отсортированных потоков: объекты бакета, ключей которых нет среди
+    ключей из БД. Ни один из потоков целиком в памяти не держится.
+    """
+    ref = await anext(referenced, None)
+    async for obj in objects:
+        key = obj['Key']
+        while ref is not None and ref < key:
+            ref = await anext(referenced, None)
+        if ref != key:
+            yield obj
+
+
+async def collect_garbage(grace: timedelta, dry_run: bool = True) -> GcStats:
+    """
+    Удаляет из бакета объекты, на которые не ссылается ни одна запись в БД.
+    Объекты моложе grace не трогаются: они могут принадлежать ещё не закоммиченному запросу.
+    Временные загрузки (S3_TEMP_PREFIX) пропускаются - их удаляет правило жизненного цикла.
+    В режиме dry_run только считает, что было бы удалено.
+    """
+    stats = GcStats()
+    cutoff = datetime.now(timezone.utc) - grace
+    batch: list[dict] = []
+
+    async def flush():
+        if not batch:
+            return
+        # Объект по содержимому мог быть привязан заново уже после чтения ссылок из БД
+        async with AsyncSessionLocal() as session:
+            referenced = await RepoFiles(session).get_referenced(obj['Key'] for obj in batch)
+        if referenced:
+            batch[:] = [obj for obj in batch if obj['Key'] not in referenced]
+            stats.orphans_referenced += len(referenced)
+        failed = {} if dry_run else await delete_objects_batch([obj['Key'] for obj in batch])
+        for obj in batch:
+            if obj['Key'] in failed:
+                stats.delete_failed += 1
+            else:
+                stats.objects_deleted += 1
+                stats.bytes_reclaimed += obj['Size']
+        batch.clear()
+
+    async def scanned() -> AsyncIterator[dict]:
+        async for obj in list_bucket_objects():
+            stats.objects_scanned += 1
+            stats.bytes_scanned += obj['Size']
+            if not is_temp_key(obj['Key']):
+                yield obj
+
+    async with AsyncSessionLocal() as session:
+        referenced = RepoFiles(session).stream_referenced_keys()
+        async for obj in iter_orphans(scanned(), referenced):
+            stats.orphans_found += 1
+            if obj['LastModified'] > cutoff:
+                stats.orphans_in_grace += 1
+                continue
+            logger.info(f"S3 GC: orphan {obj['Key']} ({obj['Size']} bytes){' [dry run]' if dry_run else ''}")
+            batch.append(obj)
+            if len(batch) >= S3_DELETE_OBJECTS_LIMIT:
+                await flush()
+        await flush()
+
+    if not dry_run:
+        # Надгробия счётчиков ссылок нужны, пока клиент может привязать ключ, полученный с exists=True
+        async with AsyncSessionLocal() as session:
+            stats.tombstones_pruned = await RepoFiles(session).prune_tombstones(
+                datetime.now(timezone.utc) - timedelta(hours=settings.S3_CAS_TOMBSTONE_HOURS)
+            )
+            await session.commit()
+
+    logger.info(f"S3 GC{' (dry run)' if dry_run else ''}: {stats.model_dump()}")
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Удаление объектов S3, на которые не ссылается БД")
+    parser.add_argument("--grace-hours", type=int, default=settings.S3_GC_GRACE_HOURS)
+    parser.add_argument("--delete", action="store_true", help="удалять объекты (по умолчанию только отчёт)")
+    args = parser.parse_args()
+
+    await init_s3()
+    try:
+        await collect_garbage(timedelta(hours=args.grace_hours), dry_run=not args.delete)
+    finally:
+        await close_s3()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,9 @@ done
 echo "✅ Postgres is up - running migrations"
 alembic upgrade head
 
+# Бакет готовится один раз на контейнер; при недоступном MinIO приложение всё равно стартует
+python -m app.workers.provision_bucket || echo "⚠️ S3 bucket provisioning failed"
+
 echo "🚀 Starting app"
 
 gunicorn -w 4 -k uvicorn.workers.UvicornWorker main:app --bind 0.0.0.0:8000
\ No newline at end of file
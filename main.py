@@ -1,9 +1,12 @@
+import asyncio
+from contextlib import asynccontextmanager
 import time
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 
+from app.config.boto import close_s3, init_s3, url_cache
 from app.routes.route_answers import router as router_answers
 from app.routes.route_assessments import router as router_assessments
 from app.routes.route_auth import router as router_auth
@@ -22,13 +25,28 @@ from app.routes.route_ai_verification import router as router_ai
 from app.routes.route_plans import router as router_plan
 from app.routes.route_subscription import router as router_subscription
 from app.routes.route_payments import router as router_payments
+from app.routes.route_cache import router as router_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Один S3-клиент с пулом соединений на весь процесс
+    await init_s3()
+    # Удаления объектов из воркеров сбрасывают ссылки в памяти этого процесса
+    url_evictions = asyncio.create_task(url_cache.listen())
+    try:
+        yield
+    finally:
+        url_evictions.cancel()
+        await close_s3()
 
 
 def create_app() -> FastAPI:
 
     app = FastAPI(
         title="RU-Lang MVP API",
-        root_path='/api'
+        root_path='/api',
+        lifespan=lifespan
     )
     # Настройка CORS из переменных окружения
 
@@ -39,6 +57,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count"],
     )
     
     @app.middleware("http")
@@ -77,6 +96,7 @@ def create_app() -> FastAPI:
     app.include_router(router_plan)
     app.include_router(router_subscription)
     app.include_router(router_payments)
+    app.include_router(router_cache)
 
     
 
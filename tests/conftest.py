@@ -134,6 +134,7 @@ async def setup_db():
                         name="Посчитай 10",
                         description="Очень важно",
                         order_index=1,
+                        max_score=1,
                         criterions=[
                             Criterions(
                                 id=criterion_id,
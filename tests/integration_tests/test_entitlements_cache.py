@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config.redis import red_async_client
+from app.schemas.schema_subscription import SubscriptionEntitlements
+from app.utils.entitlements_cache import EntitlementsCache
+
+
+@pytest.mark.asyncio
+async def test_entitlements_cache_hit_and_invalidation():
+    cache = EntitlementsCache(red_async_client, ttl=60, prefix=f"test_entitlements_{uuid.uuid4().hex}")
+    teacher_id = uuid.uuid4()
+    calls = 0
+    entitlements = SubscriptionEntitlements(
+        plan_id=uuid.uuid4(),
+        finish_at=datetime.now(timezone.utc) + timedelta(days=30),
+        verifications_count=100,
+        used_checks=3,
+    )
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        return entitlements
+
+    assert await cache.get_or_load(teacher_id, load) == entitlements
+    assert await cache.get_or_load(teacher_id, load) == entitlements
+    assert calls == 1
+
+    # Сброс чужой записи не трогает эту
+    await cache.invalidate([uuid.uuid4()])
+    await cache.get_or_load(teacher_id, load)
+    assert calls == 1
+
+    await cache.invalidate([teacher_id])
+    await cache.get_or_load(teacher_id, load)
+    assert calls == 2
+    await cache.invalidate([teacher_id])
+
+
+@pytest.mark.asyncio
+async def test_entitlements_cache_no_subscription():
+    cache = EntitlementsCache(red_async_client, ttl=60, prefix=f"test_entitlements_{uuid.uuid4().hex}")
+    teacher_id = uuid.uuid4()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        return None
+
+    # Отсутствие подписки тоже кэшируется
+    assert await cache.get_or_load(teacher_id, load) is None
+    assert await cache.get_or_load(teacher_id, load) is None
+    assert calls == 1
+    await cache.invalidate([teacher_id])
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.model_works import Assessments, Works
+
+
+@pytest.mark.asyncio
+async def test_work_not_modified_until_child_changes(client, async_session, session_token_student, work_id, assessment_id):
+    headers = {"Authorization": session_token_student}
+    first = await client.get(f"/works/{work_id}", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = await client.get(f"/works/{work_id}", headers=headers | {"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    # Изменение оценки меняет только дочернюю строку - версия работы растёт через before_flush
+    version = select(Works.version).where(Works.id == work_id)
+    before = await async_session.scalar(version)
+    assessment = await async_session.get(Assessments, assessment_id)
+    assessment.points += 1
+    await async_session.commit()
+    assert await async_session.scalar(version) == before + 1
+
+    changed = await client.get(f"/works/{work_id}", headers=headers | {"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_task_not_modified(client, session_token_teacher, task_id):
+    headers = {"Authorization": session_token_teacher}
+    first = await client.get(f"/tasks/{task_id}", headers=headers)
+    assert first.status_code == 200
+
+    cached = await client.get(f"/tasks/{task_id}", headers=headers | {"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
@@ -0,0 +1,54 @@
+import pytest
+
+from app.config.config_app import settings
+from app.services import service_files
+
+
+async def start_multipart(client, token) -> dict:
+    response = await client.post(
+        "/files/get_upload_links",
+        headers={"Authorization": token},
+        json={"files": [{"file_name": "video.mp4", "size": settings.S3_MULTIPART_THRESHOLD + 1}]},
+    )
+    assert response.status_code == 200
+    item = response.json()[0]
+    return {"key": item["key"], "upload_id": item["multipart"]["upload_id"]}
+
+
+@pytest.mark.asyncio
+async def test_complete_multipart_only_by_owner(client, session_token_student, session_token_teacher, monkeypatch):
+    async def complete_multipart_upload(data):
+        pass
+
+    monkeypatch.setattr(service_files, "complete_multipart_upload", complete_multipart_upload)
+    upload = await start_multipart(client, session_token_student)
+    body = upload | {"parts": [{"part_number": 1, "etag": "\"etag\""}]}
+
+    response = await client.post("/files/multipart/complete", headers={"Authorization": session_token_teacher}, json=body)
+    assert response.status_code == 403
+
+    # Ключ другой загрузки с тем же upload_id не подходит
+    response = await client.post(
+        "/files/multipart/complete",
+        headers={"Authorization": session_token_student},
+        json=body | {"key": "temp/other.mp4"},
+    )
+    assert response.status_code == 403
+
+    response = await client.post("/files/multipart/complete", headers={"Authorization": session_token_student}, json=body)
+    assert response.status_code == 200
+
+    # Завершённую загрузку повторно завершить нельзя
+    response = await client.post("/files/multipart/complete", headers={"Authorization": session_token_student}, json=body)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_abort_multipart_only_by_owner(client, session_token_student, session_token_teacher):
+    upload = await start_multipart(client, session_token_student)
+
+    response = await client.post("/files/multipart/abort", headers={"Authorization": session_token_teacher}, json=upload)
+    assert response.status_code == 403
+
+    response = await client.post("/files/multipart/abort", headers={"Authorization": session_token_student}, json=upload)
+    assert response.status_code == 200
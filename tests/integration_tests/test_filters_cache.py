@@ -0,0 +1,39 @@
+import uuid
+
+import pytest
+
+from app.config.redis import red_async_client
+from app.schemas.schema_tasks import TasksFiltersReadSchema
+from app.utils.filters_cache import FiltersCache
+
+
+@pytest.mark.asyncio
+async def test_filters_cache_hit_and_tag_invalidation():
+    cache = FiltersCache(red_async_client, ttl=60, prefix=f"test_filters_{uuid.uuid4().hex}")
+    teacher_id = uuid.uuid4()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        return TasksFiltersReadSchema(subjects=[], tasks=[])
+
+    async def get():
+        return await cache.get_or_load(
+            "tasks", teacher_id, None, [FiltersCache.teacher_tag(teacher_id)], TasksFiltersReadSchema, load
+        )
+
+    assert await get() == await get()
+    assert calls == 1
+
+    # Сброс чужого тега не трогает запись
+    await cache.invalidate([FiltersCache.teacher_tag(uuid.uuid4())])
+    await get()
+    assert calls == 1
+
+    await cache.invalidate([FiltersCache.teacher_tag(teacher_id)])
+    await get()
+    assert calls == 2
+
+    assert await cache.stats() == {"tasks": {"requests": 4, "misses": 2, "hits": 2}}
+    await red_async_client.delete(cache._stats_key())
@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.model_classroom import Classrooms
+from app.models.model_tasks import Criterions, Exercises, Tasks
+from app.models.model_users import Users, teachers_students
+from app.models.model_works import Answers, Assessments, StatusWork, Works
+from app.repositories.repo_work_scores import RepoWorkScores
+
+
+@pytest.mark.asyncio
+async def test_journal_task_without_criterions(client, async_session, session_token_teacher, teacher_id, subject_id):
+    """Проверенная работа по задаче без критериев (максимум 0) не ломает средний балл"""
+    student = Users(
+        id=uuid.uuid4(),
+        first_name="Journal",
+        last_name="Student",
+        email="journal_student@example.com",
+        password="123456",
+        role="student",
+        is_verificated=True
+    )
+    classroom = Classrooms(id=uuid.uuid4(), name="journal room", teacher_id=teacher_id)
+    async_session.add_all([student, classroom])
+    await async_session.flush()
+    await async_session.execute(
+        insert(teachers_students).values(teacher_id=teacher_id, student_id=student.id, classroom_id=classroom.id)
+    )
+
+    # Задача без критериев: максимальный балл работы 0
+    empty_exercise_id = uuid.uuid4()
+    empty_task = Tasks(
+        id=uuid.uuid4(),
+        subject_id=subject_id,
+        teacher_id=teacher_id,
+        name="Задача без критериев",
+        description="",
+        exercises=[Exercises(id=empty_exercise_id, name="Без критериев", description="", order_index=1)]
+    )
+    # Обычная задача: работа оценена на 1 из 2
+    exercise_id = uuid.uuid4()
+    criterion_id = uuid.uuid4()
+    task = Tasks(
+        id=uuid.uuid4(),
+        subject_id=subject_id,
+        teacher_id=teacher_id,
+        name="Задача с критерием",
+        description="",
+        exercises=[
+            Exercises(
+                id=exercise_id,
+                name="С критерием",
+                description="",
+                order_index=1,
+                max_score=2,
+                criterions=[Criterions(id=criterion_id, name="Критерий", score=2)]
+            )
+        ]
+    )
+    empty_work = Works(
+        id=uuid.uuid4(),
+        task_id=empty_task.id,
+        student_id=student.id,
+        status=StatusWork.verified,
+        answers=[Answers(id=uuid.uuid4(), exercise_id=empty_exercise_id)]
+    )
+    work = Works(
+        id=uuid.uuid4(),
+        task_id=task.id,
+        student_id=student.id,
+        status=StatusWork.verified,
+        answers=[
+            Answers(
+                id=uuid.uuid4(),
+                exercise_id=exercise_id,
+                assessments=[Assessments(id=uuid.uuid4(), criterion_id=criterion_id, points=1)]
+            )
+        ]
+    )
+    async_session.add_all([empty_task, task, empty_work, work])
+    await RepoWorkScores(async_session).refresh(work_ids=[empty_work.id, work.id])
+    await async_session.commit()
+
+    response = await client.get(
+        "/journal",
+        headers={"Authorization": session_token_teacher},
+        params={"classroom": str(classroom.id)},
+    )
+
+    assert response.status_code == 200
+    students = response.json()["students"]
+    assert len(students) == 1
+    assert students[0]["verificated_works_count"] == 2
+    assert students[0]["average_score"] == 50
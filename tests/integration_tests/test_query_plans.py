@@ -0,0 +1,236 @@
+import json
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+
+from app.config.db import AsyncSessionLocal, engine_async
+from app.models.model_users import Users
+from app.repositories.repo_work import RepoWorks
+from app.repositories.teacher.repo_students import RepoStudents
+from app.schemas.schema_journal import FiltersClassroomJournalRequest
+from app.schemas.schema_work import SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorksPageParams, WorksSummaryFilters
+from app.services.service_journal import ServiceJournal
+
+
+# Засев на 100k работ долгий: модуль запускается только явно, pytest -m slow
+pytestmark = pytest.mark.slow
+
+# Таблицы, по которым последовательное сканирование на большом объёме недопустимо
+HOT_TABLES = {
+    "works", "work_scores", "answers", "assessments", "answerfiles", "comments",
+    "coordinates", "teachers_students", "tasks", "exercises", "criterions", "subscriptions",
+}
+
+TEACHERS = 200
+STUDENTS = 5000
+TASKS_PER_TEACHER = 20
+WORKS = 100000
+
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, first_name, last_name, email, password, role, is_verificated)
+    SELECT gen_random_uuid(), 'Teacher', i::text, 'plan_teacher_' || i || '@example.com', '-', 'teacher', true
+    FROM generate_series(1, {TEACHERS}) AS i
+    """,
+    f"""
+    INSERT INTO users (id, first_name, last_name, email, password, role, is_verificated)
+    SELECT gen_random_uuid(), 'Student', i::text, 'plan_student_' || i || '@example.com', '-', 'student', true
+    FROM generate_series(1, {STUDENTS}) AS i
+    """,
+    """
+    INSERT INTO subjects (id, name)
+    SELECT gen_random_uuid(), 'plan_subject_' || i FROM generate_series(1, 10) AS i
+    """,
+    """
+    INSERT INTO classrooms (id, name, teacher_id)
+    SELECT gen_random_uuid(), 'plan_' || n, t.id
+    FROM users t CROSS JOIN generate_series(1, 5) AS n
+    WHERE t.email LIKE 'plan_teacher_%'
+    """,
+    # Каждый ученик привязан к трём учителям, у каждого - в один из его классов
+    """
+    INSERT INTO teachers_students (teacher_id, student_id, classroom_id)
+    SELECT t.id, s.id, (
+        SELECT c.id FROM classrooms c WHERE c.teacher_id = t.id ORDER BY c.name LIMIT 1
+    )
+    FROM (SELECT id, row_number() OVER (ORDER BY id) AS rn FROM users WHERE email LIKE 'plan_student_%') s
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) AS rn FROM users WHERE email LIKE 'plan_teacher_%') t
+      ON t.rn IN ((s.rn % 200) + 1, ((s.rn + 67) % 200) + 1, ((s.rn + 133) % 200) + 1)
+    """,
+    f"""
+    INSERT INTO tasks (id, subject_id, teacher_id, name, description)
+    SELECT gen_random_uuid(),
+           (SELECT id FROM subjects WHERE name = 'plan_subject_' || ((n % 10) + 1)),
+           t.id, 'plan_task_' || n, ''
+    FROM users t CROSS JOIN generate_series(1, {TASKS_PER_TEACHER}) AS n
+    WHERE t.email LIKE 'plan_teacher_%'
+    """,
+    """
+    INSERT INTO exercises (id, task_id, name, description, order_index)
+    SELECT gen_random_uuid(), t.id, 'exercise', '', n
+    FROM tasks t CROSS JOIN generate_series(1, 3) AS n
+    WHERE t.name LIKE 'plan_task_%'
+    """,
+    """
+    INSERT INTO criterions (id, exercise_id, name, score)
+    SELECT gen_random_uuid(), e.id, 'criterion', 2 FROM exercises e WHERE e.name = 'exercise'
+    """,
+    # Работа выдаётся ученику по задаче одного из его учителей
+    f"""
+    INSERT INTO works (id, task_id, student_id, status, created_at, updated_at)
+    SELECT gen_random_uuid(), t.id, ts.student_id,
+           (ARRAY['draft', 'inProgress', 'verification', 'verified', 'canceled'])[(i % 5) + 1]::statuswork,
+           now() - (i % 365) * interval '1 day', now()
+    FROM generate_series(1, {WORKS}) AS i
+    JOIN LATERAL (
+        SELECT student_id, teacher_id FROM teachers_students
+        WHERE student_id IS NOT NULL
+        OFFSET (i * 7919) % (SELECT count(*) FROM teachers_students) LIMIT 1
+    ) ts ON true
+    JOIN LATERAL (
+        SELECT id FROM tasks WHERE teacher_id = ts.teacher_id
+        OFFSET i % {TASKS_PER_TEACHER} LIMIT 1
+    ) t ON true
+    """,
+    """
+    INSERT INTO answers (id, work_id, exercise_id, text, general_comment)
+    SELECT gen_random_uuid(), w.id, e.id, '', ''
+    FROM works w JOIN exercises e ON e.task_id = w.task_id
+    """,
+    """
+    INSERT INTO assessments (id, answer_id, criterion_id, points)
+    SELECT gen_random_uuid(), a.id, c.id, 1
+    FROM answers a JOIN criterions c ON c.exercise_id = a.exercise_id
+    """,
+    """
+    INSERT INTO work_scores (work_id, score, max_score, answers_count, answered_count, graded_count)
+    SELECT w.id, 3, 6, 3, 3, 3 FROM works w
+    ON CONFLICT (work_id) DO NOTHING
+    """,
+]
+
+
+# Удаление засеянных строк: работы вместе с ответами, оценками и сводками уходят по ON DELETE CASCADE,
+# задачи - вместе с упражнениями и критериями
+CLEANUP_SQL = [
+    "DELETE FROM works WHERE task_id IN (SELECT id FROM tasks WHERE name LIKE 'plan_task_%')",
+    "DELETE FROM tasks WHERE name LIKE 'plan_task_%'",
+    "DELETE FROM teachers_students WHERE teacher_id IN (SELECT id FROM users WHERE email LIKE 'plan_teacher_%')",
+    "DELETE FROM classrooms WHERE teacher_id IN (SELECT id FROM users WHERE email LIKE 'plan_teacher_%')",
+    "DELETE FROM users WHERE email LIKE 'plan_teacher_%' OR email LIKE 'plan_student_%'",
+    "DELETE FROM subjects WHERE name LIKE 'plan_subject_%'",
+]
+
+
+def no_filters(schema, **values):
+    """Фильтры без значений: у полей Field(Query(None)) значение по умолчанию - сам объект Query"""
+    return schema(**{name: None for name in schema.model_fields} | values)
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Таблицы из HOT_TABLES, которые план читает последовательным сканированием"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+@pytest_asyncio.fixture(scope="module")
+async def seeded_db(setup_db):
+    async with engine_async.begin() as conn:
+        for sql in SEED_SQL:
+            await conn.execute(text(sql))
+    # Актуальная статистика, иначе планировщик считает таблицы пустыми
+    async with engine_async.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+    yield
+
+    async with engine_async.begin() as conn:
+        for sql in CLEANUP_SQL:
+            await conn.execute(text(sql))
+
+
+@pytest_asyncio.fixture
+async def captured_statements(seeded_db):
+    """Собирает SELECT-запросы, которые приложение отправляет в базу"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine_async.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine_async.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def assert_no_seq_scans(statements):
+    assert statements, "Не перехвачено ни одного запроса"
+    captured = list(statements)
+    statements.clear()
+
+    async with engine_async.connect() as conn:
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scans = seq_scans(plan[0]["Plan"])
+            assert not scans, f"Seq Scan по {scans} в запросе:\n{statement}"
+
+
+@pytest.mark.asyncio
+async def test_works_list_plans(captured_statements, teacher_id, student_id):
+    async with AsyncSessionLocal() as session:
+        repo = RepoWorks(session)
+        await repo.get_works_list_teacher(
+            teacher_id, no_filters(SmartFiltersWorkTeacher), WorksPageParams(limit=50, with_total=True)
+        )
+        await repo.get_works_list_teacher(
+            teacher_id,
+            no_filters(SmartFiltersWorkTeacher, statuses=["verified"]),
+            WorksPageParams(limit=50, sort="score", order="asc"),
+        )
+        await repo.get_works_list_student(
+            student_id, no_filters(SmartFiltersWorkStudent), WorksPageParams(limit=50, with_total=True)
+        )
+        await repo.get_works_list_teacher(
+            teacher_id,
+            no_filters(SmartFiltersWorkTeacher, search="plan_task_7"),
+            WorksPageParams(limit=50, sort="relevance", with_total=True),
+        )
+        await repo.get_status_summary_teacher(teacher_id, WorksSummaryFilters())
+
+    await assert_no_seq_scans(captured_statements)
+
+
+@pytest.mark.asyncio
+async def test_students_plans(captured_statements, teacher_id, student_id):
+    async with AsyncSessionLocal() as session:
+        teacher = await session.get(Users, teacher_id)
+        repo = RepoStudents(session)
+        await repo.get_all(teacher)
+        await repo.get_single_students(None, teacher)
+        await repo.get_filters(teacher_id)
+        await repo.exists(teacher_id, student_id)
+
+    await assert_no_seq_scans(captured_statements)
+
+
+@pytest.mark.asyncio
+async def test_journal_plans(captured_statements, teacher_id, classroom_id):
+    async with AsyncSessionLocal() as session:
+        teacher = await session.get(Users, teacher_id)
+        service = ServiceJournal(session)
+        await service.get_filters(teacher)
+        await service.get(no_filters(FiltersClassroomJournalRequest, classroom=classroom_id), teacher)
+
+    await assert_no_seq_scans(captured_statements)
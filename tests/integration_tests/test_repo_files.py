@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config.config_app import settings
+from app.config.db import AsyncSessionLocal
+from app.models.model_files import S3ObjectRefs
+from app.repositories import repo_files
+from app.repositories.repo_files import RepoFiles
+
+
+def cas_key() -> str:
+    return f"{settings.S3_CAS_PREFIX}{uuid.uuid4().hex}.png"
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Ключи, которые есть в хранилище: object_exists без обращения к S3"""
+    keys = set()
+
+    async def object_exists(key: str) -> bool:
+        return key in keys
+
+    monkeypatch.setattr(repo_files, "object_exists", object_exists)
+    return keys
+
+
+async def get_ref(key: str) -> S3ObjectRefs | None:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(S3ObjectRefs).where(S3ObjectRefs.key == key))
+
+
+@pytest.mark.asyncio
+async def test_acquire_and_release_to_zero(storage):
+    key = cas_key()
+    async with AsyncSessionLocal() as session:
+        repo = RepoFiles(session)
+        await repo.acquire([key, key, "not-cas.png"])
+        await session.commit()
+        assert (await get_ref(key)).refcount == 2
+        assert await get_ref("not-cas.png") is None
+
+        assert await repo.release([key]) == set()
+        await session.commit()
+        assert (await get_ref(key)).refcount == 1
+        assert await repo.get_referenced([key]) == {key}
+
+        # Последняя ссылка: ключ можно удалять, строка остаётся надгробием
+        assert await repo.release([key]) == {key}
+        await session.commit()
+
+        ref = await get_ref(key)
+        assert ref.refcount == 0 and ref.released_at is not None
+        assert await repo.get_referenced([key]) == set()
+        assert await repo.get_released([key]) == {key}
+
+
+@pytest.mark.asyncio
+async def test_release_without_row_leaves_tombstone(storage):
+    key = cas_key()
+    async with AsyncSessionLocal() as session:
+        assert await RepoFiles(session).release([key]) == {key}
+        await session.commit()
+
+    ref = await get_ref(key)
+    assert ref.refcount == 0 and ref.released_at is not None
+
+
+@pytest.mark.asyncio
+async def test_acquire_tombstone(storage):
+    key = cas_key()
+    async with AsyncSessionLocal() as session:
+        repo = RepoFiles(session)
+        await repo.acquire([key])
+        await repo.release([key])
+        await session.commit()
+
+        # Объект удалён - привязать нельзя, счётчик не меняется
+        with pytest.raises(HTTPException) as exc:
+            await repo.acquire([key])
+        assert exc.value.status_code == 409
+        await session.rollback()
+        assert (await get_ref(key)).refcount == 0
+
+        # Объект загружен заново - надгробие снимается
+        storage.add(key)
+        await repo.acquire([key])
+        await session.commit()
+
+    ref = await get_ref(key)
+    assert ref.refcount == 1 and ref.released_at is None
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_parallel_release(storage):
+    """Привязка во время удаления последней ссылки ждёт commit и не создаёт ссылку на удалённый объект"""
+    key = cas_key()
+    async with AsyncSessionLocal() as session:
+        await RepoFiles(session).acquire([key])
+        await session.commit()
+
+    async with AsyncSessionLocal() as releasing, AsyncSessionLocal() as attaching:
+        assert await RepoFiles(releasing).release([key]) == {key}
+
+        attach = asyncio.create_task(RepoFiles(attaching).acquire([key]))
+        await asyncio.sleep(0.5)
+        assert not attach.done()  # ждёт блокировку строки счётчика
+
+        await releasing.commit()  # объект удалён из хранилища (storage пуст)
+        with pytest.raises(HTTPException) as exc:
+            await attach
+        assert exc.value.status_code == 409
+        await attaching.rollback()
+
+    assert (await get_ref(key)).refcount == 0
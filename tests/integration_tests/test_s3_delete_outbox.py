@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select, update
+
+from app.config.config_app import settings
+from app.config.db import AsyncSessionLocal
+from app.models.model_files import S3DeleteOutbox
+from app.repositories.repo_s3_outbox import RepoS3Outbox
+from app.workers import s3_delete_worker
+
+
+@pytest_asyncio.fixture
+async def outbox():
+    """Пустая очередь перед тестом"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(S3DeleteOutbox))
+        await session.commit()
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """
+    delete_objects_batch без обращения к S3: failing - ключи, которые удалить не удаётся,
+    deleted - ключи из всех вызовов по порядку
+    """
+    state = {"failing": set(), "deleted": [], "delay": 0}
+
+    async def delete_objects_batch(keys):
+        await asyncio.sleep(state["delay"])
+        state["deleted"].extend(keys)
+        return {key: "AccessDenied: Access Denied" for key in keys if key in state["failing"]}
+
+    monkeypatch.setattr(s3_delete_worker, "delete_objects_batch", delete_objects_batch)
+    return state
+
+
+async def enqueue(keys: list[str]):
+    async with AsyncSessionLocal() as session:
+        RepoS3Outbox(session).add(keys)
+        await session.commit()
+
+
+async def get_entries() -> dict[str, S3DeleteOutbox]:
+    async with AsyncSessionLocal() as session:
+        result = await session.scalars(select(S3DeleteOutbox))
+        return {entry.key: entry for entry in result}
+
+
+async def make_due(key: str):
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(S3DeleteOutbox).where(S3DeleteOutbox.key == key).values(next_attempt_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_drain_partial_failure(outbox, storage):
+    storage["failing"] = {"outbox/bad.txt"}
+    await enqueue(["outbox/ok1.txt", "outbox/ok2.txt", "outbox/bad.txt"])
+
+    assert await s3_delete_worker.drain_once() == 3
+    assert sorted(storage["deleted"]) == ["outbox/bad.txt", "outbox/ok1.txt", "outbox/ok2.txt"]
+
+    # Удачные ключи ушли из очереди, неудачный отложен
+    entries = await get_entries()
+    assert list(entries) == ["outbox/bad.txt"]
+    assert entries["outbox/bad.txt"].attempts == 1
+    assert entries["outbox/bad.txt"].last_error == "AccessDenied: Access Denied"
+
+    # Задержка растёт с каждой попыткой: base, 2 * base, 4 * base
+    for attempts in (2, 3):
+        await make_due("outbox/bad.txt")
+        started = datetime.now(timezone.utc)
+        assert await s3_delete_worker.drain_once() == 1
+
+        entry = (await get_entries())["outbox/bad.txt"]
+        delay = (entry.next_attempt_at - started).total_seconds()
+        expected = settings.S3_DELETE_RETRY_BASE * 2 ** (attempts - 1)
+        assert entry.attempts == attempts
+        assert expected - 5 <= delay <= expected + 5
+
+    # Запись, время которой не подошло, не забирается
+    assert await s3_delete_worker.drain_once() == 0
+
+    storage["failing"] = set()
+    await make_due("outbox/bad.txt")
+    assert await s3_delete_worker.drain_once() == 1
+    assert await get_entries() == {}
+
+
+@pytest.mark.asyncio
+async def test_postpone_max_delay(outbox):
+    await enqueue(["outbox/slow.txt"])
+    async with AsyncSessionLocal() as session:
+        repo = RepoS3Outbox(session)
+        [entry] = await repo.claim(10)
+        entry.attempts = 20
+        started = datetime.now(timezone.utc)
+        await repo.postpone(entry, "error", base=30, max_delay=3600)
+        await session.commit()
+
+    entry = (await get_entries())["outbox/slow.txt"]
+    assert 3595 <= (entry.next_attempt_at - started).total_seconds() <= 3605
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_locked_rows(outbox):
+    keys = [f"outbox/claim{i}.txt" for i in range(10)]
+    await enqueue(keys)
+
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        claimed_first = await RepoS3Outbox(first).claim(4)
+        # Пока первая транзакция открыта, её строки заблокированы
+        claimed_second = await RepoS3Outbox(second).claim(10)
+
+        first_keys = {entry.key for entry in claimed_first}
+        second_keys = {entry.key for entry in claimed_second}
+        assert len(first_keys) == 4 and len(second_keys) == 6
+        assert first_keys.isdisjoint(second_keys)
+        assert first_keys | second_keys == set(keys)
+
+        await first.rollback()
+        await second.rollback()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_drains(outbox, storage, monkeypatch):
+    """Два воркера одновременно: каждый ключ удаляется ровно один раз"""
+    monkeypatch.setattr(settings, "S3_DELETE_BATCH_SIZE", 5)
+    # Удаление держит строки заблокированными, пока второй воркер забирает свою пачку
+    storage["delay"] = 0.2
+    keys = [f"outbox/parallel{i}.txt" for i in range(10)]
+    await enqueue(keys)
+
+    processed = await asyncio.gather(s3_delete_worker.drain_once(), s3_delete_worker.drain_once())
+
+    assert sorted(processed) == [5, 5]
+    assert sorted(storage["deleted"]) == sorted(keys)
+    assert await get_entries() == {}
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+from sqlalchemy import select, update
+
+from app.config.db import AsyncSessionLocal
+from app.models.model_users import Users
+from app.models.model_works import WorkDocuments, Works
+from app.services.service_work import ServiceWork
+
+
+@pytest.mark.asyncio
+async def test_json_loader_matches_orm(work_id, student_id):
+    async with AsyncSessionLocal() as session:
+        student = await session.get(Users, student_id)
+        orm_work = await ServiceWork(session).get(work_id, student, "orm")
+    async with AsyncSessionLocal() as session:
+        student = await session.get(Users, student_id)
+        json_work = await ServiceWork(session).get(work_id, student, "json")
+
+    assert json_work.model_dump(mode="json") == orm_work.model_dump(mode="json")
+
+
+@pytest.mark.asyncio
+async def test_document_loader_matches_orm(work_id, student_id):
+    async with AsyncSessionLocal() as session:
+        student = await session.get(Users, student_id)
+        orm_work = await ServiceWork(session).get(work_id, student, "orm")
+    async with AsyncSessionLocal() as session:
+        student = await session.get(Users, student_id)
+        document_work = await ServiceWork(session).get(work_id, student, "document")
+
+    assert document_work.model_dump(mode="json") == orm_work.model_dump(mode="json")
+
+
+@pytest.mark.asyncio
+async def test_stale_document_rebuilt(work_id, student_id):
+    async with AsyncSessionLocal() as session:
+        student = await session.get(Users, student_id)
+        await ServiceWork(session).get(work_id, student, "document")
+        # Запись в обход refresh: снимок остаётся со старым source_key
+        await session.execute(update(Works).where(Works.id == work_id).values(version=Works.version + 1))
+        await session.commit()
+
+        stale_key = await session.scalar(select(WorkDocuments.source_key).where(WorkDocuments.work_id == work_id))
+        await ServiceWork(session).get(work_id, student, "document")
+        fresh_key = await session.scalar(select(WorkDocuments.source_key).where(WorkDocuments.work_id == work_id))
+
+    assert fresh_key != stale_key
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_json_loader_vs_orm(work_id, student_id):
+    """Сравнение скорости загрузки работы: selectinload + ORM, JSON-документ на лету и сохранённый снимок"""
+    rounds = 200
+    timings = {}
+    for loader in ("orm", "json", "document"):
+        async with AsyncSessionLocal() as session:
+            student = await session.get(Users, student_id)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await ServiceWork(session).get(work_id, student, loader)
+                session.expunge_all()
+            timings[loader] = time.perf_counter() - start
+
+    print(
+        f"\norm: {timings['orm'] / rounds * 1e3:.2f} ms/work, "
+        f"json: {timings['json'] / rounds * 1e3:.2f} ms/work, "
+        f"document: {timings['document'] / rounds * 1e3:.2f} ms/work"
+    )
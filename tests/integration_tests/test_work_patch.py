@@ -0,0 +1,81 @@
+import pytest
+
+from app.models.model_works import Answers, Assessments, Works
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "token_fixture,points,expected_status,expected_detail",
+    [
+        ("session_token_teacher", 1, 200, None),
+        ("session_token_teacher", 10, 400, "Too many points"),
+    ],
+)
+async def test_patch_assessment_points(
+    request,
+    client,
+    async_session,
+    work_id,
+    assessment_id,
+    token_fixture,
+    points,
+    expected_status,
+    expected_detail,
+):
+    token = request.getfixturevalue(token_fixture)
+    work = await async_session.get(Works, work_id)
+    version = work.version
+
+    response = await client.patch(
+        f"/works/{work_id}",
+        headers={"Authorization": token},
+        json={"operations": [{"op": "set_assessment_points", "assessment_id": str(assessment_id), "points": points}]},
+    )
+
+    assert response.status_code == expected_status
+    await async_session.refresh(work)
+    if expected_detail is not None:
+        assert response.json() == {"detail": expected_detail}
+        assert work.version == version  # при ошибке ничего не сохраняется
+        return
+
+    body = response.json()
+    assert [item["points"] for item in body["assessments"]] == [points]
+    assert body["answers"] == [] and body["added_files"] == [] and body["removed_files"] == []
+    assert body["version"] == work.version == version + 1
+
+    assessment = await async_session.get(Assessments, assessment_id)
+    await async_session.refresh(assessment)
+    assert assessment.points == points
+
+
+@pytest.mark.asyncio
+async def test_patch_answer_text(client, async_session, work_id, answer_id, session_token_student):
+    response = await client.patch(
+        f"/works/{work_id}",
+        headers={"Authorization": session_token_student},
+        json={"operations": [{"op": "set_answer_text", "answer_id": str(answer_id), "text": "patched"}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["answers"] == [{"id": str(answer_id), "text": "patched"}]
+    answer = await async_session.get(Answers, answer_id)
+    await async_session.refresh(answer)
+    assert answer.text == "patched"
+
+
+@pytest.mark.asyncio
+async def test_patch_role_permissions(client, work_id, answer_id, assessment_id, session_token_student, session_token_teacher):
+    response = await client.patch(
+        f"/works/{work_id}",
+        headers={"Authorization": session_token_student},
+        json={"operations": [{"op": "set_assessment_points", "assessment_id": str(assessment_id), "points": 1}]},
+    )
+    assert response.status_code == 403
+
+    response = await client.patch(
+        f"/works/{work_id}",
+        headers={"Authorization": session_token_teacher},
+        json={"operations": [{"op": "set_answer_text", "answer_id": str(answer_id), "text": "teacher"}]},
+    )
+    assert response.status_code == 403
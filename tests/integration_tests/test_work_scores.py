@@ -0,0 +1,119 @@
+import uuid
+
+import pytest
+from sqlalchemy import and_, distinct, exists, func, or_, select
+
+from app.config.db import AsyncSessionLocal
+from app.models.model_files import AnswerFiles
+from app.models.model_tasks import Criterions, Exercises
+from app.models.model_users import Users
+from app.models.model_works import Answers, Assessments, WorkScores, Works
+from app.repositories.repo_task import RepoTasks
+from app.schemas.schema_tasks import CriterionUpdate, ExerciseUpdate, TaskUpdate
+from app.services.service_assessments import ServiceAssessments
+from app.services.service_tasks import ServiceTasks
+
+
+async def expected_scores(session) -> dict:
+    """Баллы работ прежним способом: join ответов, критериев и оценок с группировкой по работе"""
+    stmt = (
+        select(
+            Works.id,
+            func.coalesce(func.sum(Assessments.points), 0),
+            func.coalesce(func.sum(Criterions.score), 0),
+            func.count(distinct(Answers.id)),
+            func.count(distinct(Answers.id)).filter(
+                or_(Answers.text != '', exists().where(AnswerFiles.answer_id == Answers.id))
+            ),
+            func.count(distinct(Answers.id)).filter(Assessments.points > 0),
+        )
+        .outerjoin(Answers, Answers.work_id == Works.id)
+        .outerjoin(Exercises, Answers.exercise_id == Exercises.id)
+        .outerjoin(Criterions, Criterions.exercise_id == Exercises.id)
+        .outerjoin(Assessments, and_(Assessments.answer_id == Answers.id, Assessments.criterion_id == Criterions.id))
+        .group_by(Works.id)
+    )
+    return {row[0]: tuple(row[1:]) for row in await session.execute(stmt)}
+
+
+async def assert_scores_match():
+    async with AsyncSessionLocal() as session:
+        stmt = select(
+            WorkScores.work_id,
+            WorkScores.score,
+            WorkScores.max_score,
+            WorkScores.answers_count,
+            WorkScores.answered_count,
+            WorkScores.graded_count,
+        )
+        actual = {row[0]: tuple(row[1:]) for row in await session.execute(stmt)}
+        assert actual == await expected_scores(session)
+        return actual
+
+
+@pytest.mark.asyncio
+async def test_work_scores_follow_changes(
+    client, session_token_student, teacher_id, task_id, work_id, answer_id, assessment_id
+):
+    # Оценка учителем
+    async with AsyncSessionLocal() as session:
+        teacher = await session.get(Users, teacher_id)
+        await ServiceAssessments(session).update(work_id, answer_id, assessment_id, 1, teacher)
+    scores = await assert_scores_match()
+    assert scores[work_id][0] == 1
+
+    # Ответ ученика через PUT /works/{id}
+    async with AsyncSessionLocal() as session:
+        work = await session.get(Works, work_id)
+        body = {
+            "id": str(work_id), "task_id": str(task_id), "student_id": str(work.student_id),
+            "status": work.status.value, "conclusion": work.conclusion or "",
+            "answers": [{
+                "id": str(answer_id), "text": "Десять", "general_comment": "", "files": [], "assessments": [],
+            }],
+        }
+    response = await client.put(f"/works/{work_id}", headers={"Authorization": session_token_student}, json=body)
+    assert response.status_code == 200
+    scores = await assert_scores_match()
+    assert scores[work_id][4] == 1
+
+    # Изменение критериев задачи: новый максимум у всех работ задачи
+    async with AsyncSessionLocal() as session:
+        teacher = await session.get(Users, teacher_id)
+        task = await RepoTasks(session).get(task_id)
+        update = TaskUpdate(
+            id=task.id, name=task.name, description=task.description, deadline=task.deadline,
+            subject_id=task.subject_id, teacher_id=task.teacher_id,
+            exercises=[
+                ExerciseUpdate(
+                    id=exercise.id, name=exercise.name, description=exercise.description,
+                    order_index=exercise.order_index, task_id=task.id, files=exercise.files,
+                    criterions=[
+                        *[
+                            CriterionUpdate(id=criterion.id, name=criterion.name, score=3, exercise_id=exercise.id)
+                            for criterion in exercise.criterions
+                        ],
+                        CriterionUpdate(name="Новый критерий", score=2, exercise_id=exercise.id),
+                    ],
+                )
+                for exercise in task.exercises
+            ],
+        )
+        await ServiceTasks(session).update(task_id, update, teacher)
+    scores = await assert_scores_match()
+    assert scores[work_id][:2] == (1, 5)
+
+    # Новая работа по задаче
+    async with AsyncSessionLocal() as session:
+        student = Users(
+            id=uuid.uuid4(), first_name="Scores", last_name="Student", email="scores_student@example.com",
+            password="123456", role="student", is_verificated=True,
+        )
+        session.add(student)
+        await session.flush()
+        task = await RepoTasks(session).get(task_id)
+        await RepoTasks(session).create_works(task, [student.id])
+        await session.commit()
+        new_work_id = await session.scalar(select(Works.id).where(Works.student_id == student.id))
+    scores = await assert_scores_match()
+    assert scores[new_work_id] == (0, 5, 1, 0, 0)
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+
+from app.config.db import AsyncSessionLocal
+from app.models.model_tasks import Tasks
+from app.models.model_users import Users, teachers_students
+from app.models.model_works import StatusWork, WorkScores, Works
+
+
+STUDENTS = 6
+TASKS = 3
+LIMIT = 4
+
+
+@pytest_asyncio.fixture(scope="module")
+async def works(setup_db):
+    """
+    Работы учителя с повторяющимися значениями ключей сортировки:
+    три даты создания, три значения баллов и пять статусов на 18 работ
+    """
+    teacher_id, subject_id = setup_db["teacher_id"], setup_db["subject_id"]
+    created_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    statuses = list(StatusWork)
+
+    async with AsyncSessionLocal() as session:
+        students = [
+            Users(
+                id=uuid.uuid4(), first_name="Page", last_name=str(i), email=f"page_student_{i}@example.com",
+                password="123456", role="student", is_verificated=True,
+            )
+            for i in range(STUDENTS)
+        ]
+        tasks = [
+            Tasks(id=uuid.uuid4(), subject_id=subject_id, teacher_id=teacher_id, name=f"Постраничная {i}", description="")
+            for i in range(TASKS)
+        ]
+        session.add_all([*students, *tasks])
+        await session.flush()
+        await session.execute(
+            insert(teachers_students),
+            [{"teacher_id": teacher_id, "student_id": student.id} for student in students],
+        )
+
+        works = []
+        for i, (task, student) in enumerate((task, student) for task in tasks for student in students):
+            works.append(Works(
+                id=uuid.uuid4(),
+                task_id=task.id,
+                student_id=student.id,
+                status=statuses[i % len(statuses)],
+                created_at=created_at - timedelta(days=i % 3),
+            ))
+        session.add_all(works)
+        await session.flush()
+        await session.execute(
+            insert(WorkScores),
+            [{"work_id": work.id, "score": i % 3, "max_score": 2} for i, work in enumerate(works)],
+        )
+        await session.commit()
+
+
+async def get_list(client, token, **params):
+    response = await client.get("/works/teacher/list", headers={"Authorization": token}, params=params)
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("sort", ["created_at", "score", "status"])
+async def test_pages_match_full_list(works, client, session_token_teacher, sort, order):
+    response = await get_list(client, session_token_teacher, sort=sort, order=order, with_total=True)
+    full = [work["id"] for work in response.json()]
+    assert int(response.headers["X-Total-Count"]) == len(full)
+    assert len(full) > LIMIT * 3
+
+    paged = []
+    cursor = None
+    for _ in range(len(full)):
+        params = {"sort": sort, "order": order, "limit": LIMIT, "with_total": True}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await get_list(client, session_token_teacher, **params)
+        items = [work["id"] for work in response.json()]
+        assert int(response.headers["X-Total-Count"]) == len(full)
+        paged.extend(items)
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert 0 < len(items) <= LIMIT
+            break
+        assert len(items) == LIMIT
+
+    # Страницы подряд дают тот же список: без повторов и пропусков
+    assert cursor is None
+    assert len(set(paged)) == len(paged)
+    assert paged == full
@@ -0,0 +1,47 @@
+import json
+import uuid
+
+import pytest
+
+from app.schemas.schema_work import WorkRead
+from app.services import service_work
+
+
+@pytest.mark.asyncio
+async def test_attach_work_file_urls(monkeypatch):
+    async def fake_presign_many(keys):
+        return {key: f"https://s3/{key}" for key in keys if key != "missing.png"}
+
+    monkeypatch.setattr(service_work, "presign_many", fake_presign_many)
+    answer_id, exercise_id = uuid.uuid4(), uuid.uuid4()
+    document = {
+        "id": str(uuid.uuid4()), "task_id": str(uuid.uuid4()), "student_id": str(uuid.uuid4()),
+        "finish_date": None, "status": "inProgress", "conclusion": "",
+        "task": {"id": str(uuid.uuid4()), "name": "Дроби", "description": "", "deadline": None, "subject_id": str(uuid.uuid4())},
+        "answers": [{
+            "id": str(answer_id), "work_id": str(uuid.uuid4()), "exercise_id": str(exercise_id),
+            "text": "", "general_comment": "",
+            "files": [
+                {"id": str(uuid.uuid4()), "key": "a.png", "file": "a.png", "ai_status": "draft"},
+                {"id": str(uuid.uuid4()), "key": "missing.png", "file": "missing.png", "ai_status": "draft"},
+            ],
+            "exercise": {
+                "id": str(exercise_id), "task_id": str(uuid.uuid4()), "name": "1", "description": "", "order_index": 1,
+                "files": [{"key": "e.png", "file": "e.png"}],
+            },
+            "assessments": [],
+            "comments": [{
+                "id": str(uuid.uuid4()), "answer_id": str(answer_id), "answerfile_id": str(uuid.uuid4()),
+                "description": "", "type_id": str(uuid.uuid4()),
+                "coordinates": [{"x1": 0, "y1": 0, "x2": 1, "y2": 1}],
+                "files": [{"key": "c.png", "file": "c.png"}],
+            }],
+        }],
+    }
+
+    work = await service_work.attach_work_file_urls(WorkRead.model_validate_json(json.dumps(document)))
+
+    answer = work.answers[0]
+    assert [(f.key, f.file) for f in answer.files] == [("a.png", "https://s3/a.png")]
+    assert answer.exercise.files[0].file == "https://s3/e.png"
+    assert answer.comments[0].files[0].file == "https://s3/c.png"
@@ -0,0 +1,13 @@
+from app.utils.etag import etag_matches, make_etag
+
+
+def test_etag_weak_comparison():
+    etag = make_etag(1700000000123456, 3, 2834)
+
+    assert etag == 'W/"1700000000123456-3-2834"'
+    assert etag_matches(etag, etag)
+    assert etag_matches('"1700000000123456-3-2834"', etag)
+    assert etag_matches('W/"other", W/"1700000000123456-3-2834"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(make_etag(1700000000123456, 4, 2834), etag)
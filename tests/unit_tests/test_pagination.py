@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+import uuid
+
+import pytest
+
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2026, 2, 7, 14, 31, 44, 621538, tzinfo=timezone.utc)
+    work_id = uuid.uuid4()
+
+    sort, order, value, last_id = decode_cursor(encode_cursor("created_at", "desc", created_at, work_id))
+
+    assert (sort, order) == ("created_at", "desc")
+    assert datetime.fromisoformat(value) == created_at
+    assert uuid.UUID(last_id) == work_id
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "!!!"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils import presigned_cache
+from app.utils.presigned_cache import PresignedUrlCache
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        for key, value in self.commands:
+            self.redis.data[key] = value
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.redis.subscribers.remove(self)
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class FakeRedis:
+    """Общий Redis для нескольких процессов: строки и рассылка pub/sub"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def publish(self, channel, data):
+        for subscriber in self.subscribers:
+            subscriber.queue.put_nowait({"type": "message", "channel": channel, "data": data})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class BrokenRedis:
+    async def mget(self, keys):
+        raise ConnectionError("redis is down")
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("redis is down")
+
+    async def delete(self, *keys):
+        raise ConnectionError("redis is down")
+
+    async def publish(self, channel, data):
+        raise ConnectionError("redis is down")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lifetime, cached", [(700, True), (600, False), (10, False)])
+async def test_min_ttl(lifetime, cached):
+    """Ссылка, которой осталось жить не больше min_ttl, не отдаётся ни из памяти, ни из Redis"""
+    redis = FakeRedis()
+    cache = PresignedUrlCache(redis, min_ttl=600)
+    await cache.set_many({"a": "url-a"}, int(time.time()) + lifetime)
+
+    assert (await cache.get_many(["a"]) == {"a": "url-a"}) is cached
+    cache._local.clear()
+    assert (await cache.get_many(["a"]) == {"a": "url-a"}) is cached
+
+
+@pytest.mark.asyncio
+async def test_lru_bound():
+    cache = PresignedUrlCache(None, max_size=2, min_ttl=0)
+    expires_at = int(time.time()) + 3600
+    await cache.set_many({"a": "url-a", "b": "url-b"}, expires_at)
+    # Обращение к "a" делает самой старой запись "b"
+    assert await cache.get_many(["a"]) == {"a": "url-a"}
+    await cache.set_many({"c": "url-c"}, expires_at)
+
+    assert list(cache._local) == ["a", "c"]
+    assert await cache.get_many(["a", "b", "c"]) == {"a": "url-a", "c": "url-c"}
+
+
+@pytest.mark.asyncio
+async def test_local_ttl(monkeypatch):
+    """Запись в памяти устаревает через local_ttl, дальше ссылка читается из Redis"""
+    redis = FakeRedis()
+    cache = PresignedUrlCache(redis, min_ttl=0, local_ttl=60)
+    now = time.time()
+    await cache.set_many({"a": "url-a"}, int(now) + 3600)
+
+    await redis.delete(cache._redis_key("a"))
+    assert await cache.get_many(["a"]) == {"a": "url-a"}
+
+    monkeypatch.setattr(presigned_cache.time, "time", lambda: now + 61)
+    assert await cache.get_many(["a"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable():
+    """При недоступном Redis кэш работает только в памяти и не пробрасывает ошибки"""
+    cache = PresignedUrlCache(BrokenRedis(), min_ttl=0)
+    await cache.set_many({"a": "url-a"}, int(time.time()) + 3600)
+
+    assert await cache.get_many(["a", "b"]) == {"a": "url-a"}
+    await cache.evict(["a"])
+    assert await cache.get_many(["a"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_evict_reaches_other_processes():
+    redis = FakeRedis()
+    api = PresignedUrlCache(redis, min_ttl=0)
+    worker = PresignedUrlCache(redis, min_ttl=0)
+    listener = asyncio.create_task(api.listen())
+    try:
+        await asyncio.sleep(0)
+        await api.set_many({"a": "url-a", "b": "url-b"}, int(time.time()) + 3600)
+
+        await worker.evict(["a"])
+        for _ in range(10):
+            if "a" not in api._local:
+                break
+            await asyncio.sleep(0)
+
+        assert list(api._local) == ["b"]
+        assert await api.get_many(["a"]) == {}
+    finally:
+        listener.cancel()
@@ -0,0 +1,27 @@
+import pytest
+
+from app.workers.s3_gc import iter_orphans
+
+
+async def aiter_list(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "objects, referenced, orphans",
+    [
+        (["a", "b", "c"], ["a", "b", "c"], []),
+        (["a", "b", "c"], [], ["a", "b", "c"]),
+        (["a", "b", "d", "e"], ["b", "c", "e", "f"], ["a", "d"]),
+        (["Z.png", "a.png", "a.png.jpg"], ["a.png"], ["Z.png", "a.png.jpg"]),
+        ([], ["a"], []),
+    ],
+)
+async def test_iter_orphans_merges_sorted_streams(objects, referenced, orphans):
+    found = [
+        obj["Key"]
+        async for obj in iter_orphans(aiter_list([{"Key": key} for key in objects]), aiter_list(referenced))
+    ]
+    assert found == orphans
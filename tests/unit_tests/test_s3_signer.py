@@ -0,0 +1,130 @@
+from datetime import datetime, timezone
+import time
+
+import aioboto3
+from aiobotocore.config import AioConfig
+import botocore.auth
+import pytest
+
+from app.utils.s3_signer import SigV4Presigner
+
+
+ENDPOINT = "http://minio:9000"
+BUCKET = "permanent"
+NOW = datetime(2026, 2, 7, 14, 31, 44, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def frozen_botocore_time(monkeypatch):
+    monkeypatch.setattr(botocore.auth, "get_current_datetime", lambda *args, **kwargs: NOW.replace(tzinfo=None))
+
+
+@pytest.fixture
+def signer() -> SigV4Presigner:
+    return SigV4Presigner(ENDPOINT, "access", "secret")
+
+
+def boto_client():
+    session = aioboto3.Session()
+    return session.client(
+        's3',
+        endpoint_url=ENDPOINT,
+        aws_access_key_id="access",
+        aws_secret_access_key="secret",
+        region_name='us-east-1',
+        config=AioConfig(signature_version='s3v4'),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key", ["3f2b9a1c0d4e5f6.jpeg", "dir/с пробелом+плюс~.png", "a=b&c.jpg"])
+async def test_presign_get_matches_botocore(signer, frozen_botocore_time, key):
+    async with boto_client() as s3:
+        expected = await s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': BUCKET, 'Key': key},
+            ExpiresIn=3600
+        )
+
+    assert signer.presign_get(BUCKET, key, 3600, now=NOW) == expected
+
+
+@pytest.mark.asyncio
+async def test_presign_put_matches_botocore(signer, frozen_botocore_time):
+    async with boto_client() as s3:
+        expected = await s3.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': BUCKET, 'Key': "3f2b9a1c0d4e5f6.png", 'ContentType': "image/png"},
+            ExpiresIn=3600
+        )
+
+    assert signer.presign_put(BUCKET, "3f2b9a1c0d4e5f6.png", 3600, "image/png", now=NOW) == expected
+
+
+@pytest.mark.asyncio
+async def test_presign_put_with_checksum_matches_botocore(signer, frozen_botocore_time):
+    checksum = "LCa0a2j/xo/5m0U8HTBBNBNCLXBkg7+g+YpeiGJm564="
+    async with boto_client() as s3:
+        expected = await s3.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': BUCKET, 'Key': "cas/abc.png", 'ContentType': "image/png", 'ChecksumSHA256': checksum},
+            ExpiresIn=3600
+        )
+
+    assert signer.presign_put(BUCKET, "cas/abc.png", 3600, "image/png", now=NOW, checksum_sha256=checksum) == expected
+
+
+@pytest.mark.asyncio
+async def test_presign_get_with_cache_control_matches_botocore(signer, frozen_botocore_time):
+    cache_control = "private, max-age=3600, immutable"
+    async with boto_client() as s3:
+        expected = await s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': BUCKET, 'Key': "3f2b9a1c0d4e5f6.png", 'ResponseCacheControl': cache_control},
+            ExpiresIn=4500
+        )
+
+    assert signer.presign_get(BUCKET, "3f2b9a1c0d4e5f6.png", 4500, now=NOW, cache_control=cache_control) == expected
+
+
+@pytest.mark.asyncio
+async def test_presign_upload_part_matches_botocore(signer, frozen_botocore_time):
+    async with boto_client() as s3:
+        expected = await s3.generate_presigned_url(
+            'upload_part',
+            Params={'Bucket': BUCKET, 'Key': "3f2b9a1c0d4e5f6.png", 'UploadId': "a1/b2+c3=", 'PartNumber': 7},
+            ExpiresIn=3600
+        )
+
+    assert signer.presign_upload_part(BUCKET, "3f2b9a1c0d4e5f6.png", "a1/b2+c3=", 7, 3600, now=NOW) == expected
+
+
+def test_signing_key_cached_per_day(signer):
+    first = signer.signing_key("20260207")
+    assert signer.signing_key("20260207") is first
+    assert signer.signing_key("20260208") != first
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_local_signer_vs_aioboto3(signer):
+    """Сравнение скорости подписи: локальный подписчик против aioboto3 (общий клиент)"""
+    rounds = 2000
+    keys = [f"{i:015x}.jpeg" for i in range(rounds)]
+
+    async with boto_client() as s3:
+        start = time.perf_counter()
+        for key in keys:
+            await s3.generate_presigned_url('get_object', Params={'Bucket': BUCKET, 'Key': key}, ExpiresIn=3600)
+        boto_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        signer.presign_get(BUCKET, key, 3600)
+    local_time = time.perf_counter() - start
+
+    print(
+        f"\naioboto3: {boto_time / rounds * 1e6:.1f} us/url, "
+        f"local: {local_time / rounds * 1e6:.1f} us/url, "
+        f"speedup x{boto_time / local_time:.1f}"
+    )
@@ -0,0 +1,74 @@
+from datetime import datetime
+import uuid
+
+from app.models.model_users import RoleUser, Users
+from app.models.model_works import StatusWork
+from app.transformers.transformer_work import TransformerWorks
+
+
+def test_filters_response_from_facets():
+    student_id, classroom_id, subject_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    task_a, task_b = uuid.uuid4(), uuid.uuid4()
+    facets = {
+        "students": [{"student_id": student_id, "student_name": "Иван Петров", "count": 3}],
+        "classrooms": [
+            {"classroom_id": classroom_id, "classroom_name": "7А", "count": 2},
+            {"classroom_id": None, "classroom_name": None, "count": 1},
+        ],
+        "statuses": [
+            {"status": StatusWork.draft, "count": 1},
+            {"status": StatusWork.verified, "count": 2},
+        ],
+        "tasks": [
+            {"task_id": task_a, "task_name": "Дроби", "count": 1},
+            {"task_id": task_b, "task_name": "Дроби", "count": 2},
+        ],
+        "subjects": [{"subject_id": subject_id, "subject_name": "Математика", "count": 3}],
+        "dates": {"min_date": datetime(2026, 1, 10, 8), "max_date": datetime(2026, 3, 1, 20)},
+    }
+
+    response = TransformerWorks.handle_filters_response(Users(role=RoleUser.teacher), facets)
+
+    assert [(s.id, s.count) for s in response.students] == [(student_id, 3)]
+    assert [c.id for c in response.classrooms] == [classroom_id]
+    assert response.statuses_counts == {"draft": 1, "verified": 2}
+    assert response.tasks == {"Дроби": [task_a, task_b]}
+    assert response.tasks_counts == {"Дроби": 3}
+    assert str(response.dates.min) == "2026-01-10" and str(response.dates.max) == "2026-03-01"
+
+
+def test_filters_response_without_works():
+    facets = {
+        "teachers": [], "statuses": [], "tasks": [], "subjects": [],
+        "dates": {"min_date": None, "max_date": None},
+    }
+
+    response = TransformerWorks.handle_filters_response(Users(role=RoleUser.student), facets)
+
+    assert response.teachers == [] and response.tasks == {} and response.dates is None
+
+
+def test_status_summary_groups_by_task_and_classroom():
+    task_id, classroom_id = uuid.uuid4(), uuid.uuid4()
+    summary = {
+        "tasks": [
+            {"task_id": task_id, "task_name": "Дроби", "status": StatusWork.verification, "count": 12},
+            {"task_id": task_id, "task_name": "Дроби", "status": StatusWork.inProgress, "count": 40},
+        ],
+        "classrooms": [
+            {"classroom_id": classroom_id, "classroom_name": "7А", "status": StatusWork.verification, "count": 5},
+            {"classroom_id": None, "classroom_name": None, "status": StatusWork.inProgress, "count": 3},
+        ],
+        "statuses": [
+            {"status": StatusWork.verification, "count": 12},
+            {"status": StatusWork.inProgress, "count": 40},
+        ],
+    }
+
+    response = TransformerWorks.handle_status_summary(summary)
+
+    assert response.statuses == {"verification": 12, "inProgress": 40}
+    assert len(response.tasks) == 1
+    assert response.tasks[0].counts == {"verification": 12, "inProgress": 40}
+    assert response.tasks[0].total == 52
+    assert [(c.id, c.total) for c in response.classrooms] == [(classroom_id, 5)]
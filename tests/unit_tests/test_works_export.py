@@ -0,0 +1,58 @@
+import csv
+from datetime import datetime, timezone
+import io
+import json
+from types import SimpleNamespace
+import uuid
+
+import pytest
+
+from app.models.model_works import StatusWork
+from app.services.service_work import EXPORT_COLUMNS, encode_csv, encode_ndjson, row_to_export
+
+
+def make_row(score, max_score):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        sort_key=datetime(2026, 1, 1, 10, tzinfo=timezone.utc),
+        student_name="Иван Петров",
+        subject="Математика",
+        task_name="Дроби, ч. 1",
+        status=StatusWork.verified,
+        score=score,
+        max_score=max_score,
+    )
+
+
+async def batches(*groups):
+    for group in groups:
+        yield [row_to_export(row) for row in group]
+
+
+async def collect(chunks) -> str:
+    return b"".join([chunk async for chunk in chunks]).decode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_encode_csv():
+    rows = [make_row(5, 10), make_row(None, 0)]
+    text = await collect(encode_csv(batches(rows[:1], rows[1:])))
+
+    assert text.startswith("\ufeff")
+    records = list(csv.DictReader(io.StringIO(text.lstrip("\ufeff"))))
+    assert list(records[0]) == EXPORT_COLUMNS
+    assert [r["id"] for r in records] == [str(row.id) for row in rows]
+    assert records[0]["task_name"] == "Дроби, ч. 1"
+    assert (records[0]["percent"], records[1]["score"], records[1]["max_score"]) == ("50", "0", "1")
+
+
+@pytest.mark.asyncio
+async def test_encode_ndjson():
+    rows = [make_row(3, 4), make_row(1, 2)]
+    lines = (await collect(encode_ndjson(batches(rows)))).splitlines()
+
+    records = [json.loads(line) for line in lines]
+    assert [r["id"] for r in records] == [str(row.id) for row in rows]
+    assert records[0]["status"] == "verified"
+    assert records[0]["created_at"] == "2026-01-01T10:00:00+00:00"
+    assert records[0]["percent"] == 75
@@ -0,0 +1,152 @@
+from datetime import datetime, timezone
+import time
+import uuid
+
+import pytest
+from sqlalchemy import exists, func, literal, select, tuple_
+from sqlalchemy.dialects import postgresql
+
+from app.models.model_subjects import Subjects
+from app.models.model_tasks import Tasks
+from app.models.model_users import Users, teachers_students
+from app.models.model_works import StatusWork, WorkScores, Works
+from app.repositories.repo_work import works_count_stmt, works_list_stmt, works_sort_key
+from app.schemas.schema_work import SmartFiltersWorkStudent, SmartFiltersWorkTeacher, WorksPageParams
+
+
+DIALECT = postgresql.asyncpg.dialect()
+
+
+def make_filters(schema, **values):
+    return schema(**{name: None for name in schema.model_fields} | values)
+
+
+def compile_stmt(stmt):
+    """Компиляция так же, как при выполнении: со сбором bind-параметров из кэш-ключа"""
+    return stmt.compile(dialect=DIALECT)
+
+
+def test_same_shape_reuses_statement_with_new_params():
+    page = WorksPageParams(limit=20, sort="score", order="asc")
+    first = compile_stmt(works_list_stmt(
+        "teacher", uuid.uuid4(), make_filters(SmartFiltersWorkTeacher, statuses=["draft"]), page, (3, uuid.uuid4())
+    ))
+    teacher_id, after_id = uuid.uuid4(), uuid.uuid4()
+    second = compile_stmt(works_list_stmt(
+        "teacher", teacher_id, make_filters(SmartFiltersWorkTeacher, statuses=["verified", "canceled"]), page, (5, after_id)
+    ))
+
+    assert str(first) == str(second)
+    assert second.params["user_id_1"] == teacher_id
+    assert second.params["statuses_1"] == [StatusWork.verified, StatusWork.canceled]
+    assert second.params["after_key_1"] == 5 and second.params["after_id_1"] == after_id
+    assert second.params["limit_1"] == 21
+
+
+def test_filter_combinations_change_shape():
+    page = WorksPageParams()
+    student_id = uuid.uuid4()
+    plain = str(compile_stmt(works_list_stmt("student", student_id, make_filters(SmartFiltersWorkStudent), page)))
+    filtered = str(compile_stmt(works_list_stmt(
+        "student", student_id, make_filters(SmartFiltersWorkStudent, teachers_ids=[uuid.uuid4()]), page
+    )))
+    count = str(compile_stmt(works_count_stmt("student", student_id, make_filters(SmartFiltersWorkStudent))))
+
+    assert "LIMIT" not in plain and "tasks.teacher_id IN" not in plain
+    assert "tasks.teacher_id IN" in filtered
+    assert count.startswith("SELECT count(works.id)") and "users" not in count
+
+
+def test_cursor_param_uses_column_type():
+    page = WorksPageParams(limit=10)
+    sql = str(compile_stmt(works_list_stmt(
+        "student", uuid.uuid4(), make_filters(SmartFiltersWorkStudent), page,
+        (datetime(2026, 1, 1, tzinfo=timezone.utc), uuid.uuid4()),
+    )))
+
+    assert "TIMESTAMP WITH TIME ZONE" in sql
+
+
+def test_search_ranks_by_similarity():
+    page = WorksPageParams(limit=10, sort="relevance")
+    teacher_sql = compile_stmt(works_list_stmt(
+        "teacher", uuid.uuid4(), make_filters(SmartFiltersWorkTeacher, search=" Иван "), page, (0.5, uuid.uuid4())
+    ))
+    student_sql = str(compile_stmt(works_list_stmt(
+        "student", uuid.uuid4(), make_filters(SmartFiltersWorkStudent, search="Дроби"), page
+    )))
+
+    # Выражение имени совпадает с выражением trigram-индекса (в скобках: у <% и || один приоритет)
+    assert "<% (users.first_name || ' ' || users.last_name)" in str(teacher_sql)
+    assert "ORDER BY greatest(word_similarity(" in str(teacher_sql)
+    assert "Иван" in teacher_sql.params.values() and teacher_sql.params["after_key_1"] == 0.5
+    assert "users.first_name ||" not in student_sql and "<% tasks.name" in student_sql
+
+
+def core_works_list_stmt(teacher_id, filters, page, after):
+    """Прежнее построение запроса списка работ учителя (Core, с нуля на каждый запрос)"""
+    stmt = (
+        select(
+            Works.id.label("id"),
+            func.concat(Users.first_name, " ", Users.last_name).label("student_name"),
+            Tasks.name.label("task_name"),
+            Subjects.name.label('subject'),
+            WorkScores.score.label("score"),
+            WorkScores.max_score.label("max_score"),
+            Works.status.label("status")
+        )
+        .select_from(Works)
+        .join(Users, Works.student_id == Users.id)
+        .join(Tasks, Works.task_id == Tasks.id)
+        .join(Subjects, Tasks.subject_id == Subjects.id)
+        .outerjoin(WorkScores, WorkScores.work_id == Works.id)
+        .where(Tasks.teacher_id == teacher_id)
+        .where(exists().where(
+            teachers_students.c.student_id == Works.student_id,
+            teachers_students.c.teacher_id == teacher_id,
+        ))
+    )
+    if filters.statuses:
+        stmt = stmt.where(Works.status.in_([StatusWork(s) for s in filters.statuses]))
+    sort_key = works_sort_key(page.sort)
+    stmt = stmt.add_columns(sort_key.label("sort_key"))
+    row_key = tuple_(sort_key, Works.id)
+    cursor_key = tuple_(literal(after[0], sort_key.type), literal(after[1], Works.id.type))
+    stmt = stmt.where(row_key < cursor_key)
+    return stmt.order_by(sort_key.desc(), Works.id.desc()).limit(page.limit + 1)
+
+
+@pytest.mark.benchmark
+def test_benchmark_lambda_builder_vs_core():
+    """
+    Стоимость подготовки запроса на каждый запрос к API при тёплом кэше компиляции:
+    построение выражения + ключ кэша (по нему движок находит скомпилированный SQL).
+    Для справки - полная компиляция, которую кэш убирает.
+    """
+    rounds = 2000
+    filters = make_filters(SmartFiltersWorkTeacher, statuses=["verified"])
+    page = WorksPageParams(limit=50)
+    after = (datetime(2026, 1, 1, tzinfo=timezone.utc), uuid.uuid4())
+    teacher_ids = [uuid.uuid4() for _ in range(rounds)]
+
+    start = time.perf_counter()
+    for teacher_id in teacher_ids:
+        core_works_list_stmt(teacher_id, filters, page, after).compile(dialect=DIALECT)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for teacher_id in teacher_ids:
+        core_works_list_stmt(teacher_id, filters, page, after)._generate_cache_key()
+    core_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for teacher_id in teacher_ids:
+        works_list_stmt("teacher", teacher_id, filters, page, after)._generate_cache_key()
+    lambda_time = time.perf_counter() - start
+
+    print(
+        f"\ncompile: {compile_time / rounds * 1e6:.1f} us/query, "
+        f"core + cache key: {core_time / rounds * 1e6:.1f} us/query, "
+        f"lambda + cache key: {lambda_time / rounds * 1e6:.1f} us/query, "
+        f"speedup x{core_time / lambda_time:.1f}"
+    )